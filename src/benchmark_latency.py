@@ -9,18 +9,20 @@ Usage:
     python3 src/benchmark_latency.py --prompts short    # Only short prompts
     python3 src/benchmark_latency.py --model qwen2.5-instruct:1.5b
     python3 src/benchmark_latency.py --json             # Output as JSON
+    python3 src/benchmark_latency.py --fake --fake-ttft 0.5   # Local fake LLM (no Hailo needed)
 """
 
 import argparse
 import json
 import os
-import re
 import statistics
 import subprocess
-import sys
 import tempfile
 import time
 
+from fake_ollama import FakeOllama
+from voice_assistant_pi import LLMClient
+
 # Configuration (reuse from voice_assistant_pi.py)
 OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://127.0.0.1:8000")
 DEFAULT_MODEL = os.environ.get("OLLAMA_MODEL", "qwen2:1.5b")
@@ -46,71 +48,42 @@ TARGETS = {
 }
 
 
-def benchmark_llm(prompt: str, host: str, model: str) -> dict:
+def benchmark_llm(prompt: str, host: str, model: str, client=None) -> dict:
     """
     Measure LLM latency metrics.
 
     Returns:
-        dict with: ttft_ms, total_ms, token_count, tokens_per_sec, response_text
+        dict with: ttft_ms, total_ms, connect_ms, token_count, tokens_per_sec, response_text
     """
-    try:
-        import requests
-    except ImportError:
-        sys.exit("pip install requests")
-
-    payload = {"model": model, "prompt": prompt, "stream": True}
-
-    start_time = time.perf_counter()
-    ttft = None
-    token_count = 0
-    response_text = ""
+    if client is None:
+        client = LLMClient(host, model, timeout=120, cooldown=0)
 
     try:
-        r = requests.post(
-            f"{host}/api/generate",
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            stream=True,
-            timeout=120,
-        )
-        r.raise_for_status()
-
-        for line in r.iter_lines(decode_unicode=True):
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                chunk = obj.get("response", "")
-                if chunk:
-                    if ttft is None:
-                        ttft = time.perf_counter() - start_time
-                    token_count += 1
-                    response_text += chunk
-                if obj.get("done"):
-                    break
-            except json.JSONDecodeError:
-                continue
-
-        total_time = time.perf_counter() - start_time
+        stream = client.stream_generate(prompt)
+        for _ in stream:
+            pass
+        timing = stream.timing
+        response_text = stream.text
 
         # Estimate tokens (Ollama doesn't always report eval_count accurately in stream mode)
         # Use word count as approximation: ~1.3 tokens per word
+        token_count = timing.tokens
         if token_count == 0 and response_text:
             token_count = int(len(response_text.split()) * 1.3)
 
-        tokens_per_sec = token_count / total_time if total_time > 0 else 0
-
         return {
-            "ttft_ms": round(ttft * 1000) if ttft else 0,
-            "total_ms": round(total_time * 1000),
+            "ttft_ms": timing.ttft_ms,
+            "total_ms": timing.total_ms,
+            "connect_ms": timing.connect_ms,
             "token_count": token_count,
-            "tokens_per_sec": round(tokens_per_sec, 1),
+            "tokens_per_sec": timing.tokens_per_sec,
             "response_text": response_text,
         }
     except Exception as e:
         return {
             "ttft_ms": 0,
             "total_ms": 0,
+            "connect_ms": 0,
             "token_count": 0,
             "tokens_per_sec": 0,
             "response_text": "",
@@ -234,6 +207,8 @@ def benchmark_tts(text: str) -> dict:
 def run_benchmark(prompts_to_test: list, iterations: int, model: str, host: str) -> dict:
     """Run full benchmark suite."""
     results = {}
+    # One pooled connection for the whole run; no cooldown so iterations measure the model, not the wait
+    client = LLMClient(host, model, timeout=120, cooldown=0)
 
     for prompt_name in prompts_to_test:
         if prompt_name not in PROMPTS:
@@ -257,7 +232,7 @@ def run_benchmark(prompts_to_test: list, iterations: int, model: str, host: str)
             print(f"  Iteration {i+1}/{iterations}...", end="\r", flush=True)
 
             # Benchmark LLM
-            llm_result = benchmark_llm(prompt, host, model)
+            llm_result = benchmark_llm(prompt, host, model, client)
 
             if "error" in llm_result:
                 print(f"\n  LLM error: {llm_result['error']}")
@@ -424,6 +399,7 @@ Examples:
     python3 src/benchmark_latency.py --iterations 10
     python3 src/benchmark_latency.py --prompts short medium
     python3 src/benchmark_latency.py --json > results.json
+    python3 src/benchmark_latency.py --fake --fake-tps 6
         """,
     )
     ap.add_argument("--host", default=OLLAMA_HOST, help="Ollama API endpoint")
@@ -437,6 +413,9 @@ Examples:
         help="Prompts to test",
     )
     ap.add_argument("--json", action="store_true", help="Output as JSON")
+    ap.add_argument("--fake", action="store_true", help="Benchmark against a local fake LLM (src/fake_ollama.py)")
+    ap.add_argument("--fake-ttft", type=float, default=0.3, help="Fake LLM seconds before the first token")
+    ap.add_argument("--fake-tps", type=float, default=8.0, help="Fake LLM tokens per second")
     ap.add_argument("--list-prompts", action="store_true", help="List available prompts")
     args = ap.parse_args()
 
@@ -451,7 +430,11 @@ Examples:
     print(f"Prompts: {', '.join(args.prompts)}")
     print()
 
-    results = run_benchmark(args.prompts, args.iterations, args.model, args.host)
+    if args.fake:
+        with FakeOllama(args.fake_ttft, args.fake_tps) as fake:
+            results = run_benchmark(args.prompts, args.iterations, args.model, fake.url)
+    else:
+        results = run_benchmark(args.prompts, args.iterations, args.model, args.host)
 
     if args.json:
         output = {
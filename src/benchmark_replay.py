@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+End-to-end replay benchmark: voice-to-first-audio latency.
+
+Plays a directory of recorded utterance WAVs through the real continuous
+assistant (listener VAD/STT -> turn -> synthesis -> playback) as if they were
+spoken into the microphone, with a null audio sink and, unless --host is given,
+a local fake LLM (src/fake_ollama.py). For every answered utterance it measures
+the time from the true end of speech in the file to the first audio sample
+handed to the sink, broken out by pipeline stage.
+
+Leave --gap longer than a spoken reply: the listener is muted while the
+assistant talks, so an utterance played during a reply is missed (and
+reported as unanswered).
+
+Usage:
+    python3 src/benchmark_replay.py --wavs recordings/          # Fake LLM, 0.3s TTFT
+    python3 src/benchmark_replay.py --wavs recordings/ --ttft 0.8 --tps 6 --repeat 3
+    python3 src/benchmark_replay.py --wavs recordings/ --host http://127.0.0.1:8000
+    python3 src/benchmark_replay.py --wavs recordings/ --json > replay.json
+"""
+
+import argparse
+import asyncio
+import collections
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+# Measure the pipeline, not the caches or the exporters
+os.environ.setdefault("ANSWER_CACHE_SIZE", "0")
+os.environ.setdefault("TRACE_PATH", "")
+os.environ.setdefault("METRICS_PORT", "0")
+
+import voice_assistant_pi as va  # noqa: E402
+from fake_ollama import FakeOllama, serve  # noqa: E402
+
+# Roadmap target (in milliseconds), end of speech -> first audio
+TARGET_VOICE_TO_AUDIO_MS = 1500
+
+# Stages in pipeline order; "endpoint" is true end of speech -> VAD end of speech
+STAGES = ["endpoint"] + [f"{a}->{b}" for a, b in zip(va.TRACE_MILESTONES, va.TRACE_MILESTONES[1:])
+                         if b != "turn_end"]
+
+
+def percentiles(values: list) -> dict:
+    """p50/p95/p99/max (nearest rank) of a list of milliseconds."""
+    if not values:
+        return {"n": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def rank(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+    return {"n": len(ordered), "p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99), "max": round(ordered[-1], 1)}
+
+
+def breakdown(marks: dict, true_end: float):
+    """
+    Stage -> ms for one turn, starting at the true end of speech, plus the milestones it skipped.
+
+    Stage names are fixed (STAGES). When a milestone was skipped (e.g. no
+    llm_request for a local intent), the time since the last milestone reached
+    is attributed to the stage ending at the next one it reached.
+    """
+    stages, skipped = {}, []
+    last = true_end
+    for stage, milestone in zip(STAGES, [m for m in va.TRACE_MILESTONES if m != "turn_end"]):
+        if milestone not in marks:
+            skipped.append(milestone)
+            continue
+        stages[stage] = round((marks[milestone] - last) * 1000, 1)
+        last = marks[milestone]
+    if "first_audio" in marks:
+        stages["total"] = round((marks["first_audio"] - true_end) * 1000, 1)
+    return stages, skipped
+
+
+def run_replay(paths: list, args) -> dict:
+    """Replay paths through the assistant; returns per-turn rows and the stage distributions."""
+    capture = va.FileAudioCapture(paths, va.AUDIO_SAMPLE_RATE, gap=args.gap, speed=args.speed)
+    finished = []  # (marks, record) per closed turn
+    tracer = va.get_tracer()
+    tracer.subscribers.append(lambda trace, record: finished.append((dict(trace.marks), record)))
+
+    options = argparse.Namespace(host=args.host, stt=args.stt, tts=args.tts, wake=False,
+                                 speculate=args.speculate)
+    orchestrator = va.AssistantOrchestrator(options, sink=va.NullSink(realtime=True), capture=capture)
+
+    def stop_when_idle():
+        # Let the last reply play out, then stop once no turn has been running for a while
+        capture.finished.wait()
+        idle_since = time.monotonic()
+        while not orchestrator.stop_event.is_set():
+            if orchestrator.turn is not None or orchestrator.processing_event.is_set():
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > args.settle:
+                orchestrator.stop_event.set()
+            time.sleep(0.1)
+
+    threading.Thread(target=stop_when_idle, name="ReplayWatcher", daemon=True).start()
+    asyncio.run(orchestrator.run())
+
+    rows = []
+    answered = set()
+    for marks, record in finished:
+        speech_end = marks.get("speech_end")
+        candidates = [i for i, u in enumerate(capture.utterances)
+                      if u["speech_end"] is not None and speech_end is not None and u["speech_end"] <= speech_end]
+        if not candidates:
+            continue
+        index = max(candidates, key=lambda i: capture.utterances[i]["speech_end"])
+        answered.add(index)
+        stages, skipped = breakdown(marks, capture.utterances[index]["speech_end"])
+        rows.append({"file": os.path.basename(capture.utterances[index]["path"]), "outcome": record["outcome"],
+                     "stages_ms": stages, "skipped": skipped})
+
+    stats = {stage: percentiles([r["stages_ms"][stage] for r in rows if stage in r["stages_ms"]])
+             for stage in STAGES + ["total"]}
+    skipped = collections.Counter(m for r in rows for m in r["skipped"])
+    missed = [os.path.basename(path) for i, path in enumerate(paths) if i not in answered]
+    return {"turns": rows, "stats": stats, "skipped": dict(skipped), "unanswered": missed}
+
+
+def print_results(results: dict, args, n_files: int):
+    """Print formatted results table."""
+    print()
+    print("=" * 60)
+    print("       Voice-to-First-Audio Replay Benchmark")
+    print("=" * 60)
+    print(f"Utterances: {n_files} | STT: {args.stt} | TTS: {args.tts} | LLM: {args.llm}")
+    print()
+
+    print("+" + "-" * 36 + "+" + "-" * 5 + "+" + ("-" * 11 + "+") * 4)
+    print("| {:<34} | {:>3} | {:>9} | {:>9} | {:>9} | {:>9} |".format("Stage", "n", "p50", "p95", "p99", "Max"))
+    print("+" + "-" * 36 + "+" + "-" * 5 + "+" + ("-" * 11 + "+") * 4)
+    for stage, s in results["stats"].items():
+        if not s["n"]:
+            continue
+        if stage == "total":
+            print("+" + "-" * 36 + "+" + "-" * 5 + "+" + ("-" * 11 + "+") * 4)
+        label = "Voice -> first audio" if stage == "total" else stage
+        print("| {:<34} | {:>3} | {:>7}ms | {:>7}ms | {:>7}ms | {:>7}ms |".format(
+            label, s["n"], s["p50"], s["p95"], s["p99"], s["max"]))
+    print("+" + "-" * 36 + "+" + "-" * 5 + "+" + ("-" * 11 + "+") * 4)
+
+    total = results["stats"]["total"]
+    if total["n"]:
+        status = "PASS" if total["p95"] <= TARGET_VOICE_TO_AUDIO_MS else "FAIL"
+        print(f"Target: p95 voice -> first audio <= {TARGET_VOICE_TO_AUDIO_MS}ms [{status}]")
+    if results["skipped"]:
+        print("Skipped milestones (time counted in the next stage reached): "
+              + ", ".join(f"{m} x{n}" for m, n in results["skipped"].items()))
+    if results["unanswered"]:
+        print(f"Unanswered ({len(results['unanswered'])}): {', '.join(results['unanswered'])}")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Replay recorded utterances through the assistant and measure voice-to-first-audio latency",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python3 src/benchmark_replay.py --wavs recordings/
+    python3 src/benchmark_replay.py --wavs recordings/ --stt sherpa-streaming --speed 2
+    python3 src/benchmark_replay.py --wavs recordings/ --json > replay.json
+        """,
+    )
+    ap.add_argument("--wavs", required=True, help="Directory of utterance WAVs (16-bit PCM, any rate)")
+    ap.add_argument("--stt", default=va.STT_ENGINE, help="STT engine")
+    ap.add_argument("--tts", default=va.TTS_ENGINE, help="TTS engine")
+    ap.add_argument("--host", default=None, help="Real LLM endpoint (default: start a fake one)")
+    ap.add_argument("--ttft", type=float, default=0.3, help="Fake LLM seconds before the first token")
+    ap.add_argument("--tps", type=float, default=8.0, help="Fake LLM tokens per second")
+    ap.add_argument("--reply", default="Sure. Here is a short answer to your question.", help="Fake LLM reply")
+    ap.add_argument("--gap", type=float, default=6.0, help="Seconds of silence between utterances")
+    ap.add_argument("--speed", type=float, default=1.0, help="Replay speed (1.0 = real time)")
+    ap.add_argument("--repeat", "-n", type=int, default=1, help="Play the directory this many times")
+    ap.add_argument("--settle", type=float, default=3.0, help="Idle seconds after the last file before stopping")
+    ap.add_argument("--speculate", action="store_true", help="Enable speculative LLM requests")
+    ap.add_argument("--no-intents", action="store_true", help="Send every utterance to the LLM")
+    ap.add_argument("--json", action="store_true", help="Output as JSON")
+    args = ap.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.wavs, "*.wav")))
+    if not paths:
+        sys.exit(f"No .wav files in {args.wavs}")
+    if args.no_intents:
+        va.LOCAL_INTENTS = False
+
+    fake_server = None
+    if args.host is None:
+        fake_server = serve(FakeOllama(args.ttft, args.tps, args.reply))
+        args.host = f"http://127.0.0.1:{fake_server.server_port}"
+        args.llm = f"fake (ttft {args.ttft}s, {args.tps} tok/s)"
+    else:
+        args.llm = args.host
+
+    print(f"Replaying {len(paths)} files x {args.repeat} from {args.wavs}...", file=sys.stderr)
+    try:
+        results = run_replay(paths * args.repeat, args)
+    finally:
+        if fake_server is not None:
+            fake_server.shutdown()
+
+    if args.json:
+        output = {
+            "stt": args.stt,
+            "tts": args.tts,
+            "llm": args.llm,
+            "gap_s": args.gap,
+            "speed": args.speed,
+            "target_ms": TARGET_VOICE_TO_AUDIO_MS,
+            **results,
+        }
+        print(json.dumps(output, indent=2))
+    else:
+        print_results(results, args, len(paths) * args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+STT benchmark: sweep engines, model sizes, compute types, beam widths, CPU
+threads and VAD filtering over a labelled WAV corpus.
+
+The corpus is a directory of WAVs, each with a reference transcript next to
+it (utt01.wav + utt01.txt), or a --labels TSV of "file<TAB>transcript" lines.
+Every configuration runs in a fresh process, so the model load is cold and the
+peak RSS is that configuration's alone. Reported per configuration:
+  load_s        cold model load
+  rtf           warm real-time factor (decode time / audio time, after one warm-up file)
+  p50/p95_ms    warm per-file decode latency
+  peak_rss_mb   peak resident memory of the worker, or of the whisper.cpp processes for whisper.cpp
+  wer           word error rate against the references
+
+whisper.cpp runs its binary once per file, so its latencies include the model
+load and load_s is not reported. The winning settings map onto STT_ENGINE,
+STT_MODEL, STT_COMPUTE_TYPE, STT_THREADS, STT_BEAM_SIZE and STT_VAD_FILTER.
+
+Usage:
+    python3 src/benchmark_stt.py --corpus recordings/                  # Default sweep
+    python3 src/benchmark_stt.py --corpus recordings/ --models tiny.en base.en --beams 1 5
+    python3 src/benchmark_stt.py --corpus recordings/ --engines faster-whisper whisper.cpp --threads 2 4
+    python3 src/benchmark_stt.py --corpus recordings/ --output stt_results.json
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import wave
+
+ENGINES = ["faster-whisper", "whisper.cpp", "whisper"]
+
+# Sweep dimensions each engine actually has (others are fixed to their first value)
+ENGINE_DIMENSIONS = {
+    "faster-whisper": {"compute_type", "beam_size", "threads", "vad_filter"},
+    "whisper.cpp": {"beam_size", "threads"},
+    "whisper": {"beam_size", "threads"},
+}
+
+
+def load_corpus(corpus: str, labels: str = None, max_files: int = 0) -> list:
+    """[(wav_path, reference_text)] for every WAV that has a reference."""
+    references = {}
+    if labels:
+        with open(labels, "r", encoding="utf-8") as f:
+            for line in f:
+                if "\t" in line:
+                    name, text = line.rstrip("\n").split("\t", 1)
+                    references[os.path.basename(name)] = text
+    items = []
+    for path in sorted(glob.glob(os.path.join(corpus, "*.wav"))):
+        text = references.get(os.path.basename(path))
+        sidecar = os.path.splitext(path)[0] + ".txt"
+        if text is None and os.path.isfile(sidecar):
+            with open(sidecar, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+        if text is not None:
+            items.append((path, text))
+    return items[:max_files] if max_files else items
+
+
+def normalize(text: str) -> list:
+    """Lowercase words without punctuation, for WER."""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower().replace("-", " ")).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple:
+    """(substitutions + deletions + insertions, reference word count)."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def wav_duration(path: str) -> float:
+    with wave.open(path, "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def read_samples(path: str):
+    """16kHz mono float32 samples, as the assistant hands them to the Python engines."""
+    import numpy as np
+    from voice_assistant_pi import _resample_pcm16
+    with wave.open(path, "rb") as wf:
+        rate, channels = wf.getframerate(), wf.getnchannels()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)[::channels]
+    if rate != 16000:
+        pcm = np.frombuffer(_resample_pcm16(pcm.tobytes(), rate, 16000), dtype=np.int16)
+    return pcm.astype(np.float32) / 32768.0
+
+
+def make_transcriber(config: dict):
+    """Load the model for config; returns transcribe(path) -> text."""
+    engine, model = config["engine"], config["model"]
+    if engine == "whisper.cpp":
+        from voice_assistant_pi import WHISPER_CPP_BIN, WHISPER_CPP_MODEL, _samples_to_wav_bytes
+        model_path = os.path.join(os.path.dirname(WHISPER_CPP_MODEL), f"ggml-{model}.bin")
+        if not os.path.isfile(WHISPER_CPP_BIN) or not os.path.isfile(model_path):
+            raise FileNotFoundError(f"whisper.cpp binary or {model_path} not found")
+        cmd = [WHISPER_CPP_BIN, "-m", model_path, "-nt", "-np", "-bs", str(config["beam_size"])]
+        if config["threads"]:
+            cmd += ["-t", str(config["threads"])]
+
+        def run_whisper_cpp(path):
+            # Resampled to 16kHz and piped on stdin, as stt_whisper_cpp() does for in-memory audio
+            wav = _samples_to_wav_bytes(read_samples(path))
+            result = subprocess.run(cmd + ["-f", "-"], input=wav, capture_output=True, timeout=300)
+            if result.returncode != 0:
+                stderr = result.stderr.decode("utf-8", errors="replace").strip().splitlines()
+                raise RuntimeError(f"whisper.cpp exited {result.returncode} on {path}: "
+                                   f"{stderr[-1] if stderr else 'no output'}")
+            lines = result.stdout.decode("utf-8", errors="replace").splitlines()
+            return " ".join(line.strip() for line in lines if line.strip())
+
+        return run_whisper_cpp
+
+    from voice_assistant_pi import SttModelRegistry
+    loaded = SttModelRegistry._load(engine, model, config["compute_type"], config["threads"])
+    if engine == "whisper":
+        def run_whisper(path):
+            options = {"beam_size": config["beam_size"]} if config["beam_size"] > 1 else {}
+            return loaded.transcribe(read_samples(path), fp16=False, **options)["text"]
+
+        return run_whisper
+
+    def run_faster_whisper(path):
+        segments, _ = loaded.transcribe(read_samples(path), beam_size=config["beam_size"],
+                                        vad_filter=config["vad_filter"])
+        return " ".join(segment.text.strip() for segment in segments)
+
+    return run_faster_whisper
+
+
+def run_config(config: dict, items: list) -> dict:
+    """Benchmark one configuration in this process (called in the --worker subprocess)."""
+    import resource
+    start = time.perf_counter()
+    transcribe = make_transcriber(config)
+    load_s = time.perf_counter() - start
+
+    transcribe(items[0][0])  # Warm-up: first-call allocations and caches
+    latencies, audio_s, errors, words, samples = [], 0.0, 0, 0, []
+    for path, reference in items:
+        start = time.perf_counter()
+        text = transcribe(path).strip()
+        latencies.append(time.perf_counter() - start)
+        audio_s += wav_duration(path)
+        e, n = word_errors(reference, text)
+        errors += e
+        words += n
+        if e and len(samples) < 5:
+            samples.append({"file": os.path.basename(path), "ref": reference, "hyp": text})
+
+    ordered = sorted(latencies)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if config["engine"] == "whisper.cpp":
+        # The model lives in the whisper.cpp child processes, not in this worker
+        peak_rss = max(peak_rss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {
+        "load_s": None if config["engine"] == "whisper.cpp" else round(load_s, 2),
+        "rtf": round(sum(latencies) / audio_s, 3) if audio_s else 0.0,
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000),
+        "peak_rss_mb": round(peak_rss / 1024),
+        "wer": round(errors / words, 4) if words else 0.0,
+        "files": len(items),
+        "audio_s": round(audio_s, 1),
+        "errors": samples,
+    }
+
+
+def sweep(args) -> list:
+    """Every distinct configuration for the requested engines."""
+    configs = []
+    for engine in args.engines:
+        dims = ENGINE_DIMENSIONS[engine]
+        axes = {
+            "compute_type": args.compute_types if "compute_type" in dims else [args.compute_types[0]],
+            "beam_size": args.beams,
+            "threads": args.threads,
+            "vad_filter": args.vad if "vad_filter" in dims else [False],
+        }
+        for model in args.models:
+            for values in itertools.product(*axes.values()):
+                config = {"engine": engine, "model": model, **dict(zip(axes, values))}
+                if "compute_type" not in dims:
+                    config["compute_type"] = None
+                if config not in configs:
+                    configs.append(config)
+    return configs
+
+
+def label(config: dict) -> str:
+    parts = [config["engine"], config["model"]]
+    if config["compute_type"]:
+        parts.append(config["compute_type"])
+    parts.append(f"beam={config['beam_size']}")
+    parts.append(f"t={config['threads'] or 'auto'}")
+    if config["vad_filter"]:
+        parts.append("vad")
+    return " ".join(parts)
+
+
+def benchmark(config: dict, args) -> dict:
+    """Run one configuration in a fresh interpreter; returns its result (or {"error": ...})."""
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config),
+           "--corpus", args.corpus, "--max-files", str(args.max_files)]
+    if args.labels:
+        cmd += ["--labels", args.labels]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {args.timeout}s"}
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["no output"])[-1][:200]}
+    return json.loads(lines[-1])
+
+
+def print_results(results: list):
+    """Print formatted results table, best WER first."""
+    ok = sorted((r for r in results if "error" not in r["result"]),
+                key=lambda r: (r["result"]["wer"], r["result"]["rtf"]))
+    print()
+    print("=" * 100)
+    print("STT Benchmark")
+    print("=" * 100)
+    print("| {:<44} | {:>6} | {:>6} | {:>7} | {:>7} | {:>7} | {:>6} |".format(
+        "Configuration", "WER", "RTF", "p50", "p95", "Load", "RSS"))
+    print("|" + "-" * 46 + "|" + "-" * 8 + "|" + "-" * 8 + "|" + "-" * 9 + "|" + "-" * 9 + "|" + "-" * 9 + "|" + "-" * 8 + "|")
+    for r in ok:
+        res = r["result"]
+        load = "-" if res["load_s"] is None else f"{res['load_s']}s"
+        print("| {:<44} | {:>5.1f}% | {:>6} | {:>5}ms | {:>5}ms | {:>7} | {:>4}MB |".format(
+            label(r["config"]), res["wer"] * 100, res["rtf"], res["p50_ms"], res["p95_ms"], load, res["peak_rss_mb"]))
+    for r in results:
+        if "error" in r["result"]:
+            print(f"  {label(r['config'])}: ERROR - {r['result']['error']}")
+    if ok:
+        fastest = min(ok, key=lambda r: r["result"]["p95_ms"])
+        print()
+        print(f"Most accurate: {label(ok[0]['config'])} (WER {ok[0]['result']['wer'] * 100:.1f}%)")
+        print(f"Fastest:       {label(fastest['config'])} (p95 {fastest['result']['p95_ms']}ms)")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Benchmark STT engines and settings on a labelled WAV corpus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    python3 src/benchmark_stt.py --corpus recordings/
+    python3 src/benchmark_stt.py --corpus recordings/ --models tiny.en base.en small.en --vad off on
+    python3 src/benchmark_stt.py --corpus recordings/ --labels transcripts.tsv --output stt.json
+        """,
+    )
+    ap.add_argument("--corpus", required=True, help="Directory of WAVs (with .txt transcripts alongside)")
+    ap.add_argument("--labels", help="TSV of file<TAB>transcript (instead of .txt sidecars)")
+    ap.add_argument("--engines", nargs="+", choices=ENGINES, default=["faster-whisper"], help="Engines to test")
+    ap.add_argument("--models", nargs="+", default=["tiny.en", "base.en"], help="Model sizes")
+    ap.add_argument("--compute-types", nargs="+", default=["int8", "float32"], help="faster-whisper compute types")
+    ap.add_argument("--beams", nargs="+", type=int, default=[1, 5], help="Beam widths (1 = greedy)")
+    ap.add_argument("--threads", nargs="+", type=int, default=[0], help="CPU threads (0 = library default)")
+    ap.add_argument("--vad", nargs="+", choices=["off", "on"], default=["off"], help="faster-whisper VAD filter")
+    ap.add_argument("--max-files", type=int, default=0, help="Use only the first N files (0 = all)")
+    ap.add_argument("--timeout", type=int, default=1800, help="Seconds allowed per configuration")
+    ap.add_argument("--output", "-o", default="stt_results.json", help="JSON results file")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    items = load_corpus(args.corpus, args.labels, args.max_files)
+    if not items:
+        sys.exit(f"No labelled WAVs in {args.corpus}")
+
+    if args.worker:
+        # Keep stdout for the result line: libraries may print while loading
+        out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        out.write(json.dumps(run_config(json.loads(args.worker), items)) + "\n")
+        out.flush()
+        return
+
+    args.vad = [v == "on" for v in args.vad]
+    configs = sweep(args)
+    print(f"Corpus: {len(items)} files | {len(configs)} configurations", file=sys.stderr)
+    results = []
+    for i, config in enumerate(configs, 1):
+        print(f"[{i}/{len(configs)}] {label(config)}... ", end="", file=sys.stderr, flush=True)
+        result = benchmark(config, args)
+        if "error" in result:
+            print(f"ERROR - {result['error']}", file=sys.stderr)
+        else:
+            print(f"WER {result['wer'] * 100:.1f}%, RTF {result['rtf']}", file=sys.stderr)
+        results.append({"config": config, "result": result})
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"corpus": args.corpus, "files": len(items), "results": results}, f, indent=2)
+    print_results(results)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,308 +2,266 @@
 """
 Compare TTS engines: Piper vs Sherpa-ONNX vs Supertonic on Raspberry Pi 5.
 
+Each engine is driven through the same renderers (and so the same model,
+voice and settings from the environment) that speak() uses, with the PCM
+cache disabled. Every configuration runs in a fresh process, so the first
+render is a true cold start and peak RSS belongs to that configuration.
+Reported per configuration and sentence length:
+  cold_first_ms   first render in a fresh process (model load included)
+  warm_first_ms   same sentence again, model warm
+  first_audio     time to the first sentence's PCM when a reply is synthesized
+                  sentence by sentence, as the assistant streams it
+  stream_first    time to the first callback chunk (Sherpa's streaming generate())
+  gen / rtf       whole-text generation time and real-time factor, mean and stdev
+  peak_rss_mb     this process; worker_rss_mb for Piper/Supertonic worker processes
+
+Sherpa is swept over SHERPA_TTS_THREADS (1-4 by default) and fp32/int8 model
+variants (SHERPA_TTS_PRECISION), where the model directory has both.
+
 Usage:
     python3 src/benchmark_tts_comparison.py
+    python3 src/benchmark_tts_comparison.py --engines sherpa --threads 2 4 --precisions fp32
+    python3 src/benchmark_tts_comparison.py --texts replies.txt --iterations 5 --output tts.json
 """
 
+import argparse
+import json
 import os
+import statistics
 import subprocess
 import sys
-import tempfile
 import time
 
-# Test texts of varying lengths
+# Test texts of varying lengths (several per length, for variance)
 TEXTS = {
-    "short": "Hello, how are you?",
-    "medium": "The quick brown fox jumps over the lazy dog. This is a test of the TTS system.",
-    "long": "This morning, I took my dog for a walk in the park. We saw many birds and squirrels. The weather was beautiful with clear blue skies. It was a lovely start to the day.",
+    "short": [
+        "Hello, how are you?",
+        "It is sunny today.",
+        "Timer set for five minutes.",
+    ],
+    "medium": [
+        "The quick brown fox jumps over the lazy dog. This is a test of the TTS system.",
+        "Paris is the capital of France. It is known for the Eiffel Tower.",
+        "Water boils at one hundred degrees Celsius. At high altitude it boils a little lower.",
+    ],
+    "long": [
+        "This morning, I took my dog for a walk in the park. We saw many birds and squirrels. The weather was beautiful with clear blue skies. It was a lovely start to the day.",
+        "A computer has three main parts. The processor runs instructions. Memory holds what it is working on right now. Storage keeps files even when the power is off.",
+        "To make tea, first boil some water. Put a tea bag in a cup and pour the water over it. Wait three to five minutes. Then remove the bag and add milk if you like.",
+    ],
 }
 
+ENGINES = ["piper", "sherpa", "supertonic"]
 
-def get_wav_duration(wav_path: str) -> float:
-    """Get duration of a WAV file in seconds by parsing the header."""
-    try:
-        with open(wav_path, "rb") as f:
-            # RIFF header
-            riff = f.read(4)
-            if riff != b"RIFF":
-                return 0
-            f.read(4)  # file size
-            wave = f.read(4)
-            if wave != b"WAVE":
-                return 0
-
-            # Find fmt chunk
-            while True:
-                chunk_id = f.read(4)
-                chunk_size = int.from_bytes(f.read(4), "little")
-                if chunk_id == b"fmt ":
-                    fmt_data = f.read(chunk_size)
-                    channels = int.from_bytes(fmt_data[2:4], "little")
-                    sample_rate = int.from_bytes(fmt_data[4:8], "little")
-                    bits_per_sample = int.from_bytes(fmt_data[14:16], "little")
-                    break
-                else:
-                    f.read(chunk_size)
-
-            # Find data chunk
-            while True:
-                chunk_id = f.read(4)
-                chunk_size = int.from_bytes(f.read(4), "little")
-                if chunk_id == b"data":
-                    bytes_per_sample = bits_per_sample // 8
-                    total_samples = chunk_size // (channels * bytes_per_sample)
-                    duration = total_samples / sample_rate
-                    return duration
-                else:
-                    f.read(chunk_size)
-    except Exception:
-        return 0
-
-
-def benchmark_piper(text: str, iterations: int = 3) -> dict:
-    """Benchmark Piper TTS."""
-    PIPER_MODEL_DIR = os.environ.get("PIPER_MODEL_DIR", os.path.expanduser("~/piper_models"))
-    PIPER_VOICE = os.environ.get("PIPER_VOICE", "en_US-amy-medium")
-    PIPER_BIN = os.environ.get("PIPER_BIN", os.path.expanduser("~/piper/piper"))
-    PIPER_ESPEAK_DATA = os.environ.get("PIPER_ESPEAK_DATA", os.path.expanduser("~/piper/espeak-ng-data"))
-    PIPER_LD_LIBRARY_PATH = os.environ.get("PIPER_LD_LIBRARY_PATH", os.path.expanduser("~/piper"))
-
-    model_path = os.path.join(PIPER_MODEL_DIR, f"{PIPER_VOICE}.onnx")
-    config_path = os.path.join(PIPER_MODEL_DIR, f"{PIPER_VOICE}.onnx.json")
-
-    if not os.path.isfile(model_path) or not os.path.isfile(PIPER_BIN):
-        return {"error": "Piper not found"}
-
-    times = []
-    durations = []
-
-    for _ in range(iterations):
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            wav_path = tmp.name
-
-        try:
-            env = os.environ.copy()
-            env["LD_LIBRARY_PATH"] = os.path.pathsep.join([
-                PIPER_LD_LIBRARY_PATH,
-                env.get("LD_LIBRARY_PATH", "")
-            ])
-
-            cmd = [
-                PIPER_BIN,
-                "--model", model_path,
-                "--config", config_path,
-                "--output_file", wav_path,
-                "--espeak_data", PIPER_ESPEAK_DATA,
-            ]
-
-            start = time.perf_counter()
-            proc = subprocess.run(
-                cmd,
-                input=text.encode("utf-8"),
-                capture_output=True,
-                env=env,
-                cwd=os.path.dirname(PIPER_BIN),
-                timeout=60,
-            )
-            elapsed = time.perf_counter() - start
-
-            if proc.returncode == 0:
-                duration = get_wav_duration(wav_path)
-                times.append(elapsed)
-                durations.append(duration)
-        except Exception as e:
-            return {"error": str(e)}
-        finally:
-            if os.path.exists(wav_path):
-                os.unlink(wav_path)
-
-    if not times:
-        return {"error": "No successful runs"}
-
-    avg_time = sum(times) / len(times)
-    avg_duration = sum(durations) / len(durations)
-    rtf = avg_time / avg_duration if avg_duration > 0 else 0
-
-    return {
-        "generation_ms": round(avg_time * 1000),
-        "audio_duration_s": round(avg_duration, 2),
-        "rtf": round(rtf, 3),
-        "sample_rate": 22050,
-    }
-
-
-def benchmark_supertonic(text: str, iterations: int = 3) -> dict:
-    """Benchmark Supertonic TTS via Python."""
-    supertonic_path = os.path.expanduser("~/supertonic/py")
-
-    if not os.path.isdir(supertonic_path):
-        return {"error": "Supertonic not found"}
-
-    # Escape text for Python string
-    escaped_text = text.replace('\\', '\\\\').replace('"', '\\"').replace("'", "\\'")
 
-    # Create a benchmark script to run in the supertonic venv
-    bench_script = '''
-import sys
-sys.path.insert(0, "''' + supertonic_path + '''")
-import os
-os.chdir("''' + supertonic_path + '''")
-import time
-import json
-from helper import load_text_to_speech
-
-text = "''' + escaped_text + '''"
-iterations = ''' + str(iterations) + '''
-
-# Load model once
-tts = load_text_to_speech("assets/onnx", use_gpu=False)
-
-times = []
-durations = []
-
-for _ in range(iterations):
-    start = time.perf_counter()
-    audio, sr = tts.generate(text)
-    elapsed = time.perf_counter() - start
-    times.append(elapsed)
-    durations.append(len(audio) / sr)
-
-if not times:
-    print(json.dumps({"error": "No successful runs"}))
-else:
-    avg_time = sum(times) / len(times)
-    avg_duration = sum(durations) / len(durations)
-    rtf = avg_time / avg_duration if avg_duration > 0 else 0
-    print(json.dumps({
-        "generation_ms": round(avg_time * 1000),
-        "audio_duration_s": round(avg_duration, 2),
-        "rtf": round(rtf, 3),
-        "sample_rate": 44100
-    }))
-'''
-
-    try:
-        result = subprocess.run(
-            [f"{supertonic_path}/.venv/bin/python", "-c", bench_script],
-            capture_output=True,
-            text=True,
-            timeout=300,
-            cwd=supertonic_path,
-        )
-
-        if result.returncode != 0:
-            return {"error": result.stderr[:200]}
-
-        # Parse JSON output
-        import json
-        return json.loads(result.stdout.strip())
-    except Exception as e:
-        return {"error": str(e)}
-
-
-def benchmark_sherpa(text: str, iterations: int = 3) -> dict:
-    """Benchmark Sherpa-ONNX VITS TTS."""
-    try:
-        import sherpa_onnx
-    except ImportError:
-        return {"error": "sherpa-onnx not installed"}
+def split_sentences(text: str) -> list:
+    from voice_assistant_pi import _split_sentences
+    return _split_sentences(text) or [text]
 
-    model_dir = os.environ.get("SHERPA_TTS_MODEL", os.path.expanduser("~/tts-models/vits-vctk-onnx"))
-    num_threads = int(os.environ.get("SHERPA_TTS_THREADS", "4"))
 
-    if not os.path.isdir(model_dir):
-        return {"error": f"Sherpa model not found at {model_dir}"}
+def summarize(values: list) -> dict:
+    """mean/stdev/p50/p95 of a list, rounded."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.mean(ordered), 3),
+        "stdev": round(statistics.stdev(ordered), 3) if len(ordered) > 1 else 0.0,
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+    }
 
-    try:
-        tts = sherpa_onnx.OfflineTts(
-            model=model_dir,
-            num_threads=num_threads,
-            debug=False,
-            provider="cpu",
-        )
-    except Exception as e:
-        return {"error": f"Failed to load model: {e}"}
-
-    times = []
-    durations = []
-
-    for _ in range(iterations):
-        try:
-            start = time.perf_counter()
-            audio = tts.generate(text, sid=0, speed=1.0)
-            elapsed = time.perf_counter() - start
-
-            samples = audio.samples
-            if hasattr(samples, '__len__') and len(samples) > 0:
-                duration = len(samples) / tts.sample_rate
-                times.append(elapsed)
-                durations.append(duration)
-        except Exception as e:
-            return {"error": str(e)}
-
-    if not times:
-        return {"error": "No successful runs"}
-
-    avg_time = sum(times) / len(times)
-    avg_duration = sum(durations) / len(durations)
-    rtf = avg_time / avg_duration if avg_duration > 0 else 0
 
+def run_config(config: dict, texts: dict, iterations: int) -> dict:
+    """Benchmark one configuration in this process (called in the --worker subprocess)."""
+    import resource
+    import voice_assistant_pi as va
+
+    engine = config["engine"]
+    render = va._TTS_RENDERERS[engine][0]
+
+    def timed(text):
+        start = time.perf_counter()
+        audio = render(text, timeout=va.TTS_TIMEOUT)
+        elapsed = time.perf_counter() - start
+        if audio is None:
+            raise RuntimeError(f"{engine} produced no audio")
+        pcm, sample_rate = audio
+        return elapsed, len(pcm) / 2 / sample_rate, sample_rate
+
+    warmup = texts["short"][0] if texts.get("short") else next(iter(texts.values()))[0]
+    cold, _, sample_rate = timed(warmup)
+    warm, _, _ = timed(warmup)
+
+    def stream_first(text):
+        # Sherpa's generate() calls back with audio as it is produced
+        tts = va._get_sherpa_tts()
+        first = []
+        start = time.perf_counter()
+
+        def callback(samples, progress):
+            if not first:
+                first.append(time.perf_counter() - start)
+            return 1
+
+        tts.generate(text, sid=va.SHERPA_TTS_SPEAKER, speed=va.SHERPA_TTS_SPEED, callback=callback)
+        return first[0] if first else None
+
+    buckets = {}
+    for name, bucket in texts.items():
+        gen, rtf, first_audio, streamed = [], [], [], []
+        for text in bucket:
+            for _ in range(iterations):
+                first_audio.append(timed(split_sentences(text)[0])[0] * 1000)
+                elapsed, duration, _ = timed(text)
+                gen.append(elapsed * 1000)
+                rtf.append(elapsed / duration if duration else 0.0)
+                if engine == "sherpa":
+                    t = stream_first(text)
+                    if t is not None:
+                        streamed.append(t * 1000)
+        buckets[name] = {"gen_ms": summarize(gen), "rtf": summarize(rtf), "first_audio_ms": summarize(first_audio),
+                         "stream_first_ms": summarize(streamed)}
+
+    # Workers hold their models in child processes: stop them so their peak RSS is counted
+    if engine == "piper" and va.PIPER_WORKER:
+        va.get_piper_worker().close()
+    elif engine == "supertonic":
+        va.get_supertonic_worker().close()
     return {
-        "generation_ms": round(avg_time * 1000),
-        "audio_duration_s": round(avg_duration, 2),
-        "rtf": round(rtf, 3),
-        "sample_rate": tts.sample_rate,
+        "sample_rate": sample_rate,
+        "cold_first_ms": round(cold * 1000),
+        "warm_first_ms": round(warm * 1000),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+        "worker_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024),
+        "texts": buckets,
     }
 
 
-def main():
+def configurations(args) -> list:
+    configs = []
+    for engine in args.engines:
+        if engine == "sherpa":
+            configs += [{"engine": engine, "threads": t, "precision": p} for p in args.precisions for t in args.threads]
+        else:
+            configs.append({"engine": engine})
+    return configs
+
+
+def label(config: dict) -> str:
+    if config["engine"] == "sherpa":
+        return f"sherpa {config['precision']} t={config['threads']}"
+    return config["engine"]
+
+
+def benchmark(config: dict, args) -> dict:
+    """Run one configuration in a fresh interpreter; returns its result (or {"error": ...})."""
+    env = os.environ.copy()
+    env.update(PCM_CACHE_MEMORY_MB="0", PCM_CACHE_DISK_MB="0")  # Measure synthesis, not the cache
+    if config["engine"] == "sherpa":
+        env.update(SHERPA_TTS_THREADS=str(config["threads"]), SHERPA_TTS_PRECISION=config["precision"])
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config),
+           "--iterations", str(args.iterations)]
+    if args.texts:
+        cmd += ["--texts", args.texts]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=env, timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {args.timeout}s"}
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["no output"])[-1][:200]}
+    return json.loads(lines[-1])
+
+
+def load_texts(path: str) -> dict:
+    """Texts file (one reply per line), bucketed by length."""
+    texts = {"short": [], "medium": [], "long": []}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                words = len(line.split())
+                texts["short" if words <= 6 else "medium" if words <= 20 else "long"].append(line)
+    return {name: bucket for name, bucket in texts.items() if bucket}
+
+
+def print_results(results: list):
+    print()
     print("=" * 70)
-    print("TTS Engine Comparison: Piper vs Sherpa-ONNX vs Supertonic on Pi 5")
+    print("Summary")
     print("=" * 70)
+    print("| {:<18} | {:>6} | {:>6} | {:>6} | {:>13} | {:>11} | {:>12} |".format(
+        "Engine", "Cold", "Warm", "RSS", "First audio", "Stream 1st", "RTF (long)"))
+    print("|" + "-" * 20 + "|" + "-" * 8 + "|" + "-" * 8 + "|" + "-" * 8 + "|" + "-" * 15 + "|" + "-" * 13 + "|" + "-" * 14 + "|")
+    for r in results:
+        res = r["result"]
+        if "error" in res:
+            print(f"| {label(r['config']):<18} | ERROR - {res['error']}")
+            continue
+        first = [b["first_audio_ms"]["p95"] for b in res["texts"].values() if b["first_audio_ms"]]
+        streamed = [b["stream_first_ms"]["p95"] for b in res["texts"].values() if b["stream_first_ms"]]
+        longest = list(res["texts"].values())[-1]["rtf"]
+        rss = res["peak_rss_mb"] + res["worker_rss_mb"]
+        print("| {:<18} | {:>4}ms | {:>4}ms | {:>4}MB | p95 {:>7}ms | {:>11} | {:>5} ±{:<5} |".format(
+            label(r["config"]), res["cold_first_ms"], res["warm_first_ms"], rss, round(max(first)),
+            f"{round(max(streamed))}ms" if streamed else "-", longest["mean"], longest["stdev"]))
     print()
+    print("First audio: p95 time to the first sentence's audio, worst sentence length.")
+    print("Stream 1st:  p95 time to Sherpa's first streamed chunk for the whole text.")
 
-    for name, text in TEXTS.items():
-        print(f"Test: {name} ({len(text)} chars)")
-        print(f'Text: "{text[:50]}..."' if len(text) > 50 else f'Text: "{text}"')
-        print("-" * 50)
-
-        # Piper
-        print("  Piper:      ", end="", flush=True)
-        piper_result = benchmark_piper(text)
-        if "error" in piper_result:
-            print(f"ERROR - {piper_result['error']}")
-        else:
-            print(f"{piper_result['generation_ms']}ms, {piper_result['audio_duration_s']}s audio, RTF={piper_result['rtf']}")
-
-        # Sherpa-ONNX
-        print("  Sherpa-ONNX:", end="", flush=True)
-        sherpa_result = benchmark_sherpa(text)
-        if "error" in sherpa_result:
-            print(f"ERROR - {sherpa_result['error']}")
-        else:
-            print(f"{sherpa_result['generation_ms']}ms, {sherpa_result['audio_duration_s']}s audio, RTF={sherpa_result['rtf']}")
-
-        # Supertonic
-        print("  Supertonic: ", end="", flush=True)
-        super_result = benchmark_supertonic(text)
-        if "error" in super_result:
-            print(f"ERROR - {super_result['error']}")
-        else:
-            print(f"{super_result['generation_ms']}ms, {super_result['audio_duration_s']}s audio, RTF={super_result['rtf']}")
 
-        print()
+def main():
+    ap = argparse.ArgumentParser(description="Compare TTS engines as the assistant uses them")
+    ap.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES, help="Engines to test")
+    ap.add_argument("--threads", nargs="+", type=int, default=[1, 2, 3, 4], help="SHERPA_TTS_THREADS values")
+    ap.add_argument("--precisions", nargs="+", choices=["fp32", "int8"], default=["fp32", "int8"],
+                    help="Sherpa model variants")
+    ap.add_argument("--iterations", "-n", type=int, default=3, help="Renders per text")
+    ap.add_argument("--texts", help="File of replies, one per line (default: built-in corpus)")
+    ap.add_argument("--timeout", type=int, default=900, help="Seconds allowed per configuration")
+    ap.add_argument("--output", "-o", help="Write results as JSON to this file")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    texts = load_texts(args.texts) if args.texts else TEXTS
+    if args.worker:
+        # Keep stdout for the result line: engines may print while loading
+        out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        out.write(json.dumps(run_config(json.loads(args.worker), texts, args.iterations)) + "\n")
+        out.flush()
+        return
 
     print("=" * 70)
-    print("Summary")
+    print("TTS Engine Comparison: Piper vs Sherpa-ONNX vs Supertonic on Pi 5")
     print("=" * 70)
     print()
-    print("| Engine      | Quality    | RTF Target | Pros                              |")
-    print("|-------------|------------|------------|-----------------------------------|")
-    print("| Piper       | 22050Hz    | ~0.13-0.26 | Many voices, mature               |")
-    print("| Sherpa-ONNX | 22050Hz    | ~0.05-0.10 | NEON-optimized, fastest on ARM    |")
-    print("| Supertonic  | 44100Hz    | ~0.14      | Higher quality, modern ONNX       |")
-    print()
+
+    results = []
+    for config in configurations(args):
+        print(f"{label(config)}:", flush=True)
+        result = benchmark(config, args)
+        results.append({"config": config, "result": result})
+        if "error" in result:
+            print(f"  ERROR - {result['error']}")
+            continue
+        print(f"  cold {result['cold_first_ms']}ms, warm {result['warm_first_ms']}ms, "
+              f"{result['sample_rate']}Hz, RSS {result['peak_rss_mb']}MB (+{result['worker_rss_mb']}MB workers)")
+        for name, bucket in result["texts"].items():
+            gen, rtf, first = bucket["gen_ms"], bucket["rtf"], bucket["first_audio_ms"]
+            line = (f"  {name:<7} gen {round(gen['mean'])}ms ±{round(gen['stdev'])}, RTF={rtf['mean']} ±{rtf['stdev']}, "
+                    f"first audio p50 {round(first['p50'])}ms p95 {round(first['p95'])}ms")
+            if bucket["stream_first_ms"]:
+                line += f", streamed p50 {round(bucket['stream_first_ms']['p50'])}ms"
+            print(line)
+        print()
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"iterations": args.iterations, "texts": texts, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
 
 
 if __name__ == "__main__":
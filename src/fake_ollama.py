@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for hailo-ollama, for exercising the LLM client, scheduler,
+caching and cancellation without Hailo hardware.
+
+Serves /api/generate and /api/chat (NDJSON streaming or one JSON reply) and
+/api/tags, at a configurable time-to-first-token and token rate. Failure
+injection:
+  --stall-after N --stall-seconds S   pause S seconds after the Nth token
+  --truncate-after N                  end the stream after N tokens, without a done message
+  --hang-after N                      imitate the Pi 5 + Hailo PCIe DMA hang after every N requests
+  --hang-tokens T --hang-window W     ...or once T tokens were generated within W seconds
+During a hang every request stalls without a byte until --hang-seconds have passed.
+
+--script takes a JSON file with a list of per-request overrides, used in
+order (one per request; a plain string is just a reply), e.g.
+    ["Paris.", {"ttft": 2.0}, {"truncate_after": 3}, {"status": 500}, {"hang": true}]
+Keys: reply, ttft, tps, stall_after, stall_seconds, truncate_after, hang, status.
+
+From Python (benchmarks, tests):
+    with FakeOllama(ttft=0.05, tps=50) as fake:
+        client = LLMClient(fake.url, "qwen2:1.5b")
+    # pytest: the `fake_ollama` fixture below (imported by tests/conftest.py)
+
+Usage:
+    python3 src/fake_ollama.py --port 8000 --ttft 0.3 --tps 8
+    python3 src/fake_ollama.py --hang-tokens 200 --hang-window 30 --hang-seconds 60
+    python3 src/fake_ollama.py --script replies.json --stall-after 5 --stall-seconds 3
+    OLLAMA_HOST=http://127.0.0.1:8000 python3 src/voice_assistant_pi.py --once "hello"
+"""
+import argparse
+import collections
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "Hello! I am a fake model running on your computer. How can I help you today?"
+DEFAULT_MODELS = ["qwen2:1.5b", "qwen2.5-instruct:1.5b", "llama3.2:1b"]
+
+# Per-request behaviour a --script entry may override
+PLAN_KEYS = ("reply", "ttft", "tps", "stall_after", "stall_seconds", "truncate_after", "hang", "status")
+
+
+class FakeOllama:
+    """Behaviour and state shared by all request handlers. Also a context manager that runs the server."""
+
+    def __init__(self, ttft: float = 0.3, tps: float = 8.0, reply: str = DEFAULT_REPLY,
+                 hang_after: int = 0, hang_tokens: int = 0, hang_window: float = 30.0, hang_seconds: float = 60.0,
+                 stall_after: int = 0, stall_seconds: float = 0.0, truncate_after: int = 0, script: list = None,
+                 models: list = None):
+        self.ttft = ttft
+        self.tps = tps
+        self.reply = reply
+        self.hang_after = hang_after  # Hang on the request after this many since the last hang (0 = never)
+        self.hang_tokens = hang_tokens  # Hang once this many tokens were generated within hang_window (0 = never)
+        self.hang_window = hang_window
+        self.hang_seconds = hang_seconds
+        self.stall_after = stall_after  # Pause stall_seconds after this many tokens (0 = never)
+        self.stall_seconds = stall_seconds
+        self.truncate_after = truncate_after  # End streams after this many tokens, without done (0 = never)
+        self.script = collections.deque(script or [])  # Per-request overrides, consumed in order
+        self.models = models or DEFAULT_MODELS
+        self.requests = 0
+        self.hangs = 0
+        self.cancelled = 0  # Streams the client closed before the end
+        self.log = []  # (path, request body) of every generation request, for assertions
+        self.server = None
+        self._hung_until = 0.0
+        self._hung_at = 0  # Request count when the last hang started
+        self._recent = collections.deque()  # (time, tokens) generated within hang_window
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server (for LLMClient / OLLAMA_HOST)."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOllama":
+        self.server = serve(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def admit(self) -> bool:
+        """Count a request; False if the simulated NPU is (or just went) hung."""
+        with self._lock:
+            now = time.monotonic()
+            self.requests += 1
+            while self._recent and now - self._recent[0][0] > self.hang_window:
+                self._recent.popleft()
+            load = sum(n for _, n in self._recent)
+            overloaded = self.hang_tokens and load >= self.hang_tokens
+            if now >= self._hung_until and (overloaded or (self.hang_after
+                                                            and self.requests - self._hung_at > self.hang_after)):
+                self._hung_until = now + self.hang_seconds
+                self._hung_at = self.requests
+                self._recent.clear()
+                self.hangs += 1
+                print(f"[fake-ollama] Simulating PCIe DMA hang for {self.hang_seconds}s "
+                      f"(request {self.requests}, {load} recent tokens)", file=sys.stderr, flush=True)
+            return now >= self._hung_until
+
+    def plan(self, path: str, body: dict) -> dict:
+        """Behaviour for one request: the defaults, overridden by the next --script entry if any."""
+        with self._lock:
+            self.log.append((path, body))
+            step = self.script.popleft() if self.script else {}
+        if isinstance(step, str):
+            step = {"reply": step}
+        plan = {key: getattr(self, key, None) for key in PLAN_KEYS}
+        plan.update(hang=False, status=200)
+        plan.update({key: value for key, value in step.items() if key in PLAN_KEYS})
+        return plan
+
+    def record_tokens(self, n: int) -> None:
+        with self._lock:
+            self._recent.append((time.monotonic(), n))
+
+    @staticmethod
+    def context(body: dict, tokens: list) -> list:
+        """Stand-in token context: the request's context plus one id per prompt word and reply token."""
+        previous = body.get("context") or []
+        return previous + [1] * len(body.get("prompt", "").split()) + [2] * len(tokens)
+
+    @staticmethod
+    def tokens(reply: str, max_tokens: int = None) -> list:
+        words = reply.split(" ")
+        tokens = [w + " " for w in words[:-1]] + words[-1:]
+        return tokens[:max_tokens] if max_tokens else tokens
+
+
+def make_handler(fake: FakeOllama):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def do_GET(self):
+            if self.path != "/api/tags":
+                self.send_error(404)
+                return
+            self._send_json({"models": [{"name": name, "model": name, "size": 0} for name in fake.models]})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path not in ("/api/generate", "/api/chat"):
+                self.send_error(404)
+                return
+            chat = self.path == "/api/chat"
+            plan = fake.plan(self.path, body)
+            if not fake.admit() or plan["hang"]:
+                time.sleep(fake.hang_seconds)  # Hung NPU: the request never gets an answer
+                self.close_connection = True
+                return
+            if plan["status"] != 200:
+                self.send_error(plan["status"])
+                return
+            try:
+                self._generate(body, plan, chat)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client cancelled mid-stream: not an error for a stand-in server
+                with fake._lock:
+                    fake.cancelled += 1
+                self.close_connection = True
+
+        def _generate(self, body: dict, plan: dict, chat: bool):
+            tokens = fake.tokens(plan["reply"], body.get("options", {}).get("num_predict"))
+            start = time.monotonic()
+            if not body.get("stream", True):
+                time.sleep(plan["ttft"] + len(tokens) / plan["tps"])
+                fake.record_tokens(len(tokens))
+                self._send_json({**self._message(body, "".join(tokens), chat), "done": True,
+                                 **self._final(body, tokens, chat), "eval_count": len(tokens)})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            time.sleep(plan["ttft"])
+            eval_start = time.monotonic()
+            for i, token in enumerate(tokens):
+                if plan["truncate_after"] and i >= plan["truncate_after"]:
+                    fake.record_tokens(i)
+                    self._end_chunks()  # Stream just stops: no done message
+                    self.close_connection = True
+                    return
+                if plan["stall_after"] and i == plan["stall_after"]:
+                    time.sleep(plan["stall_seconds"])
+                elif i:
+                    time.sleep(1.0 / plan["tps"])
+                self._send_chunk({**self._message(body, token, chat), "done": False})
+            fake.record_tokens(len(tokens))
+            self._send_chunk({**self._message(body, "", chat), "done": True, **self._final(body, tokens, chat),
+                              "eval_count": len(tokens), "eval_duration": int((time.monotonic() - eval_start) * 1e9),
+                              "total_duration": int((time.monotonic() - start) * 1e9)})
+            self._end_chunks()
+
+        @staticmethod
+        def _message(body: dict, text: str, chat: bool) -> dict:
+            if chat:
+                return {"model": body.get("model"), "message": {"role": "assistant", "content": text}}
+            return {"model": body.get("model"), "response": text}
+
+        @staticmethod
+        def _final(body: dict, tokens: list, chat: bool) -> dict:
+            return {} if chat else {"context": fake.context(body, tokens)}
+
+        def _send_chunk(self, obj: dict):
+            data = (json.dumps(obj) + "\n").encode("utf-8")
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _end_chunks(self):
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        def _send_json(self, obj: dict):
+            data = json.dumps(obj).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients abort streams by resetting the socket; only report real failures
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def serve(fake: FakeOllama, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the server on a background thread; returns it (server.server_port has the bound port)."""
+    server = _Server((host, port), make_handler(fake))
+    fake.server = server
+    threading.Thread(target=server.serve_forever, name="FakeOllama", daemon=True).start()
+    return server
+
+
+try:
+    import pytest
+except ImportError:
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def fake_ollama():
+        """A fast, deterministic FakeOllama on a free port; adjust its attributes or .script per test."""
+        with FakeOllama(ttft=0.01, tps=200.0) as fake:
+            yield fake
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fake hailo-ollama server for local testing")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--ttft", type=float, default=0.3, help="Seconds before the first token")
+    ap.add_argument("--tps", type=float, default=8.0, help="Tokens per second after the first")
+    ap.add_argument("--reply", default=DEFAULT_REPLY, help="Reply text (one token per word)")
+    ap.add_argument("--script", help="JSON file: list of per-request overrides, used in order")
+    ap.add_argument("--stall-after", type=int, default=0, help="Pause after this many tokens (0 = never)")
+    ap.add_argument("--stall-seconds", type=float, default=5.0, help="Length of the --stall-after pause")
+    ap.add_argument("--truncate-after", type=int, default=0,
+                    help="End every stream after this many tokens, without a done message (0 = never)")
+    ap.add_argument("--hang-after", type=int, default=0, help="Hang after every N requests (0 = never)")
+    ap.add_argument("--hang-tokens", type=int, default=0,
+                    help="Hang once this many tokens were generated within --hang-window (0 = never)")
+    ap.add_argument("--hang-window", type=float, default=30.0, help="Seconds of load history for --hang-tokens")
+    ap.add_argument("--hang-seconds", type=float, default=60.0, help="How long a hang lasts")
+    args = ap.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+    fake = FakeOllama(args.ttft, args.tps, args.reply, args.hang_after, args.hang_tokens,
+                      args.hang_window, args.hang_seconds, args.stall_after, args.stall_seconds,
+                      args.truncate_after, script)
+    server = serve(fake, args.host, args.port)
+    print(f"Fake Ollama on http://{args.host}:{server.server_port}", file=sys.stderr, flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
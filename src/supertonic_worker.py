@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Resident Supertonic TTS worker, started by voice_assistant_pi.py in Supertonic's own
+virtualenv (onnxruntime, soundfile, librosa may not be in system Python).
+
+The model is loaded once; voice styles are cached per voice name.
+
+Protocol (stdin/stdout, one request at a time):
+  startup  -> {"ready": true, "sample_rate": 44100}\n
+  request  <- {"text": "...", "voice": "M1", "steps": 3, "speed": 1.2}\n
+  response -> {"ok": true, "sample_rate": 44100, "nbytes": N}\n followed by N bytes of s16le mono PCM
+              {"ok": false, "error": "..."}\n on failure
+
+Usage (normally spawned automatically):
+    ~/supertonic/py/.venv/bin/python src/supertonic_worker.py --dir ~/supertonic/py
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Resident Supertonic TTS worker")
+    ap.add_argument("--dir", required=True, help="Supertonic python directory (contains helper.py and assets/)")
+    args = ap.parse_args()
+
+    # Keep the protocol stream clean: anything the libraries print goes to stderr
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    os.chdir(args.dir)
+    sys.path.insert(0, args.dir)
+
+    import numpy as np
+    from helper import load_text_to_speech, load_voice_style
+
+    tts = load_text_to_speech("assets/onnx", use_gpu=False)
+    sample_rate = int(getattr(tts, "sample_rate", 44100))
+    styles = {}
+
+    def reply(header: dict, payload: bytes = b""):
+        out.write((json.dumps(header) + "\n").encode("utf-8"))
+        if payload:
+            out.write(payload)
+        out.flush()
+
+    reply({"ready": True, "sample_rate": sample_rate})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            req = json.loads(line)
+            voice = req.get("voice", "M1")
+            if voice not in styles:
+                style_path = os.path.join(args.dir, "assets", "voice_styles", f"{voice}.json")
+                styles[voice] = load_voice_style([style_path])
+            audio, _ = tts(req["text"], "en", styles[voice],
+                           total_step=int(req.get("steps", 3)), speed=float(req.get("speed", 1.2)))
+            pcm = (np.clip(audio[0], -1.0, 1.0) * 32767).astype("<i2").tobytes()
+            reply({"ok": True, "sample_rate": sample_rate, "nbytes": len(pcm)}, pcm)
+        except Exception as e:
+            reply({"ok": False, "error": str(e)[:200]})
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,9 @@
 """
 Test Qwen model on Pi (hailo-ollama) from this machine.
 Pi: hailo-ollama on port 8000 (not 11434 — that's standard ollama on Pi).
+--fake runs against a local fake server instead (src/fake_ollama.py).
 """
 import argparse
-import json
 import sys
 
 try:
@@ -13,82 +13,46 @@ except ImportError:
     print("Install requests: pip install requests", file=sys.stderr)
     sys.exit(1)
 
+from fake_ollama import FakeOllama
+from voice_assistant_pi import LLMClient
+
 DEFAULT_HOST = "http://pi5.local:8000"
 MODEL = "qwen2:1.5b"
 
 
+def make_client(host: str) -> LLMClient:
+    # One-off manual test: no cooldown between the calls this script makes
+    return LLMClient(host, MODEL, timeout=120, cooldown=0)
+
+
 def list_models(host: str) -> list:
-    r = requests.get(f"{host}/api/tags", timeout=10)
-    r.raise_for_status()
-    data = r.json()
-    return data.get("models", [])
+    return make_client(host).list_models()
 
 
 def generate(host: str, prompt: str, stream: bool = False) -> str:
-    payload = {
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": stream,
-    }
-    r = requests.post(
-        f"{host}/api/generate",
-        json=payload,
-        headers={"Content-Type": "application/json"},
-        timeout=120,
-        stream=stream,
-    )
-    r.raise_for_status()
+    client = make_client(host)
     if stream:
-        out = []
-        for line in r.iter_lines():
-            if line:
-                chunk = json.loads(line)
-                if chunk.get("response"):
-                    out.append(chunk["response"])
-                if chunk.get("done"):
-                    break
-        return "".join(out)
-    return r.json().get("response", "")
+        out = client.stream_generate(prompt)
+        for _ in out:
+            pass
+        print(f"[{out.timing}]", file=sys.stderr)
+        return out.text
+    return client.generate(prompt)
 
 
 def chat(host: str, messages: list[dict], stream: bool = False) -> str:
-    payload = {
-        "model": MODEL,
-        "messages": messages,
-        "stream": stream,
-    }
-    r = requests.post(
-        f"{host}/api/chat",
-        json=payload,
-        headers={"Content-Type": "application/json"},
-        timeout=120,
-        stream=stream,
-    )
-    r.raise_for_status()
+    client = make_client(host)
     if stream:
-        out = []
-        for line in r.iter_lines():
-            if line:
-                chunk = json.loads(line)
-                if chunk.get("message", {}).get("content"):
-                    out.append(chunk["message"]["content"])
-                if chunk.get("done"):
-                    break
-        return "".join(out)
-    return r.json().get("message", {}).get("content", "")
-
-
-def main():
-    p = argparse.ArgumentParser(description="Test Qwen on Pi (hailo-ollama)")
-    p.add_argument("--host", default=DEFAULT_HOST, help=f"hailo-ollama base URL (default: {DEFAULT_HOST})")
-    p.add_argument("--list", action="store_true", help="List available models")
-    p.add_argument("--prompt", "-p", default="Say hello in one short sentence.", help="Prompt for /api/generate")
-    p.add_argument("--chat", action="store_true", help="Use /api/chat with a single user message")
-    p.add_argument("--stream", action="store_true", help="Stream response")
-    args = p.parse_args()
+        out = client.stream_chat(messages)
+        for _ in out:
+            pass
+        print(f"[{out.timing}]", file=sys.stderr)
+        return out.text
+    return client.chat(messages)
 
-    host = args.host.rstrip("/")
 
+def run(host: str, args):
+    """List models or send the prompt, against host."""
     if args.list:
         models = list_models(host)
         print("Models on Pi (hailo-ollama):")
@@ -109,5 +73,22 @@ def main():
         sys.exit(1)
 
 
+def main():
+    p = argparse.ArgumentParser(description="Test Qwen on Pi (hailo-ollama)")
+    p.add_argument("--host", default=DEFAULT_HOST, help=f"hailo-ollama base URL (default: {DEFAULT_HOST})")
+    p.add_argument("--list", action="store_true", help="List available models")
+    p.add_argument("--prompt", "-p", default="Say hello in one short sentence.", help="Prompt for /api/generate")
+    p.add_argument("--chat", action="store_true", help="Use /api/chat with a single user message")
+    p.add_argument("--stream", action="store_true", help="Stream response")
+    p.add_argument("--fake", action="store_true", help="Use a local fake hailo-ollama instead of --host")
+    args = p.parse_args()
+
+    if args.fake:
+        with FakeOllama(ttft=0.3, tps=8.0) as fake:
+            run(fake.url, args)
+    else:
+        run(args.host.rstrip("/"), args)
+
+
 if __name__ == "__main__":
     main()
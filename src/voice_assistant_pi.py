@@ -23,18 +23,25 @@ Usage:
   python3 voice_assistant_pi.py --once "Hello"
 """
 import argparse
+import asyncio
+import atexit
+import bisect
+import collections
 import gc
+import itertools
 import json
 import logging
 import os
 import queue
 import re
+import socket
 import subprocess
 import sys
 import tempfile
 import threading
 import time
 import wave
+import weakref
 
 OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://127.0.0.1:8000")
 MODEL = os.environ.get("OLLAMA_MODEL", "qwen2:1.5b")
@@ -53,10 +60,13 @@ PIPER_NOISE_W = os.environ.get("PIPER_NOISE_W", "0.85")
 PIPER_BIN = os.environ.get("PIPER_BIN", os.path.expanduser("~/piper/piper"))
 PIPER_ESPEAK_DATA = os.environ.get("PIPER_ESPEAK_DATA", os.path.expanduser("~/piper/espeak-ng-data"))
 PIPER_LD_LIBRARY_PATH = os.environ.get("PIPER_LD_LIBRARY_PATH", os.path.expanduser("~/piper"))
+# Keep one Piper process (and its loaded voice) alive between sentences; "0" = launch Piper per call
+PIPER_WORKER = os.environ.get("PIPER_WORKER", "1") != "0"
 
 # Sherpa-ONNX TTS settings (VITS models, NEON-optimized for Pi 5)
 SHERPA_TTS_MODEL = os.environ.get("SHERPA_TTS_MODEL", os.path.expanduser("~/tts-models/vits-piper-en_US-joe-medium"))
 SHERPA_TTS_THREADS = int(os.environ.get("SHERPA_TTS_THREADS", "4"))  # Pi 5 has 4 cores
+SHERPA_TTS_PRECISION = os.environ.get("SHERPA_TTS_PRECISION", "fp32")  # "int8" uses the model's *.int8.onnx
 SHERPA_TTS_SPEAKER = int(os.environ.get("SHERPA_TTS_SPEAKER", "0"))  # Speaker ID for multi-speaker models
 SHERPA_TTS_SPEED = float(os.environ.get("SHERPA_TTS_SPEED", "1.0"))  # Speech speed (1.0 = normal)
 
@@ -64,6 +74,18 @@ SHERPA_TTS_SPEED = float(os.environ.get("SHERPA_TTS_SPEED", "1.0"))  # Speech sp
 KWS_MODEL = os.environ.get("KWS_MODEL", os.path.expanduser("~/tts-models/sherpa-onnx-kws-zipformer-gigaspeech-3.3M-2024-01-01"))
 KWS_KEYWORD = os.environ.get("KWS_KEYWORD", "hey homer")  # Wake word phrase
 KWS_THRESHOLD = float(os.environ.get("KWS_THRESHOLD", "0.5"))  # Detection threshold (lower = more sensitive)
+# Cheap cascade in front of the KWS network: it only runs while this gate is open
+KWS_GATE = os.environ.get("KWS_GATE", "1") != "0"
+KWS_GATE_RATIO = float(os.environ.get("KWS_GATE_RATIO", "3.0"))  # Open when chunk RMS exceeds the noise floor by this factor
+KWS_GATE_MIN_RMS = float(os.environ.get("KWS_GATE_MIN_RMS", "0.002"))  # Below this level a chunk never opens the gate
+KWS_GATE_FLUX = float(os.environ.get("KWS_GATE_FLUX", "0.6"))  # Or when spectral flux exceeds this (stationary noise ~0.3)
+KWS_GATE_HOLD_MS = int(os.environ.get("KWS_GATE_HOLD_MS", "1500"))  # Keep the gate open this long after the last trigger
+KWS_GATE_PREROLL_MS = int(os.environ.get("KWS_GATE_PREROLL_MS", "400"))  # Audio before the trigger replayed into the KWS
+KWS_GATE_VAD = os.environ.get("KWS_GATE_VAD", "0") == "1"  # Also require Silero VAD to hear speech before running the KWS
+# In-session command spotting with the KWS model (voice commands without STT/LLM); "0" disables
+COMMAND_SPOTTING = os.environ.get("COMMAND_SPOTTING", "1") != "0"
+COMMAND_THRESHOLD = float(os.environ.get("COMMAND_THRESHOLD", "0.6"))  # Stricter than the wake word: spoken mid-conversation
+COMMAND_MAX_UTTERANCE_MS = int(os.environ.get("COMMAND_MAX_UTTERANCE_MS", "1500"))  # Only act if the command opens the utterance
 POST_WAKE_GRACE_MS = int(os.environ.get("POST_WAKE_GRACE_MS", "2500"))  # Discard audio after wake word (avoid echo)
 SESSION_TIMEOUT_S = int(os.environ.get("SESSION_TIMEOUT_S", "60"))  # Seconds of silence before returning to wake word mode
 MIN_SPEECH_DURATION = float(os.environ.get("MIN_SPEECH_DURATION", "0.5"))  # Min speech length to trigger VAD
@@ -71,11 +93,19 @@ MIN_SPEECH_DURATION = float(os.environ.get("MIN_SPEECH_DURATION", "0.5"))  # Min
 # Supertonic TTS settings
 SUPERTONIC_DIR = os.environ.get("SUPERTONIC_DIR", os.path.expanduser("~/supertonic/py"))
 SUPERTONIC_VOICE = os.environ.get("SUPERTONIC_VOICE", "M1")  # Options: M1, M2, F1, F2
-SUPERTONIC_VENV = os.environ.get("SUPERTONIC_VENV", None)  # Path to venv, or None to use system Python
+SUPERTONIC_VENV = os.environ.get("SUPERTONIC_VENV", None)  # Path to venv, or None for SUPERTONIC_DIR/.venv (else system Python)
+SUPERTONIC_STEPS = int(os.environ.get("SUPERTONIC_STEPS", "3"))  # Denoising steps (fewer = faster, rougher)
+SUPERTONIC_SPEED = float(os.environ.get("SUPERTONIC_SPEED", "1.2"))
 
 # STT: "faster-whisper" (recommended), "whisper.cpp", or "whisper" (openai)
-STT_ENGINE = os.environ.get("STT_ENGINE", "faster-whisper")
+STT_ENGINE = os.environ.get("STT_ENGINE", "faster-whisper")  # ...or "sherpa-streaming" (partials while you speak)
 STT_MODEL = os.environ.get("STT_MODEL", "base.en")  # tiny.en (fast), base.en (balanced), small.en (accurate but slow)
+STT_COMPUTE_TYPE = os.environ.get("STT_COMPUTE_TYPE", "int8")  # faster-whisper quantization: int8, int8_float32, float32
+STT_THREADS = int(os.environ.get("STT_THREADS", "0"))  # CPU threads for STT (0 = library default)
+STT_BEAM_SIZE = int(os.environ.get("STT_BEAM_SIZE", "5"))  # faster-whisper beam width (1 = greedy); see src/benchmark_stt.py
+STT_VAD_FILTER = os.environ.get("STT_VAD_FILTER", "0") == "1"  # faster-whisper Silero VAD pass before decoding
+# Streaming STT: sherpa-onnx online zipformer (encoder/decoder/joiner) or paraformer (encoder/decoder) model dir
+STREAMING_STT_MODEL = os.environ.get("STREAMING_STT_MODEL", os.path.expanduser("~/sherpa_models/sherpa-onnx-streaming-zipformer-en-20M-2023-02-17"))
 WHISPER_CPP_BIN = os.environ.get("WHISPER_CPP_BIN", os.path.expanduser("~/whisper.cpp/main"))
 WHISPER_CPP_MODEL = os.environ.get("WHISPER_CPP_MODEL", os.path.expanduser("~/whisper.cpp/models/ggml-tiny.en.bin"))
 
@@ -88,15 +118,56 @@ VAD_THRESHOLD = float(os.environ.get("VAD_THRESHOLD", "0.5"))  # Voice activity
 # Resource guardrails
 MAX_MEMORY_PERCENT = int(os.environ.get("MAX_MEMORY_PERCENT", "85"))  # Warn at this % memory usage
 CRITICAL_MEMORY_PERCENT = int(os.environ.get("CRITICAL_MEMORY_PERCENT", "95"))  # Force cleanup at this %
+MODEL_IDLE_SECONDS = float(os.environ.get("MODEL_IDLE_SECONDS", "30"))  # Above MAX_MEMORY_PERCENT, evict models unused this long
 LLM_TIMEOUT = int(os.environ.get("LLM_TIMEOUT", "30"))  # Timeout for LLM requests (seconds)
 LLM_MAX_TOKENS = int(os.environ.get("LLM_MAX_TOKENS", "80"))  # Max output tokens (prevents PCIe DMA hang on Pi 5 + Hailo x1)
-LLM_COOLDOWN = float(os.environ.get("LLM_COOLDOWN", "30"))  # Min seconds between LLM calls (prevents PCIe crash)
+LLM_COOLDOWN = float(os.environ.get("LLM_COOLDOWN", "30"))  # Fixed scheduler: min seconds between calls; adaptive: max failure backoff
+LLM_SCHEDULER = os.environ.get("LLM_SCHEDULER", "adaptive")  # adaptive (token bucket learned from replies), fixed (LLM_COOLDOWN between calls)
+LLM_TOKEN_BUDGET = int(os.environ.get("LLM_TOKEN_BUDGET", "160"))  # Adaptive: tokens the NPU may generate back-to-back
+LLM_TOKEN_RATE = float(os.environ.get("LLM_TOKEN_RATE", "3"))  # Adaptive: sustained tokens/s refilled into the budget
+# Speculative dispatch (needs --stt sherpa-streaming): start the LLM once the partial transcript is stable
+SPECULATIVE_LLM = os.environ.get("SPECULATIVE_LLM", "0") == "1"
+SPECULATIVE_STABLE_MS = int(os.environ.get("SPECULATIVE_STABLE_MS", "300"))  # Partial unchanged this long → dispatch
+SPECULATIVE_MATCH_RATIO = float(os.environ.get("SPECULATIVE_MATCH_RATIO", "1.0"))  # Word similarity final vs partial to keep it
+LLM_CONTEXT_TOKENS = int(os.environ.get("LLM_CONTEXT_TOKENS", "1024"))  # Conversation token budget before truncation (0 = single-turn)
+LLM_HISTORY_TURNS = int(os.environ.get("LLM_HISTORY_TURNS", "3"))  # Turns kept when the conversation is reseeded
+LLM_KEEP_ALIVE = os.environ.get("LLM_KEEP_ALIVE", "10m")  # Ollama keep_alive: keep the model loaded between turns ("" = server default)
 LLM_SYSTEM_PROMPT = os.environ.get("LLM_SYSTEM_PROMPT", "You are Homer, a voice assistant. Answer in one short sentence. Be concise and direct.")
 TTS_TIMEOUT = int(os.environ.get("TTS_TIMEOUT", "30"))  # Timeout for TTS (seconds)
+TTS_PIPELINE_DEPTH = int(os.environ.get("TTS_PIPELINE_DEPTH", "2"))  # Synthesized sentences buffered ahead of playback
+
+# Audio output sink: "auto" (sounddevice, else pipe), "sounddevice", "pipe" (one long-lived paplay/aplay),
+# "null" (discard, for headless runs), or "file:/path/out.wav"
+AUDIO_SINK = os.environ.get("AUDIO_SINK", "auto")
+AUDIO_SINK_BUFFER_MS = int(os.environ.get("AUDIO_SINK_BUFFER_MS", "100"))  # Device buffer; lower = less latency, more underrun risk
+
+# Synthesized-phrase cache (in-memory LRU + on-disk raw PCM, keyed by engine/voice/speaker/speed/text)
+PCM_CACHE_DIR = os.environ.get("PCM_CACHE_DIR", os.path.expanduser("~/.cache/doh-voice/pcm"))
+PCM_CACHE_MEMORY_MB = int(os.environ.get("PCM_CACHE_MEMORY_MB", "32"))  # 0 disables the cache
+PCM_CACHE_DISK_MB = int(os.environ.get("PCM_CACHE_DISK_MB", "128"))  # 0 = memory only
+PCM_CACHE_PREWARM = os.environ.get("PCM_CACHE_PREWARM", "")  # Optional file with extra phrases, one per line
+
+# Local intents (time, date, arithmetic, units, timers) answered without the LLM
+LOCAL_INTENTS = os.environ.get("LOCAL_INTENTS", "1") != "0"
+INTENT_MIN_CONFIDENCE = float(os.environ.get("INTENT_MIN_CONFIDENCE", "0.8"))  # Below this the LLM answers instead
+
+# Answer cache for repeated opening questions (normalized transcript -> LLM answer)
+ANSWER_CACHE_PATH = os.environ.get("ANSWER_CACHE_PATH", os.path.expanduser("~/.cache/doh-voice/answers.json"))  # "" = memory only
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "200"))  # Max answers kept (0 disables the cache)
+ANSWER_CACHE_TTL = float(os.environ.get("ANSWER_CACHE_TTL", "21600"))  # Seconds an answer stays valid (default 6h)
+ANSWER_CACHE_PCM = os.environ.get("ANSWER_CACHE_PCM", "1") != "0"  # Also keep the answers' audio in the PCM disk cache
 WATCHDOG_TIMEOUT = int(os.environ.get("WATCHDOG_TIMEOUT", "60"))  # Max seconds between heartbeats
 
+# Per-turn latency tracing and the Prometheus endpoint
+TRACE_PATH = os.environ.get("TRACE_PATH", os.path.expanduser("~/.cache/doh-voice/turns.jsonl"))  # "" = no JSONL file
+TRACE_MAX_MB = int(os.environ.get("TRACE_MAX_MB", "5"))  # Rotate the JSONL file to .1 beyond this size
+TRACE_WINDOW = int(os.environ.get("TRACE_WINDOW", "500"))  # Turns kept for the rolling p50/p95/p99
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9108"))  # GET /metrics (Prometheus text); 0 disables
+
 # Audio gain (software AGC for quiet microphones)
 AUDIO_GAIN = float(os.environ.get("AUDIO_GAIN", "3.0"))  # Multiply audio signal by this factor (1.0 = no gain)
+AUDIO_CAPTURE_SECONDS = float(os.environ.get("AUDIO_CAPTURE_SECONDS", "2.0"))  # Capture ring: how far detection may lag
 
 # Configure logging
 logging.basicConfig(
@@ -106,11 +177,439 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def apply_agc(samples):
-    """Apply software gain to boost quiet audio. Clips output to [-1, 1]."""
+def apply_agc(samples, out=None):
+    """Apply software gain to boost quiet audio. Clips output to [-1, 1] (in place when out is given)."""
+    import numpy as np
+    boosted = np.multiply(samples, AUDIO_GAIN, out=out, dtype=np.float32)
+    np.minimum(boosted, 1.0, out=boosted)
+    return np.maximum(boosted, -1.0, out=boosted)
+
+
+class AudioRing:
+    """
+    Preallocated capture front end: the last `seconds` of microphone audio as
+    float32 in [-1, 1], with software gain applied.
+
+    Each int16 chunk is scaled, gained and clipped in place into the next slot,
+    so steady-state capture allocates no sample arrays. push() returns a view of
+    that slot for VAD, KWS and meters; it stays valid until the ring wraps.
+    """
+
+    def __init__(self, chunk_size: int, seconds: float = 5.0, sample_rate: int = 16000, gain: float = None):
+        import numpy as np
+        self.chunk_size = chunk_size
+        self.slots = max(2, int(seconds * sample_rate / chunk_size))
+        self.buffer = np.zeros(self.slots * chunk_size, dtype=np.float32)
+        self.scale = (AUDIO_GAIN if gain is None else gain) / 32768.0
+        self.chunks = 0  # Total chunks pushed
+        self.rms = 0.0  # Level of the latest chunk, after gain
+        self.peak = 0.0
+        self._views = [self.buffer[i * chunk_size:(i + 1) * chunk_size] for i in range(self.slots)]
+
+    def push(self, pcm):
+        """Convert an int16 chunk (array or buffer) into the next slot and return its view."""
+        import numpy as np
+        if not isinstance(pcm, np.ndarray):
+            pcm = np.frombuffer(pcm, dtype=np.int16)
+        slot = self._views[self.chunks % self.slots]
+        # Cast then scale in the slot; a mixed int16*float ufunc would go through a temporary buffer
+        np.copyto(slot, pcm.reshape(-1), casting="unsafe")
+        np.multiply(slot, self.scale, out=slot)
+        np.minimum(slot, 1.0, out=slot)
+        np.maximum(slot, -1.0, out=slot)
+        self.chunks += 1
+        self.rms = float(np.dot(slot, slot) / len(slot)) ** 0.5
+        self.peak = max(float(np.maximum.reduce(slot)), -float(np.minimum.reduce(slot)))
+        return slot
+
+    def latest(self, chunks: int = 1, out=None):
+        """Copy the last `chunks` chunks, oldest first, into out (preallocated) or a new array."""
+        import numpy as np
+        chunks = min(chunks, self.chunks, self.slots)
+        if out is None:
+            out = np.empty(chunks * self.chunk_size, dtype=np.float32)
+        for i in range(chunks):
+            view = self._views[(self.chunks - chunks + i) % self.slots]
+            out[i * self.chunk_size:(i + 1) * self.chunk_size] = view
+        return out[:chunks * self.chunk_size]
+
+
+class AudioCapture:
+    """
+    Microphone capture decoupled from detection.
+
+    A sounddevice callback (or, without sounddevice, a reader thread on a
+    parecord pipe) only copies int16 chunks into a preallocated single-producer
+    single-consumer ring; the listener drains it with read() at its own pace.
+    The producer owns the write counter and the consumer the read counter, so
+    the ring needs no lock. When the consumer falls a whole ring behind, new
+    chunks are dropped and counted as overflows; read() timeouts count as
+    underruns, and PortAudio's own input overflow flags are counted separately.
+    """
+
+    def __init__(self, sample_rate: int = 16000, chunk_size: int = 1600, seconds: float = AUDIO_CAPTURE_SECONDS):
+        import numpy as np
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.slots = max(2, int(seconds * sample_rate / chunk_size))
+        self.buffer = np.zeros((self.slots, chunk_size), dtype=np.int16)
+        self.backend = None
+        self.overflows = 0  # Capture blocks dropped because the consumer was a full ring behind
+        self.device_overflows = 0  # Input overflows reported by PortAudio
+        self.underruns = 0  # read() calls that timed out without audio
+        self.max_backlog = 0
+        self._written = 0  # Chunks published (producer only)
+        self._read = 0  # Chunks released (consumer only)
+        self._fill = 0  # Samples already in the slot being written
+        self._holding = False
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._stream = None
+        self._proc = None
+        self._reader = None
+
+    def start(self) -> "AudioCapture":
+        """Open sounddevice in callback mode, falling back to parecord."""
+        try:
+            import sounddevice as sd
+            self._stream = sd.InputStream(samplerate=self.sample_rate, channels=1, dtype="int16",
+                                          blocksize=self.chunk_size, callback=self._callback)
+            self._stream.start()
+            self.backend = "sounddevice"
+        except Exception as e:  # ImportError, or PortAudio could not open the device
+            self._stream = None
+            logger.info(f"[Capture] sounddevice unavailable ({e}), using parecord")
+            cmd = ["parecord", "--device=@DEFAULT_SOURCE@", "--raw",
+                   f"--rate={self.sample_rate}", "--channels=1", "--format=s16le"]
+            self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0)
+            self._reader = threading.Thread(target=self._read_pipe, name="AudioCapture", daemon=True)
+            self._reader.start()
+            self.backend = "parecord"
+        logger.info(f"[Capture] Using {self.backend} ({self.slots} x {self.chunk_size} sample ring)")
+        return self
+
+    def read(self, timeout: float = 1.0):
+        """
+        Next int16 chunk (a view into the ring, valid until the next read()), or None on timeout.
+        """
+        if self._holding:
+            self._read += 1  # Release the previous chunk to the producer
+            self._holding = False
+        while self._written == self._read:
+            self._ready.clear()
+            if self._written != self._read:
+                break
+            if not self._ready.wait(timeout) or self._stop.is_set():
+                if not self._stop.is_set():
+                    self.underruns += 1
+                return None
+        backlog = self._written - self._read
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+        self._holding = True
+        return self.buffer[self._read % self.slots]
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "chunks": self._written,
+            "backlog": self._written - self._read,
+            "max_backlog": self.max_backlog,
+            "overflows": self.overflows,
+            "device_overflows": self.device_overflows,
+            "underruns": self.underruns,
+        }
+
+    def close(self) -> None:
+        self._stop.set()
+        self._ready.set()
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        if self._proc is not None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+            self._proc = None
+
+    def _publish(self) -> None:
+        self._written += 1
+        self._fill = 0
+        self._ready.set()
+
+    def _callback(self, indata, frames, time_info, status) -> None:
+        """PortAudio thread: copy into the ring and return; nothing here may block."""
+        if status and status.input_overflow:
+            self.device_overflows += 1
+        samples = indata[:, 0]
+        offset = 0
+        while offset < frames:
+            if self._written - self._read >= self.slots:
+                self.overflows += 1
+                self._fill = 0
+                return
+            slot = self.buffer[self._written % self.slots]
+            n = min(self.chunk_size - self._fill, frames - offset)
+            slot[self._fill:self._fill + n] = samples[offset:offset + n]
+            self._fill += n
+            offset += n
+            if self._fill == self.chunk_size:
+                self._publish()
+
+    def _read_pipe(self) -> None:
+        """Reader thread for parecord: read() straight into ring slots."""
+        fd = self._proc.stdout.fileno()
+        spare = memoryview(bytearray(self.chunk_size * 2))  # Target while the ring is full
+        while not self._stop.is_set():
+            full = self._written - self._read >= self.slots
+            view = spare if full else memoryview(self.buffer[self._written % self.slots]).cast("B")
+            got = 0
+            while got < len(view):
+                try:
+                    n = os.readv(fd, [view[got:]])
+                except OSError:
+                    n = 0
+                if not n:
+                    self._ready.set()
+                    return
+                got += n
+            if full:
+                self.overflows += 1
+            else:
+                self._publish()
+
+
+class FileAudioCapture:
+    """
+    AudioCapture stand-in that replays WAV files as if spoken into the microphone.
+
+    Chunks are released in real time (scaled by speed), with `gap` seconds of
+    silence before the first file and after each one. `utterances` records, per
+    file, the time.monotonic() at which its last voiced sample was "captured",
+    i.e. the true end of speech the listener's VAD is trying to detect.
+    """
+
+    SILENCE_LEVEL = 200  # int16 amplitude below which trailing samples count as silence
+
+    def __init__(self, paths, sample_rate: int = 16000, chunk_size: int = 1600, gap: float = 2.0,
+                 speed: float = 1.0):
+        self.paths = list(paths)
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.gap = gap
+        self.speed = speed
+        self.backend = "file"
+        self.utterances = []  # [{"path", "duration_s", "speech_end"}] in replay order
+        self.finished = threading.Event()
+        self._chunks = None
+        self._ends = {}  # chunk index -> (utterance index, samples of speech in that chunk)
+        self._next = 0
+        self._t0 = None
+        self._stop = threading.Event()
+
+    def start(self) -> "FileAudioCapture":
+        import numpy as np
+        silence = np.zeros(int(self.gap * self.sample_rate), dtype=np.int16)
+        parts, offset = [silence], len(silence)
+        for path in self.paths:
+            pcm = self._load(path)
+            voiced = np.flatnonzero(np.abs(pcm.astype(np.int32)) > self.SILENCE_LEVEL)
+            end = int(voiced[-1]) + 1 if len(voiced) else len(pcm)
+            last = offset + end - 1
+            self._ends[last // self.chunk_size] = (len(self.utterances), last % self.chunk_size + 1)
+            self.utterances.append({"path": path, "duration_s": round(end / self.sample_rate, 2), "speech_end": None})
+            parts += [pcm, silence]
+            offset += len(pcm) + len(silence)
+        audio = np.concatenate(parts)
+        audio = np.pad(audio, (0, -len(audio) % self.chunk_size))
+        self._chunks = audio.reshape(-1, self.chunk_size)
+        self._t0 = time.monotonic()
+        return self
+
+    def read(self, timeout: float = 1.0):
+        """Next chunk once it would have been captured, or None (after timeout) when the files are exhausted."""
+        if self._next >= len(self._chunks):
+            self.finished.set()
+            self._stop.wait(timeout)
+            return None
+        chunk_s = self.chunk_size / self.sample_rate / self.speed
+        due = self._t0 + (self._next + 1) * chunk_s
+        delay = due - time.monotonic()
+        if delay > 0 and self._stop.wait(delay):
+            return None
+        index, self._next = self._next, self._next + 1
+        if index in self._ends:
+            utterance, samples = self._ends[index]
+            self.utterances[utterance]["speech_end"] = due - (self.chunk_size - samples) / self.sample_rate / self.speed
+        return self._chunks[index]
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "chunks": self._next, "overflows": 0, "device_overflows": 0,
+                "underruns": 0}
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def _load(self, path: str):
+        import numpy as np
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"{path}: expected 16-bit PCM")
+            rate, channels = wf.getframerate(), wf.getnchannels()
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)[::channels]
+        if rate != self.sample_rate:
+            pcm = np.frombuffer(_resample_pcm16(pcm.tobytes(), rate, self.sample_rate), dtype=np.int16)
+        return pcm
+
+
+class EnergyGate:
+    """
+    First stage of the wake-word cascade: decides per chunk whether the neural KWS needs to run.
+
+    A chunk triggers when its RMS is KWS_GATE_RATIO above an adaptive noise
+    floor, or when its spectral flux (onset energy relative to the previous
+    chunk) is high; either way it must be above KWS_GATE_MIN_RMS. The gate then
+    stays open for hold_ms. With a VoiceActivityDetector as vad, the gate also
+    waits for Silero to hear speech before opening.
+
+    update() returns how many of the latest chunks the KWS should consume: 0
+    while closed, 1 while open, and more on the chunk the gate opens, so the
+    pre-roll (and the chunks the VAD deliberated over) is replayed from the
+    AudioRing and no keyword onset is lost.
+    """
+
+    FLUX_FRAME = 512  # Samples at the end of each chunk used for the spectrum
+    FLOOR_RISE = 0.05  # Noise floor EWMA rate while closed (falls faster, rises slowly)
+    FLOOR_FALL = 0.2
+    FLOOR_RISE_OPEN = 0.01  # Still adapts while open, so a steady new noise (a fan) lets it close again
+    MAX_REPLAY_MS = 2000
+
+    def __init__(self, chunk_ms: float = 100, ratio: float = KWS_GATE_RATIO, min_rms: float = KWS_GATE_MIN_RMS,
+                 flux: float = KWS_GATE_FLUX, hold_ms: int = KWS_GATE_HOLD_MS, preroll_ms: int = KWS_GATE_PREROLL_MS,
+                 vad=None):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.flux_threshold = flux
+        self.hold_chunks = max(1, int(round(hold_ms / chunk_ms)))
+        self.preroll_chunks = int(round(preroll_ms / chunk_ms))
+        self.max_replay = max(1, int(self.MAX_REPLAY_MS / chunk_ms))
+        self.vad = vad
+        self.floor = None
+        self.flux = 0.0
+        self.is_open = False
+        self.chunks = 0
+        self.open_chunks = 0
+        self.opens = 0
+        self._hold = 0
+        self._armed = 0  # Chunks since the energy stage triggered, while waiting for the VAD
+        self._window = None
+        self._spectrum = None
+
+    def update(self, samples, rms: float = None) -> int:
+        """Feed one chunk (float32). Returns the number of latest chunks to run through the KWS."""
+        import numpy as np
+        self.chunks += 1
+        if rms is None:
+            rms = float(np.dot(samples, samples) / max(len(samples), 1)) ** 0.5
+        trigger = (rms >= self.min_rms and self.floor is not None
+                   and (rms > self.floor * self.ratio or self._spectral_flux(samples) > self.flux_threshold))
+        if rms < self.min_rms:
+            self._spectrum = None
+        self._adapt_floor(rms)
+
+        if trigger:
+            self._hold = self.hold_chunks
+        elif self._hold:
+            self._hold -= 1
+        if not self._hold:
+            self._close()
+            return 0
+        if self.is_open:
+            self.open_chunks += 1
+            return 1
+
+        self._armed += 1
+        if self.vad is not None:
+            if not self.vad.detect(samples):
+                return 0
+        self.is_open = True
+        self.opens += 1
+        self.open_chunks += 1
+        return min(self.preroll_chunks + self._armed, self.max_replay)
+
+    def duty_cycle(self) -> float:
+        """Fraction of chunks the KWS ran on."""
+        return self.open_chunks / self.chunks if self.chunks else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "chunks": self.chunks,
+            "kws_chunks": self.open_chunks,
+            "duty_cycle": round(self.duty_cycle(), 4),
+            "opens": self.opens,
+            "noise_floor": round(self.floor or 0.0, 5),
+        }
+
+    def reset_stats(self) -> None:
+        self.chunks = self.open_chunks = self.opens = 0
+
+    def reset(self) -> None:
+        """Close the gate (the noise floor is kept); the next trigger replays pre-roll again."""
+        self._hold = 0
+        self._close()
+
+    def _close(self):
+        if self._armed and self.vad is not None:
+            self.vad.reset()
+        self.is_open = False
+        self._armed = 0
+
+    def _adapt_floor(self, rms: float):
+        if self.floor is None:
+            self.floor = max(rms, self.min_rms / self.ratio)
+            return
+        if rms < self.floor:
+            rate = self.FLOOR_FALL
+        else:
+            rate = self.FLOOR_RISE_OPEN if self._hold else self.FLOOR_RISE
+        self.floor = max(self.floor + rate * (rms - self.floor), self.min_rms / self.ratio)
+
+    def _spectral_flux(self, samples) -> float:
+        """Positive magnitude change since the previous chunk, relative to its total magnitude."""
+        import numpy as np
+        frame = samples[-self.FLUX_FRAME:]
+        if self._window is None or len(self._window) != len(frame):
+            self._window = np.hanning(len(frame)).astype(np.float32)
+        spectrum = np.abs(np.fft.rfft(frame * self._window))
+        previous, self._spectrum = self._spectrum, spectrum
+        if previous is None:
+            self.flux = 0.0
+        else:
+            self.flux = float(np.maximum(spectrum - previous, 0.0).sum() / (previous.sum() + 1e-9))
+        return self.flux
+
+
+def measure_gate(path: str, vad: bool = KWS_GATE_VAD) -> dict:
+    """Run the wake-word gate over a 16-bit WAV recording and report its duty cycle."""
     import numpy as np
-    boosted = np.asarray(samples, dtype=np.float32) * AUDIO_GAIN
-    return np.clip(boosted, -1.0, 1.0)
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        sample_rate, channels = wf.getframerate(), wf.getnchannels()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)[::channels]
+    chunk_size = int(sample_rate * 0.1)
+    ring = AudioRing(chunk_size, sample_rate=sample_rate)
+    gate = EnergyGate(vad=VoiceActivityDetector(sample_rate=sample_rate, name="vad:gate") if vad else None)
+    start = time.perf_counter()
+    for i in range(0, len(pcm) - chunk_size + 1, chunk_size):
+        samples = ring.push(pcm[i:i + chunk_size])
+        gate.update(samples, ring.rms)
+    elapsed = time.perf_counter() - start
+    return {"file": path, "seconds": round(len(pcm) / sample_rate, 1), **gate.stats(),
+            "gate_us_per_chunk": round(elapsed / max(gate.chunks, 1) * 1e6, 1)}
 
 
 # ============================================================================
@@ -169,11 +668,10 @@ def check_memory() -> tuple[int, int]:
 
 
 def emergency_cleanup() -> None:
-    """Force garbage collection and clear caches to free memory."""
+    """Evict every model not in use right now (oldest first) until memory is back under MAX_MEMORY_PERCENT."""
     logger.warning("[Resource] Performing emergency cleanup")
-    gc.collect()
-    # Clear any module-level caches if possible
-    # Note: whisper model cache is in processor thread, cleared separately
+    get_model_manager().relieve(idle_seconds=1.0)
+    _release_heap()
 
 
 def log_resource_status(component: str = "") -> None:
@@ -181,19 +679,380 @@ def log_resource_status(component: str = "") -> None:
     try:
         import psutil
         mem = psutil.virtual_memory()
-        cpu = psutil.cpu_percent(interval=0.1)
+        cpu = psutil.cpu_percent(interval=None)  # Since the previous call; never blocks
         prefix = f"[{component}] " if component else ""
         logger.info(f"{prefix}Memory: {mem.percent}% used ({mem.available // (1024*1024)}MB available), CPU: {cpu}%")
     except ImportError:
         pass
 
 
+# ============================================================================
+# Model Manager
+# ============================================================================
+
+def _rss_mb(pid: int = None) -> float:
+    """Resident memory of this process (or pid) in MB, from /proc; 0.0 where unavailable."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _release_heap() -> None:
+    """Collect garbage and hand freed heap back to the OS (glibc otherwise keeps it for reuse)."""
+    gc.collect()
+    try:
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class ModelManager:
+    """
+    Resident models with their approximate footprints, evicted least recently
+    used first under memory pressure.
+
+    A component calls track(name, unload, footprint) after loading a model and
+    touch(name) whenever it uses it. unload() must drop the component's
+    reference (and call forget(name)); the component reloads lazily on next use.
+    footprint is MB, or a zero-arg callable for things that grow (worker RSS).
+    """
+
+    def __init__(self, idle_seconds: float = MODEL_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.loads = collections.Counter()  # name -> times loaded
+        self.evictions = collections.Counter()  # name -> times evicted
+        self._models = {}  # name -> [unload, footprint, last_used]
+        self._lock = threading.Lock()
+
+    def track(self, name: str, unload, footprint=0.0) -> None:
+        with self._lock:
+            self._models[name] = [unload, footprint, time.monotonic()]
+            self.loads[name] += 1
+        logger.info(f"[Models] {name} resident (~{self._mb(footprint):.0f}MB)")
+
+    def touch(self, name: str) -> None:
+        entry = self._models.get(name)  # Lock-free: called per audio chunk
+        if entry is not None:
+            entry[2] = time.monotonic()
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def resident(self) -> dict:
+        """name -> approximate MB for every resident model."""
+        with self._lock:
+            entries = [(name, entry[1]) for name, entry in self._models.items()]
+        return {name: round(self._mb(footprint), 1) for name, footprint in entries}
+
+    def resident_mb(self) -> float:
+        return round(sum(self.resident().values()), 1)
+
+    def evict(self, name: str) -> float:
+        """Unload one model. Returns its approximate footprint in MB (0.0 if it wasn't resident)."""
+        with self._lock:
+            entry = self._models.pop(name, None)
+            if entry is None:
+                return 0.0
+            self.evictions[name] += 1
+        mb = self._mb(entry[1])
+        try:
+            entry[0]()
+        except Exception as e:
+            logger.warning(f"[Models] Unloading {name} failed ({e})")
+        logger.warning(f"[Models] Evicted {name} (~{mb:.0f}MB)")
+        return mb
+
+    def relieve(self, limit_percent: int = MAX_MEMORY_PERCENT, idle_seconds: float = None) -> list:
+        """
+        Evict models idle for at least idle_seconds, least recently used first,
+        until their footprints cover the excess over limit_percent. Returns the names evicted.
+        """
+        percent, available_mb = check_memory()
+        if percent < limit_percent:
+            return []
+        total_mb = available_mb / max(1.0 - percent / 100.0, 0.01)
+        needed_mb = (percent - limit_percent + 1) / 100.0 * total_mb
+        idle = self.idle_seconds if idle_seconds is None else idle_seconds
+        now = time.monotonic()
+        with self._lock:
+            candidates = sorted((entry[2], name) for name, entry in self._models.items() if now - entry[2] >= idle)
+        evicted, freed_mb = [], 0.0
+        for _, name in candidates:
+            if freed_mb >= needed_mb:
+                break
+            freed_mb += self.evict(name)
+            evicted.append(name)
+        if evicted:
+            _release_heap()
+            logger.warning(f"[Models] Memory at {percent}%: evicted {', '.join(evicted)} (~{freed_mb:.0f}MB)")
+        return evicted
+
+    @staticmethod
+    def _mb(footprint) -> float:
+        if callable(footprint):
+            try:
+                footprint = footprint()
+            except Exception:
+                return 0.0
+        return max(float(footprint or 0.0), 0.0)
+
+
+_MODEL_MANAGER = None
+_MODEL_MANAGER_LOCK = threading.Lock()
+
+
+def get_model_manager() -> ModelManager:
+    """Return the process-wide model manager, creating it on first use."""
+    global _MODEL_MANAGER
+    with _MODEL_MANAGER_LOCK:
+        if _MODEL_MANAGER is None:
+            _MODEL_MANAGER = ModelManager()
+        return _MODEL_MANAGER
+
+
+# ============================================================================
+# Turn Tracing and Metrics
+# ============================================================================
+
+def _cpu_percent():
+    """System CPU % since the previous call (non-blocking), or None without psutil."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.cpu_percent(interval=None)
+
+
+# Milestones of a turn, in pipeline order; times are reported relative to speech_end
+TRACE_MILESTONES = ("speech_end", "stt_done", "llm_request", "first_token", "first_sentence_synth",
+                    "first_audio", "turn_end")
+
+
+class TurnTrace:
+    """Monotonic timestamps of one turn's milestones. The first mark of each milestone wins."""
+
+    __slots__ = ("turn_id", "marks", "outcome", "attrs")
+
+    def __init__(self, turn_id: int, speech_end: float = None):
+        self.turn_id = turn_id
+        self.marks = {}
+        self.outcome = None
+        self.attrs = {}
+        if speech_end is not None:
+            self.marks["speech_end"] = speech_end
+
+    def mark(self, milestone: str, at: float = None) -> None:
+        if milestone not in self.marks:
+            self.marks[milestone] = time.monotonic() if at is None else at
+
+    def offsets_ms(self) -> dict:
+        """Milestone -> ms since speech_end (negative for e.g. a speculative request sent before it)."""
+        origin = self.marks.get("speech_end", min(self.marks.values(), default=0.0))
+        return {m: round((self.marks[m] - origin) * 1000, 1) for m in TRACE_MILESTONES if m in self.marks}
+
+    def spans(self) -> list:
+        """[{name, start_ms, dur_ms}] between consecutive milestones that were reached."""
+        offsets = self.offsets_ms()
+        reached = [m for m in TRACE_MILESTONES if m in offsets]
+        return [{"name": f"{a}->{b}", "start_ms": offsets[a], "dur_ms": round(offsets[b] - offsets[a], 1)}
+                for a, b in zip(reached, reached[1:])]
+
+
+class RollingQuantiles:
+    """Last `window` observations of one metric, with cumulative count and sum for Prometheus summaries."""
+
+    __slots__ = ("values", "count", "total")
+
+    def __init__(self, window: int):
+        self.values = collections.deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.values.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantiles(self, qs=(0.5, 0.95, 0.99)) -> dict:
+        ordered = sorted(self.values)
+        if not ordered:
+            return {q: 0.0 for q in qs}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in qs}
+
+
+class Tracer:
+    """
+    Collects TurnTraces: appends each finished turn to a JSONL file and keeps
+    rolling p50/p95/p99 of every milestone offset and span, served in
+    Prometheus text format by serve_metrics(). Recording a turn is a few dict
+    operations and one line write; quantiles are only computed on scrape.
+    """
+
+    def __init__(self, path: str = TRACE_PATH, window: int = TRACE_WINDOW, max_bytes: int = TRACE_MAX_MB * 1024 * 1024):
+        self.path = os.path.expanduser(path) if path else ""
+        self.window = window
+        self.max_bytes = max_bytes
+        self.turns = collections.Counter()  # outcome -> turns
+        self.gauges = {}  # name -> zero-arg callable, sampled on scrape
+        self.histograms = {}  # name -> zero-arg callable returning ([(le, cumulative count)], sum, count)
+        self.subscribers = []  # callables (trace, record) run for every finished turn
+        self._latency = {}  # metric key -> RollingQuantiles
+        self._lock = threading.Lock()
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def start(self, turn_id: int, speech_end: float = None) -> TurnTrace:
+        return TurnTrace(turn_id, speech_end)
+
+    def finish(self, trace: TurnTrace, outcome: str = "ok") -> dict:
+        """Close the trace (turn_end = now unless already marked), record it and return its JSON record."""
+        trace.mark("turn_end")
+        trace.outcome = trace.outcome or outcome
+        offsets = trace.offsets_ms()
+        spans = trace.spans()
+        record = {"ts": round(time.time(), 3), "turn": trace.turn_id, "outcome": trace.outcome,
+                  "marks_ms": offsets, "spans": spans, **trace.attrs}
+        with self._lock:
+            self.turns[trace.outcome] += 1
+            if trace.outcome != "cancelled":
+                for milestone, ms in offsets.items():
+                    if milestone != "speech_end":
+                        self._observe(("milestone", milestone), ms)
+                for span in spans:
+                    self._observe(("span", span["name"]), span["dur_ms"])
+        self._write(record)
+        for subscriber in self.subscribers:
+            subscriber(trace, record)
+        return record
+
+    def summary(self) -> dict:
+        """{"first_audio": {"p50": ..., "p95": ..., "p99": ..., "n": ...}, ...} for milestone offsets (ms)."""
+        with self._lock:
+            out = {}
+            for (kind, name), rq in self._latency.items():
+                if kind == "milestone":
+                    q = rq.quantiles()
+                    out[name] = {"p50": q[0.5], "p95": q[0.95], "p99": q[0.99], "n": len(rq.values)}
+            return out
+
+    def prometheus(self) -> str:
+        """Metrics in Prometheus text exposition format."""
+        lines = ["# HELP doh_turn_milestone_seconds Time from end of speech to each turn milestone (rolling window).",
+                 "# TYPE doh_turn_milestone_seconds summary",
+                 "# HELP doh_turn_span_seconds Time between consecutive turn milestones (rolling window).",
+                 "# TYPE doh_turn_span_seconds summary"]
+        with self._lock:
+            latency = [(key, rq.quantiles(), rq.count, rq.total) for key, rq in sorted(self._latency.items())]
+            turns = dict(self.turns)
+        for (kind, name), qs, count, total in latency:
+            metric = f"doh_turn_{kind}_seconds"
+            label = f'{kind}="{name}"'
+            for q, ms in qs.items():
+                lines.append(f'{metric}{{{label},quantile="{q}"}} {ms / 1000:.4f}')
+            lines.append(f"{metric}_count{{{label}}} {count}")
+            lines.append(f"{metric}_sum{{{label}}} {total / 1000:.4f}")
+        lines += ["# HELP doh_turns_total Finished turns by outcome.", "# TYPE doh_turns_total counter"]
+        lines += [f'doh_turns_total{{outcome="{outcome}"}} {n}' for outcome, n in sorted(turns.items())]
+        for name, sample in sorted(self.gauges.items()):
+            try:
+                value = sample()
+            except Exception:
+                continue
+            if isinstance(value, dict):
+                # Labelled gauge: {name label: value}
+                lines.append(f"# TYPE doh_{name} gauge")
+                lines += [f'doh_{name}{{name="{key}"}} {v}' for key, v in sorted(value.items())]
+            elif value is not None:
+                lines += [f"# TYPE doh_{name} gauge", f"doh_{name} {value}"]
+        for name, sample in sorted(self.histograms.items()):
+            try:
+                buckets, total, count = sample()
+            except Exception:
+                continue
+            lines.append(f"# TYPE doh_{name} histogram")
+            lines += [f'doh_{name}_bucket{{le="{le}"}} {n}' for le, n in buckets]
+            lines += [f'doh_{name}_bucket{{le="+Inf"}} {count}', f"doh_{name}_sum {total:.4f}", f"doh_{name}_count {count}"]
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, port: int = METRICS_PORT, host: str = METRICS_HOST):
+        """Serve GET /metrics on a daemon thread. Returns the server, or None if disabled or the port is taken."""
+        if not port:
+            return None
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            logger.warning(f"[Metrics] Cannot listen on {host}:{port} ({e})")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True).start()
+        logger.info(f"[Metrics] Serving http://{host}:{server.server_port}/metrics")
+        return server
+
+    def _observe(self, key, value):
+        rq = self._latency.get(key)
+        if rq is None:
+            rq = self._latency[key] = RollingQuantiles(self.window)
+        rq.observe(value)
+
+    def _write(self, record: dict):
+        if not self.path:
+            return
+        line = json.dumps(record) + "\n"
+        try:
+            with self._lock:
+                if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.warning(f"[Trace] Could not write {self.path} ({e})")
+
+
+_TRACER = None
+_TRACER_LOCK = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, creating it on first use."""
+    global _TRACER
+    with _TRACER_LOCK:
+        if _TRACER is None:
+            try:
+                _TRACER = Tracer()
+            except OSError as e:
+                logger.warning(f"[Trace] Trace file unavailable ({e}), keeping metrics in memory only")
+                _TRACER = Tracer(path="")
+        return _TRACER
+
+
 class VoiceActivityDetector:
     """Silero VAD using sherpa-onnx for accurate speech detection."""
 
-    def __init__(self, sample_rate: int = 16000):
+    def __init__(self, sample_rate: int = 16000, name: str = "vad"):
         try:
-            import sherpa_onnx
+            import sherpa_onnx  # noqa: F401
         except ImportError:
             raise ImportError("pip install sherpa-onnx")
 
@@ -205,13 +1064,29 @@ class VoiceActivityDetector:
             )
 
         self.sample_rate = sample_rate
+        self.name = name  # Model manager entry
+        self.vad = None
+        self._lock = threading.RLock()  # The model manager may unload from another thread
+        self._load()
+
+    def _load(self):
+        import sherpa_onnx
+        before = _rss_mb()
         config = sherpa_onnx.VadModelConfig()
         config.silero_vad.model = SILERO_VAD_MODEL
         config.silero_vad.min_silence_duration = 0.5  # Seconds of silence to end speech
         config.silero_vad.min_speech_duration = MIN_SPEECH_DURATION  # Minimum speech length to trigger
-        config.sample_rate = sample_rate
+        config.sample_rate = self.sample_rate
         # Buffer size in seconds - how much audio to buffer before processing
         self.vad = sherpa_onnx.VoiceActivityDetector(config, buffer_size_in_seconds=30)
+        get_model_manager().track(self.name, self.unload, _rss_mb() - before)
+
+    def _ready(self):
+        """The loaded VAD (reloading it if the model manager evicted it), marked as used."""
+        if self.vad is None:
+            self._load()
+        get_model_manager().touch(self.name)
+        return self.vad
 
     def process(self, samples):
         """
@@ -223,62 +1098,90 @@ class VoiceActivityDetector:
         Returns:
             Speech segment as float32 numpy array, or None if no complete speech yet
         """
-        self.vad.accept_waveform(samples)
-        if not self.vad.empty():
-            segment = self.vad.front
-            self.vad.pop()
-            return segment.samples
-        return None
+        with self._lock:
+            vad = self._ready()
+            vad.accept_waveform(samples)
+            if not vad.empty():
+                segment = vad.front
+                vad.pop()
+                return segment.samples
+            return None
+
+    def detect(self, samples) -> bool:
+        """Feed samples, discarding finished segments; True while speech is detected (for gating)."""
+        with self._lock:
+            vad = self._ready()
+            vad.accept_waveform(samples)
+            while not vad.empty():
+                vad.pop()
+            return vad.is_speech_detected()
+
+    def is_speech(self) -> bool:
+        """True if the samples fed so far end in speech."""
+        with self._lock:
+            return self.vad is not None and self.vad.is_speech_detected()
 
     def reset(self):
         """Reset VAD state for fresh start."""
-        self.vad.flush()
-        while not self.vad.empty():
-            self.vad.pop()
+        with self._lock:
+            if self.vad is None:
+                return
+            self.vad.flush()
+            while not self.vad.empty():
+                self.vad.pop()
+
+    def unload(self):
+        """Free the model; the next process()/detect() reloads it."""
+        with self._lock:
+            self.vad = None
+        get_model_manager().forget(self.name)
 
 
 class WakeWordDetector:
     """Detects a wake word using sherpa-onnx KeywordSpotter (streaming)."""
 
+    KEYWORDS_FILE = "keywords_active.txt"
+    MODEL_NAME = "kws"  # Model manager entry
+
     def __init__(self, model_dir: str = KWS_MODEL, keyword: str = KWS_KEYWORD,
-                 threshold: float = KWS_THRESHOLD, sample_rate: int = 16000):
-        import sherpa_onnx
+                 threshold: float = KWS_THRESHOLD, sample_rate: int = 16000, keywords: list = None):
         if not os.path.isdir(model_dir):
             raise FileNotFoundError(f"KWS model not found at {model_dir}")
 
-        # Convert keyword to BPE tokens using the model's sentencepiece
+        # Write keywords file: BPE tokens (from the model's sentencepiece), boosting, threshold and a
+        # label (@VOLUME_UP) that get_result() reports back
         bpe_model = os.path.join(model_dir, "bpe.model")
-        bpe_tokens = self._tokenize_keyword(keyword, bpe_model)
-        logger.info(f"Wake word BPE tokens: {bpe_tokens}")
-
-        # Write keywords file with BPE tokens and boosting
-        keywords_file = os.path.join(model_dir, "keywords_active.txt")
+        self.keywords = {}  # label -> phrase
+        keywords_file = os.path.join(model_dir, self.KEYWORDS_FILE)
         with open(keywords_file, "w") as f:
-            f.write(f"{bpe_tokens} :1.5 #{threshold}\n")
+            for phrase in keywords or [keyword]:
+                label = re.sub(r"\W+", "_", phrase.upper()).strip("_")
+                bpe_tokens = self._tokenize_keyword(phrase, bpe_model)
+                logger.info(f"Keyword '{phrase}' BPE tokens: {bpe_tokens}")
+                f.write(f"{bpe_tokens} :1.5 #{threshold} @{label}\n")
+                self.keywords[label] = phrase
 
         # Find model files (prefer int8 for lower CPU)
-        encoder = self._find_model(model_dir, "encoder")
-        decoder = self._find_model(model_dir, "decoder")
-        joiner = self._find_model(model_dir, "joiner")
-        tokens = os.path.join(model_dir, "tokens.txt")
-
-        self.kws = sherpa_onnx.KeywordSpotter(
-            tokens=tokens,
-            encoder=encoder,
-            decoder=decoder,
-            joiner=joiner,
+        self._spotter_config = dict(
+            tokens=os.path.join(model_dir, "tokens.txt"),
+            encoder=self._find_model(model_dir, "encoder"),
+            decoder=self._find_model(model_dir, "decoder"),
+            joiner=self._find_model(model_dir, "joiner"),
             keywords_file=keywords_file,
             num_threads=2,
             keywords_threshold=threshold,
         )
         self.sample_rate = sample_rate
-        self.stream = self.kws.create_stream()
+        self.kws = None
+        self.stream = None
+        self._lock = threading.RLock()  # The model manager may unload from another thread
+        self._load()
         self._chunk_count = 0
         self._ready_count = 0
         self._rms_sum = 0.0
         self._peak = 0.0
         self._last_debug = time.monotonic()
-        logger.info(f"Wake word detector loaded: '{keyword}' (threshold={threshold})")
+        logger.info(f"{type(self).__name__} loaded: {sorted(self.keywords.values())} (threshold={threshold})")
 
     @staticmethod
     def _find_model(model_dir: str, prefix: str) -> str:
@@ -291,6 +1194,20 @@ class WakeWordDetector:
                 return os.path.join(model_dir, f)
         raise FileNotFoundError(f"No {prefix} ONNX file in {model_dir}")
 
+    def _load(self):
+        import sherpa_onnx
+        before = _rss_mb()
+        self.kws = sherpa_onnx.KeywordSpotter(**self._spotter_config)
+        self.stream = self.kws.create_stream()
+        get_model_manager().track(self.MODEL_NAME, self.unload, _rss_mb() - before)
+
+    def unload(self):
+        """Free the spotter; the next spot() reloads it."""
+        with self._lock:
+            self.kws = None
+            self.stream = None
+        get_model_manager().forget(self.MODEL_NAME)
+
     @staticmethod
     def _tokenize_keyword(keyword: str, bpe_model_path: str) -> str:
         """Convert keyword to BPE tokens using sentencepiece."""
@@ -305,16 +1222,24 @@ class WakeWordDetector:
 
     def process(self, samples) -> bool:
         """Process audio chunk. Returns True if wake word detected."""
+        return self.spot(samples) is not None
+
+    def spot(self, samples):
+        """Process audio chunk. Returns the detected keyword phrase, or None."""
+        with self._lock:
+            if self.kws is None:
+                self._load()
+            get_model_manager().touch(self.MODEL_NAME)
+            return self._spot(samples)
+
+    def _spot(self, samples):
         import numpy as np
-        arr = np.asarray(samples) if not isinstance(samples, np.ndarray) else samples
-        if isinstance(samples, np.ndarray):
-            self.stream.accept_waveform(self.sample_rate, samples.tolist())
-        else:
-            self.stream.accept_waveform(self.sample_rate, list(samples))
+        samples = np.asarray(samples, dtype=np.float32)  # No copy for the listener's float32 chunks
+        self.stream.accept_waveform(self.sample_rate, samples)
 
         self._chunk_count += 1
-        self._rms_sum += float(np.sqrt(np.mean(arr.astype(np.float32) ** 2)))
-        self._peak = max(self._peak, float(np.max(np.abs(arr))))
+        self._rms_sum += float(np.dot(samples, samples) / max(len(samples), 1)) ** 0.5
+        self._peak = max(self._peak, float(samples.max(initial=0.0)), -float(samples.min(initial=0.0)))
 
         # Periodic debug log every 30 seconds (~300 chunks)
         now = time.monotonic()
@@ -333,32 +1258,181 @@ class WakeWordDetector:
             self.kws.decode_stream(self.stream)
             keyword = self.kws.get_result(self.stream)
             if keyword:
-                logger.info(f"Wake word detected: '{keyword}'")
+                logger.info(f"Keyword detected: '{keyword}'")
                 self.stream = self.kws.create_stream()
-                return True
-        return False
+                return self.keywords.get(keyword, keyword)
+        return None
 
     def reset(self):
         """Reset detector state."""
-        self.stream = self.kws.create_stream()
+        with self._lock:
+            if self.kws is not None:
+                self.stream = self.kws.create_stream()
+
+
+class CommandSpotter(WakeWordDetector):
+    """
+    Spots command phrases (VOICE_COMMANDS, session-end and exit phrases) in live
+    audio with the same KeywordSpotter model as the wake word, so device commands
+    run as soon as they are said, without STT or the LLM.
+    """
+
+    KEYWORDS_FILE = "keywords_commands.txt"
+    MODEL_NAME = "kws:commands"
+
+    def __init__(self, model_dir: str = KWS_MODEL, phrases: list = None,
+                 threshold: float = COMMAND_THRESHOLD, sample_rate: int = 16000):
+        if phrases is None:
+            phrases = list(VOICE_COMMANDS) + SESSION_END_PHRASES + EXIT_PHRASES
+        super().__init__(model_dir, threshold=threshold, sample_rate=sample_rate, keywords=phrases)
+
+
+class StreamingRecognizer:
+    """
+    Streaming STT using a sherpa-onnx online (zipformer/paraformer) recognizer.
+
+    Fed the same 100 ms chunks the listener already produces, so the transcript
+    is decoded while the user is still talking; finalize() at VAD end-of-speech
+    only has to flush the last few frames.
+    """
+
+    def __init__(self, model_dir: str = STREAMING_STT_MODEL, sample_rate: int = 16000):
+        self.key = ("sherpa-streaming", model_dir, "", STT_THREADS)  # SttModelRegistry key
+        self.sample_rate = sample_rate
+        self.recognizer = self.stream = None
+        self.partial = ""
+        self._name = SttModelRegistry._model_name(self.key)
+        self._tail = None
+        self._connect()
+        with _STREAMING_RECOGNIZERS_LOCK:
+            _STREAMING_RECOGNIZERS.add(self)
+
+    def _connect(self):
+        """Fetch the shared model from the registry (again, if the model manager evicted it) and open a stream."""
+        recognizer = get_stt_models().get(*self.key)
+        self.stream = recognizer.create_stream()
+        self.recognizer = recognizer
+
+    def _active(self):
+        """(recognizer, stream), reconnecting after an unload; marks the model as in use for the model manager."""
+        recognizer, stream = self.recognizer, self.stream
+        if recognizer is None or stream is None:
+            self._connect()
+            recognizer, stream = self.recognizer, self.stream
+        get_model_manager().touch(self._name)
+        return recognizer, stream
+
+    def model_unloaded(self):
+        """Registry unload hook: drop our references so the model's memory is actually freed."""
+        self.recognizer = self.stream = None
+        self.partial = ""
+
+    def accept(self, samples):
+        """Feed a chunk. Returns the updated partial transcript if it changed, else None."""
+        recognizer, stream = self._active()
+        stream.accept_waveform(self.sample_rate, samples)
+        while recognizer.is_ready(stream):
+            recognizer.decode_stream(stream)
+        text = recognizer.get_result(stream)
+        if text != self.partial:
+            self.partial = text
+            return text
+        return None
+
+    def is_endpoint(self) -> bool:
+        """True once the recognizer's own endpointing sees trailing silence."""
+        recognizer, stream = self._active()
+        return recognizer.is_endpoint(stream)
+
+    def finalize(self) -> str:
+        """Flush remaining frames and return the final transcript; starts a fresh stream."""
+        import numpy as np
+        if self._tail is None:
+            self._tail = np.zeros(int(0.3 * self.sample_rate), dtype=np.float32)  # Lets the last tokens emit
+        recognizer, stream = self._active()
+        stream.accept_waveform(self.sample_rate, self._tail)
+        stream.input_finished()
+        while recognizer.is_ready(stream):
+            recognizer.decode_stream(stream)
+        text = recognizer.get_result(stream).strip()
+        self.reset()
+        return text
+
+    def reset(self):
+        """Drop the current utterance."""
+        recognizer = self.recognizer
+        self.stream = recognizer.create_stream() if recognizer is not None else None  # Else reconnects on next use
+        self.partial = ""
+
+
+# Live StreamingRecognizers, told by the registry when their model is unloaded
+_STREAMING_RECOGNIZERS = weakref.WeakSet()
+_STREAMING_RECOGNIZERS_LOCK = threading.Lock()
+
+
+def _release_streaming_recognizers(key: tuple) -> None:
+    with _STREAMING_RECOGNIZERS_LOCK:
+        recognizers = [r for r in _STREAMING_RECOGNIZERS if r.key == key]
+    for recognizer in recognizers:
+        recognizer.model_unloaded()
+
+
+class PartialTranscript:
+    """Thread-safe holder for the latest partial transcript and when it last changed."""
+
+    def __init__(self):
+        self._text = ""
+        self._changed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update(self, text: str) -> None:
+        with self._lock:
+            if text != self._text:
+                self._text = text
+                self._changed = time.monotonic()
+
+    def get(self) -> tuple[str, float]:
+        """Return (text, time.monotonic() of last change)."""
+        with self._lock:
+            return self._text, self._changed
+
+    def clear(self) -> None:
+        self.update("")
+
+
+class SpeechSegment:
+    """A VAD speech segment handed from listener to processor."""
+
+    __slots__ = ("samples", "text", "end_time", "command")
+
+    def __init__(self, samples, text: str = None, end_time: float = None, command: str = None):
+        self.samples = samples  # Float32 audio in [-1, 1] (None for spotted commands)
+        self.text = text  # Final transcript if a streaming recognizer already produced one, else None
+        self.end_time = end_time if end_time is not None else time.monotonic()  # When VAD closed the segment
+        self.command = command  # Response of a voice command the listener already executed
 
 
 # ============================================================================
 # Threaded Voice Assistant
 # ============================================================================
 
-def listener_thread(audio_queue: queue.Queue, stop_event: threading.Event, processing_event: threading.Event, sample_rate: int = 16000, wake_mode: bool = False, session_end_event: threading.Event = None):
+def listener_thread(audio_queue: queue.Queue, stop_event: threading.Event, processing_event: threading.Event, sample_rate: int = 16000, wake_mode: bool = False, session_end_event: threading.Event = None,
+                    stt_engine: str = None, partial_transcript: PartialTranscript = None, gate_stats: bool = False,
+                    capture=None):
     """
-    Thread 1: Continuously listen for speech using Silero VAD.
+    Detection stage (runs on its own thread): continuously listen for speech using Silero VAD.
 
     Records audio in chunks, detects speech via VAD, and puts complete
-    speech segments into the audio queue for processing.
+    speech segments (SpeechSegment) into the audio queue for processing.
 
     In wake mode: only starts VAD after wake word ("hey homer") is detected.
     Skips detection when processing_event is set (TTS is playing).
+    With stt_engine="sherpa-streaming", chunks are also decoded live: partials go
+    to partial_transcript and each segment carries its final transcript.
+    While waiting for the wake word, an EnergyGate decides which chunks reach the
+    KWS network; gate_stats prints its duty cycle every 30 seconds.
+    capture replaces the microphone (e.g. a FileAudioCapture for benchmarks).
     """
-    import numpy as np
-
     watchdog = Watchdog(timeout_seconds=WATCHDOG_TIMEOUT)
 
     try:
@@ -376,46 +1450,51 @@ def listener_thread(audio_queue: queue.Queue, stop_event: threading.Event, proce
             print(f"[Listener] Wake word unavailable ({e}), falling back to always-listening", file=sys.stderr)
             wake_mode = False
 
-    chunk_duration = 0.1  # 100ms chunks
-    chunk_size = int(sample_rate * chunk_duration)  # samples per chunk
-    bytes_per_chunk = chunk_size * 2  # 16-bit = 2 bytes per sample
+    # Energy (and optionally VAD) gate: the KWS network only runs on chunks that might hold speech
+    wake_gate = None
+    if wake_detector and KWS_GATE:
+        gate_vad = None
+        if KWS_GATE_VAD:
+            try:
+                gate_vad = VoiceActivityDetector(sample_rate=sample_rate, name="vad:gate")
+            except (ImportError, FileNotFoundError) as e:
+                logger.info(f"[Listener] Gate VAD unavailable ({e}), gating on energy only")
+        wake_gate = EnergyGate(vad=gate_vad)
+    last_gate_report = time.monotonic()
+
+    # Command spotter: run device commands straight from audio during a session
+    command_spotter = None
+    if COMMAND_SPOTTING:
+        try:
+            command_spotter = CommandSpotter(sample_rate=sample_rate)
+        except (ImportError, FileNotFoundError) as e:
+            logger.info(f"[Listener] Command spotting unavailable ({e}), commands go through STT")
 
-    # Try sounddevice first (works in background/daemon mode)
-    use_sounddevice = False
-    try:
-        import sounddevice as sd
-        # Test that it can open the mic
-        test_stream = sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16',
-                                      blocksize=chunk_size)
-        test_stream.close()
-        use_sounddevice = True
-        logger.info("Using sounddevice for audio capture")
-    except (ImportError, Exception):
-        pass
+    # Streaming recognizer: transcribe while the user is still speaking
+    recognizer = None
+    if (stt_engine or STT_ENGINE) == "sherpa-streaming":
+        try:
+            recognizer = StreamingRecognizer(sample_rate=sample_rate)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"[Listener] Streaming STT unavailable ({e}), processor will transcribe segments", file=sys.stderr)
 
-    if not use_sounddevice:
-        # Fallback: parecord subprocess (may not work in daemon mode)
-        cmd = [
-            "parecord", "--device=@DEFAULT_SOURCE@", "--raw",
-            f"--rate={sample_rate}", "--channels=1", "--format=s16le"
-        ]
+    chunk_duration = 0.1  # 100ms chunks
+    chunk_size = int(sample_rate * chunk_duration)  # samples per chunk
+    ring = AudioRing(chunk_size, sample_rate=sample_rate)  # Float32 capture buffer, reused for every chunk
 
-    proc = None
-    sd_stream = None
+    source, capture = capture, None
     memory_check_counter = 0
     waiting_for_wake = wake_mode and wake_detector is not None  # Start in wake mode if enabled
     post_wake_grace_chunks = 0  # Counter: discard audio chunks after wake word detection
     session_active = False  # True after wake word detected, False after timeout
     last_speech_time = 0  # Timestamp of last speech segment during active session
+    speech_run_chunks = 0  # Consecutive chunks VAD has heard speech in
+    command_max_chunks = COMMAND_MAX_UTTERANCE_MS / 1000.0 / chunk_duration
+    suppress_command_tail = False  # Drop the VAD segment containing an already-spotted command
+    capture_overflows = 0
     try:
-        if use_sounddevice:
-            import sounddevice as sd
-            sd_stream = sd.InputStream(samplerate=sample_rate, channels=1, dtype='int16',
-                                       blocksize=chunk_size)
-            sd_stream.start()
-        else:
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
-                                    bufsize=0)  # Unbuffered
+        # Capture runs on its own (PortAudio or reader) thread; a slow chunk here only grows the backlog
+        capture = (source or AudioCapture(sample_rate, chunk_size)).start()
         if waiting_for_wake:
             print(f"[Listener] Say '{KWS_KEYWORD}' to activate", file=sys.stderr, flush=True)
         else:
@@ -424,37 +1503,40 @@ def listener_thread(audio_queue: queue.Queue, stop_event: threading.Event, proce
         while not stop_event.is_set():
             watchdog.heartbeat()
 
-            # Read audio chunk
-            if use_sounddevice and sd_stream:
-                frames, _ = sd_stream.read(chunk_size)
-                if frames is None or len(frames) == 0:
-                    continue
-                chunk = frames.flatten().tobytes()
-            else:
-                import select
-                ready, _, _ = select.select([proc.stdout], [], [], 1.0)
-                if not ready:
-                    continue
-                chunk = os.read(proc.stdout.fileno(), bytes_per_chunk)
-            if not chunk or len(chunk) < bytes_per_chunk:
+            # Next captured chunk
+            chunk = capture.read(timeout=1.0)
+            if chunk is None:
                 continue
 
-            # Periodic memory check (every ~50 chunks = 5 seconds)
+            # Periodic memory and capture check (every ~50 chunks = 5 seconds)
             memory_check_counter += 1
             if memory_check_counter >= 50:
                 memory_check_counter = 0
+                stats = capture.stats()
+                dropped = stats["overflows"] + stats["device_overflows"]
+                if dropped > capture_overflows:
+                    logger.warning(f"[Listener] Capture dropped audio: {stats}")
+                    capture_overflows = dropped
                 mem_percent, _ = check_memory()
                 if mem_percent >= CRITICAL_MEMORY_PERCENT:
                     logger.warning(f"[Listener] Critical memory: {mem_percent}%, triggering cleanup")
                     emergency_cleanup()
                 elif mem_percent >= MAX_MEMORY_PERCENT:
                     logger.warning(f"[Listener] High memory: {mem_percent}%")
+                    get_model_manager().relieve()
 
             # Skip VAD processing while TTS is playing (processing_event set)
             if processing_event.is_set():
                 vad.reset()
                 if wake_detector:
                     wake_detector.reset()
+                if wake_gate:
+                    wake_gate.reset()
+                if recognizer and recognizer.partial:
+                    recognizer.reset()
+                if command_spotter:
+                    command_spotter.reset()
+                speech_run_chunks = 0
                 continue
 
             # Check if processor requested session end (e.g. "go to sleep")
@@ -467,13 +1549,26 @@ def listener_thread(audio_queue: queue.Queue, stop_event: threading.Event, proce
                 print(f"[Listener] Say '{KWS_KEYWORD}' to activate", file=sys.stderr, flush=True)
                 continue
 
-            # Convert to float32 normalized to [-1, 1] and apply software gain
-            samples = apply_agc(np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0)
+            # Convert to float32 normalized to [-1, 1] and apply software gain, in place in the ring
+            samples = ring.push(chunk)
 
             # State: WAKE WORD LISTENING — waiting for "hey homer"
             if waiting_for_wake and wake_detector:
-                if wake_detector.process(samples):
+                replay = wake_gate.update(samples, ring.rms) if wake_gate else 1
+                if gate_stats and wake_gate and time.monotonic() - last_gate_report >= 30:
+                    print(f"[Gate] {json.dumps(wake_gate.stats())}", file=sys.stderr, flush=True)
+                    wake_gate.reset_stats()
+                    last_gate_report = time.monotonic()
+                if replay > 1:
+                    # Gate just opened: start a fresh KWS stream from the pre-roll
+                    wake_detector.reset()
+                    kws_input = ring.latest(replay)
+                else:
+                    kws_input = samples
+                if replay and wake_detector.process(kws_input):
                     print(f"[Listener] Wake word '{KWS_KEYWORD}' detected!", file=sys.stderr, flush=True)
+                    if wake_gate:
+                        wake_gate.reset()
                     waiting_for_wake = False
                     session_active = True
                     vad.reset()
@@ -481,14 +1576,8 @@ def listener_thread(audio_queue: queue.Queue, stop_event: threading.Event, proce
                     chunks_per_ms = sample_rate / chunk_size / 1000.0
                     post_wake_grace_chunks = int(POST_WAKE_GRACE_MS * chunks_per_ms)
                     logger.info(f"Post-wake grace: discarding {post_wake_grace_chunks} chunks ({POST_WAKE_GRACE_MS}ms)")
-                    # Play short beep to confirm wake word heard
-                    try:
-                        subprocess.Popen(["aplay", "-q", "-t", "raw", "-f", "S16_LE",
-                                         "-r", "16000", "-c", "1"],
-                                        stdin=subprocess.PIPE, stderr=subprocess.DEVNULL
-                                        ).communicate(input=b'\x00\xff' * 800, timeout=1)
-                    except Exception:
-                        pass
+                    # Short beep to confirm wake word heard, off this thread so capture keeps draining
+                    threading.Thread(target=_play_beep, name="WakeBeep", daemon=True).start()
                 continue
 
             # Discard audio during post-wake grace period (avoid capturing wake word echo/beep)
@@ -505,231 +1594,589 @@ def listener_thread(audio_queue: queue.Queue, stop_event: threading.Event, proce
                     print(f"[Listener] Say '{KWS_KEYWORD}' to activate", file=sys.stderr, flush=True)
                     continue
 
+            # Live decoding alongside VAD (streaming STT only)
+            if recognizer:
+                partial = recognizer.accept(samples)
+                if partial is not None:
+                    logger.debug(f"[STT] Partial: {partial}")
+                    if partial_transcript:
+                        partial_transcript.update(partial)
+
+            # Spotted command at the start of an utterance: execute now, skip STT and the LLM
+            if command_spotter:
+                phrase = command_spotter.spot(samples)
+                if phrase and speech_run_chunks <= command_max_chunks:
+                    spotted = time.monotonic()
+                    action = match_voice_command(phrase)
+                    response = action() if action else None  # Session/exit phrases are handled by the processor
+                    logger.info(f"[Command] Spotted '{phrase}', handled in {(time.monotonic() - spotted) * 1000:.0f}ms")
+                    try:
+                        audio_queue.put_nowait(SpeechSegment(None, phrase, spotted, command=response))
+                    except queue.Full:
+                        print("[Listener] Queue full, dropping command", file=sys.stderr)
+                    vad.reset()
+                    if recognizer:
+                        recognizer.reset()
+                    if partial_transcript:
+                        partial_transcript.clear()
+                    suppress_command_tail = True
+                    speech_run_chunks = 0
+                    if session_active:
+                        last_speech_time = time.monotonic()
+                    continue
+
             # Process through VAD
             speech = vad.process(samples)
+            speech_run_chunks = speech_run_chunks + 1 if vad.is_speech() else 0
+            if suppress_command_tail and (speech is not None or not speech_run_chunks):
+                suppress_command_tail = False
+                if speech is not None:
+                    # The rest of the command utterance: already handled
+                    speech = None
+                    if recognizer:
+                        recognizer.reset()
+                    if partial_transcript:
+                        partial_transcript.clear()
             if speech is not None:
+                end_time = time.monotonic()
                 duration = len(speech) / sample_rate
                 print(f"[Listener] Detected {duration:.1f}s speech segment", file=sys.stderr, flush=True)
 
+                text = None
+                if recognizer:
+                    text = recognizer.finalize()
+                    if partial_transcript:
+                        partial_transcript.clear()
+                    logger.info(f"[STT] Final transcript in {(time.monotonic() - end_time) * 1000:.0f}ms after end of speech")
+
                 # Reset session timeout on each speech segment
                 if session_active:
                     last_speech_time = time.monotonic()
 
                 # Put in queue (non-blocking, drop if full to avoid backlog)
                 try:
-                    audio_queue.put_nowait(speech)
+                    audio_queue.put_nowait(SpeechSegment(speech, text, end_time))
                 except queue.Full:
                     print("[Listener] Queue full, dropping segment", file=sys.stderr)
+            elif recognizer and recognizer.partial and not vad.is_speech() and recognizer.is_endpoint():
+                # Noise the recognizer heard but VAD rejected: don't prefix it to the next utterance
+                recognizer.reset()
+                if partial_transcript:
+                    partial_transcript.clear()
 
     except Exception as e:
         print(f"[Listener] Error: {e}", file=sys.stderr)
     finally:
-        if sd_stream:
-            sd_stream.stop()
-            sd_stream.close()
-        if proc:
-            proc.terminate()
-            try:
-                proc.wait(timeout=2)
-            except subprocess.TimeoutExpired:
-                proc.kill()
+        if capture:
+            logger.info(f"[Listener] Capture stats: {capture.stats()}")
+            capture.close()
+        for model in (vad, wake_gate and wake_gate.vad, wake_detector, command_spotter):
+            if model:
+                model.unload()
 
 
-def processor_thread(audio_queue: queue.Queue, stop_event: threading.Event, processing_event: threading.Event, args, session_end_event: threading.Event = None):
-    """
-    Thread 2: Process speech segments through STT → LLM → TTS pipeline.
+def _play_beep() -> None:
+    try:
+        play_pcm(b'\x00\xff' * 800, 16000)
+    except Exception:
+        pass
+
 
-    Gets audio from queue, transcribes, generates LLM response, and speaks.
-    Sets processing_event while processing to prevent listener from detecting TTS audio.
+def _track_speculation(speculation, partial_transcript: PartialTranscript, args, stats: "SpeculationStats",
+                       conversation: "ConversationSession" = None):
     """
-    import numpy as np
+    Start, keep or cancel the speculative LLM request so it follows the partial transcript.
 
-    watchdog = Watchdog(timeout_seconds=WATCHDOG_TIMEOUT)
+    Returns the SpeculativeRequest now in flight, or None.
+    """
+    text, changed = partial_transcript.get()
+    idle = time.monotonic() - changed
+    if speculation is not None:
+        if not text and idle < 1.0:
+            return speculation  # Listener clears the partial as it queues the final segment
+        if text and transcripts_match(speculation.prompt, text):
+            return speculation
+        logger.info(f"[Speculate] Partial moved on ({text!r}), cancelling")
+        speculation.cancel()
+        stats.record("discarded")
+        speculation = None
+    if (text and idle >= SPECULATIVE_STABLE_MS / 1000.0 and not is_control_phrase(text)
+            and get_intent_router().route(text) is None
+            and not (conversation and conversation.fresh and get_answer_cache().peek(text))):
+        logger.info(f"[Speculate] Partial stable for {idle * 1000:.0f}ms, dispatching: {text!r}")
+        speculation = SpeculativeRequest(text, args.host, max_tokens=args.max_tokens, conversation=conversation)
+        stats.record("started")
+    return speculation
+
+
+class _LoopQueue:
+    """queue.Queue-style put_nowait() from a worker thread into an asyncio.Queue; raises queue.Full when full."""
+
+    def __init__(self, loop, target: "asyncio.Queue"):
+        self._loop = loop
+        self._queue = target
+
+    def put_nowait(self, item) -> None:
+        if self._queue.full():
+            raise queue.Full
+        self._loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning("[Orchestrator] Segment queue full, dropping segment")
 
-    # Lazy-load whisper model (only when first audio arrives)
-    whisper_model = None
 
-    def get_whisper_model():
-        nonlocal whisper_model
-        if whisper_model is None:
-            try:
-                from faster_whisper import WhisperModel
-                print("[Processor] Loading Whisper model...", file=sys.stderr, flush=True)
-                whisper_model = WhisperModel(STT_MODEL, device="cpu", compute_type="int8")
-            except ImportError:
-                sys.exit("pip install faster-whisper")
-        return whisper_model
+class Turn:
+    """
+    One user utterance and everything done to answer it (routing, LLM stream,
+    synthesis, playback). cancel() stops all of it: the task, the LLM request,
+    and any sentences still queued for synthesis or playback.
+    """
 
-    while not stop_event.is_set():
-        watchdog.heartbeat()
+    _ids = 0
+
+    def __init__(self, segment: SpeechSegment, text: str = None):
+        Turn._ids += 1
+        self.id = Turn._ids
+        self.segment = segment
+        self.text = text
+        self.started = time.monotonic()
+        self.task = None
+        self.llm_stream = None
+        self.cancelled = False
+        self.outcome = None  # How the turn was answered, for the trace ("llm", "local", "cached", ...)
+        self.trace = get_tracer().start(self.id, segment.end_time)
+        self.trace.mark("stt_done", self.started)
+        self.pending = 0  # Sentences queued but not yet played
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def cancel(self) -> None:
+        if self.cancelled:
+            return
+        self.cancelled = True
+        if self.llm_stream is not None:
+            self.llm_stream.cancel()
+        if self.task is not None:
+            self.task.cancel()
 
-        try:
-            audio = audio_queue.get(timeout=0.5)
-        except queue.Empty:
-            continue
+    def queued(self) -> None:
+        self.pending += 1
+        self._idle.clear()
 
-        # Signal that we're processing (listener will skip VAD detection)
-        processing_event.set()
+    def spoken(self) -> None:
+        self.pending -= 1
+        if self.pending <= 0:
+            self._idle.set()
 
-        try:
-            # Check memory before processing
-            mem_percent, mem_available = check_memory()
-            if mem_percent >= CRITICAL_MEMORY_PERCENT:
-                logger.warning(f"[Processor] Critical memory before processing: {mem_percent}%")
-                emergency_cleanup()
-                # Force reload of whisper model if needed
-                whisper_model = None
-            elif mem_percent >= MAX_MEMORY_PERCENT:
-                logger.warning(f"[Processor] High memory before processing: {mem_percent}%")
-
-            # Transcribe audio
-            print("[Processor] Transcribing...", file=sys.stderr, flush=True)
-            model = get_whisper_model()
-
-            # faster-whisper expects a file path or file-like object
-            # Save audio to temp WAV file for reliable transcription
-            temp_wav = tempfile.mktemp(suffix=".wav", prefix="vad_")
-            text = ""
-            try:
-                # Convert to numpy array if needed (sherpa-onnx returns list)
-                audio_array = np.array(audio, dtype=np.float32)
-                # Apply software gain and clip to prevent NaN/overflow on int16 cast
-                audio_array = np.clip(audio_array * AUDIO_GAIN, -1.0, 1.0)
-                audio_int16 = (audio_array * 32767).astype(np.int16)
-                with wave.open(temp_wav, "wb") as wf:
-                    wf.setnchannels(1)
-                    wf.setsampwidth(2)
-                    wf.setframerate(16000)
-                    wf.writeframes(audio_int16.tobytes())
-
-                segments, _ = model.transcribe(temp_wav, beam_size=5)
-                text = " ".join(s.text.strip() for s in segments).strip()
-            finally:
-                if os.path.isfile(temp_wav):
-                    os.unlink(temp_wav)
+    async def wait_spoken(self) -> None:
+        await self._idle.wait()
 
-            if not text:
-                print("[Processor] No speech detected in segment", file=sys.stderr)
-                continue
 
-            print(f"You: {text}", flush=True)
+class AssistantOrchestrator:
+    """
+    asyncio runtime for the continuous assistant (--threaded).
+
+    Stages, joined by bounded asyncio queues:
+      detect (listener_thread: capture, KWS, VAD, streaming STT)
+        -> segments -> transcribe -> utterances -> turn (commands, local intents,
+        answer cache, LLM stream) -> sentences -> synthesize -> audio -> playback
+
+    Blocking work runs on one single-thread executor per stage, so STT of the
+    next utterance, synthesis of sentence N+1 and playback of sentence N overlap.
+    A full queue makes the stage before it wait; only the detector, which must
+    keep up with the microphone, drops segments instead. Each turn runs as one
+    task and cancel_turn() stops it as a unit.
+    """
 
-            # Check for session-end commands (go to sleep, back to wake word mode)
-            if any(w in text.lower() for w in ["go to sleep", "sleep", "stop listening", "that's all"]):
-                if session_end_event:
-                    print("[Processor] Ending session, returning to wake word mode", file=sys.stderr, flush=True)
-                    speak("Going to sleep. Say hey homer to wake me.", args.tts)
-                    session_end_event.set()
+    def __init__(self, args, sample_rate: int = AUDIO_SAMPLE_RATE, sink: "AudioSink" = None, capture=None):
+        self.args = args
+        self.sample_rate = sample_rate
+        self.sink = sink
+        self.capture = capture  # Audio source for the listener (default: the microphone)
+        self.wake_mode = getattr(args, "wake", False)
+        self.stop_event = threading.Event()
+        self.processing_event = threading.Event()  # Set during a turn to mute the listener
+        self.session_end_event = threading.Event()  # Set to end the session and return to wake word mode
+        self.partial_transcript = PartialTranscript()  # Live transcript from the listener (streaming STT)
+        self.speculate = getattr(args, "speculate", SPECULATIVE_LLM)
+        self.spec_stats = SpeculationStats()
+        self.conversation = ConversationSession(get_llm_client(args.host))
+        self.turn = None  # Turn in progress
+        self._speculation = None
+        self._executors = {}
+
+    async def run(self) -> None:
+        """Run until an exit phrase, the listener dying, or cancellation."""
+        self.loop = asyncio.get_running_loop()
+        self.sink = self.sink or get_audio_sink()
+        self.segments = asyncio.Queue(maxsize=3)  # Listener -> STT (the listener drops when full)
+        self.utterances = asyncio.Queue(maxsize=1)  # STT -> turn
+        self.sentences = asyncio.Queue(maxsize=8)  # Turn -> synthesis
+        self.audio = asyncio.Queue(maxsize=max(1, TTS_PIPELINE_DEPTH))  # Synthesis -> playback
+        tracer = get_tracer()
+        tracer.gauges.update({
+            "cpu_percent": _cpu_percent,
+            "memory_percent": lambda: check_memory()[0],
+            "queue_segments": self.segments.qsize,
+            "queue_sentences": self.sentences.qsize,
+            "queue_audio": self.audio.qsize,
+            "llm_tokens_available": lambda: get_llm_scheduler(self.args.host).stats()["tokens_available"],
+            "llm_queue_depth": lambda: get_llm_scheduler(self.args.host).queue_depth(),
+            "models_resident_mb": get_model_manager().resident_mb,
+            "model_resident_mb": get_model_manager().resident,
+        })
+        tracer.histograms["llm_wait_seconds"] = lambda: get_llm_scheduler(self.args.host).wait_histogram()
+        metrics_server = tracer.serve_metrics()
+
+        listener = self.loop.run_in_executor(
+            self._executor("detect"), listener_thread,
+            _LoopQueue(self.loop, self.segments), self.stop_event, self.processing_event, self.sample_rate,
+            self.wake_mode, self.session_end_event, self.args.stt, self.partial_transcript,
+            getattr(self.args, "gate_stats", None) is not None, self.capture)
+        stages = [asyncio.create_task(coro, name=name) for name, coro in (
+            ("transcribe", self._transcribe_stage()),
+            ("turn", self._turn_stage()),
+            ("synthesize", self._synth_stage()),
+            ("playback", self._playback_stage()),
+        )]
+        last_health_log = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                if listener.done():
+                    logger.error("[Health] Listener stage exited unexpectedly")
+                    break
+                failed = next((t for t in stages if t.done()), None)
+                if failed is not None:
+                    logger.error(f"[Health] {failed.get_name()} stage exited unexpectedly: {failed.exception()!r}")
+                    break
+                if time.monotonic() - last_health_log > 30:
+                    await self._offload(None, log_resource_status, "Health")
+                    last_health_log = time.monotonic()
+                await asyncio.sleep(0.5)
+        finally:
+            self.stop_event.set()
+            self.cancel_turn()
+            if self._speculation is not None:
+                self._speculation.cancel()
+            for task in stages:
+                task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            try:
+                await asyncio.wait_for(asyncio.shield(listener), timeout=2)
+            except (asyncio.TimeoutError, Exception):
+                pass
+            for executor in self._executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+            if metrics_server is not None:
+                metrics_server.shutdown()
+
+    def cancel_turn(self) -> bool:
+        """Cancel the turn in progress (LLM, queued synthesis and playback). Returns False if idle."""
+        turn = self.turn
+        if turn is None or turn.cancelled:
+            return False
+        logger.info(f"[Orchestrator] Cancelling turn {turn.id}")
+        turn.cancel()
+        return True
+
+    def _executor(self, stage: str):
+        from concurrent.futures import ThreadPoolExecutor
+        if stage not in self._executors:
+            self._executors[stage] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"Stage-{stage}")
+        return self._executors[stage]
+
+    async def _offload(self, stage, fn, *args):
+        """Run blocking fn(*args) on the stage's executor (None = the loop's default pool)."""
+        executor = self._executor(stage) if stage else None
+        return await self.loop.run_in_executor(executor, fn, *args)
+
+    # -- stages ----------------------------------------------------------------
+
+    async def _transcribe_stage(self):
+        """Speech segments -> utterances. Segments the listener already transcribed pass straight through."""
+        import numpy as np
+        while True:
+            segment = await self.segments.get()
+            text = segment.text
+            if text is None and segment.command is None:
+                print("[Processor] Transcribing...", file=sys.stderr, flush=True)
+                # The listener already applied AUDIO_GAIN before VAD, so the segment is used as-is
+                audio_array = np.asarray(segment.samples, dtype=np.float32)
+                try:
+                    text = await self._offload("stt", transcribe, audio_array, self.args.stt)
+                except Exception as e:
+                    print(f"[Processor] Transcription failed: {e}", file=sys.stderr)
                     continue
+            await self.utterances.put(Turn(segment, text))
 
-            # Check for exit commands (full program shutdown)
-            if any(w in text.lower() for w in ["goodbye", "bye", "exit", "quit"]):
-                print("Goodbye!", flush=True)
-                speak("Goodbye!", args.tts)
-                stop_event.set()
-                break
-
-            # Check for voice commands
-            is_cmd, cmd_response = handle_voice_command(text)
-            if is_cmd:
-                print(f"[Command: {cmd_response}]", file=sys.stderr)
-                speak(cmd_response, args.tts)
+    async def _turn_stage(self):
+        """Run one turn at a time; while idle, keep the speculative LLM request following the partial."""
+        while True:
+            try:
+                # Poll faster while speculating so a stable partial is noticed promptly
+                turn = await asyncio.wait_for(self.utterances.get(), timeout=0.05 if self.speculate else 0.5)
+            except asyncio.TimeoutError:
+                if self.speculate:
+                    self._speculation = _track_speculation(self._speculation, self.partial_transcript, self.args,
+                                                           self.spec_stats, self.conversation)
                 continue
+            self.turn = turn
+            self.processing_event.set()  # Mute the listener until the reply has been played
+            turn.task = asyncio.create_task(self._run_turn(turn), name=f"turn-{turn.id}")
+            try:
+                await turn.task
+            except asyncio.CancelledError:
+                if not turn.cancelled:
+                    turn.cancel()
+                    raise  # The stage itself is being cancelled
+                logger.info(f"[Orchestrator] Turn {turn.id} cancelled after {time.monotonic() - turn.started:.1f}s")
+            except Exception as e:
+                turn.outcome = "error"
+                print(f"[Processor] Turn failed: {e}", file=sys.stderr)
+            finally:
+                self.turn = None
+                self.processing_event.clear()
+                self._finish_trace(turn)
 
-            # Send to LLM
-            print("Thinking...", file=sys.stderr, flush=True)
-            print("Assistant:", end="", flush=True)
+    async def _synth_stage(self):
+        while True:
+            turn, text = await self.sentences.get()
+            if turn.cancelled:
+                turn.spoken()
+                continue
+            try:
+                audio = await self._offload("tts", synthesize, text, self.args.tts, TTS_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"[TTS] Synthesis failed ({e})")
+                audio = None
+            if audio is not None:  # A failed synthesis has no synthesis latency to report
+                turn.trace.mark("first_sentence_synth")
+            await self.audio.put((turn, text, audio))
 
-            # Stream LLM response and speak sentence by sentence
-            buffer = ""
+    async def _playback_stage(self):
+        while True:
+            turn, text, audio = await self.audio.get()
             try:
-                for chunk in call_llm_stream(text, args.host, timeout=LLM_TIMEOUT, max_tokens=args.max_tokens):
-                    watchdog.heartbeat()  # Keep heartbeat during streaming
-                    print(chunk, end="", flush=True)
-                    buffer += chunk
-                    sentences = _split_sentences(buffer)
-                    if len(sentences) > 1:
-                        to_speak = " ".join(sentences[:-1])
-                        speak(to_speak, args.tts, timeout=TTS_TIMEOUT)
-                        buffer = sentences[-1]
-                print(flush=True)
-                if buffer.strip():
-                    speak(buffer.strip(), args.tts, timeout=TTS_TIMEOUT)
+                if turn.cancelled:
+                    continue
+                if audio is None:
+                    turn.trace.mark("first_audio")
+                    await self._offload("play", tts_pyttsx3, text)
+                else:
+                    # write() returns once the sentence is within one device buffer of finishing,
+                    # so the next sentence follows without a gap
+                    started = await self._offload("play", self.sink.write, *audio)
+                    turn.trace.mark("first_audio", started)
             except Exception as e:
-                print(f"\n[Processor] LLM error: {e}", file=sys.stderr)
-                # Fallback: non-streaming
-                try:
-                    response = call_llm(text, args.host, timeout=LLM_TIMEOUT, max_tokens=args.max_tokens)
-                    print(f"Assistant: {response}")
-                    if response:
-                        speak(response, args.tts, timeout=TTS_TIMEOUT)
-                except Exception as e2:
-                    print(f"[Processor] Fallback LLM also failed: {e2}", file=sys.stderr)
+                logger.warning(f"[TTS] Playback failed ({e})")
+            finally:
+                turn.spoken()
 
-            # Log resource status after each turn
-            log_resource_status("Processor")
+    # -- turn ------------------------------------------------------------------
 
-            print()  # Blank line between turns
-        finally:
-            # Always clear processing flag when done
-            processing_event.clear()
+    async def say(self, turn: Turn, text: str) -> None:
+        """Queue text for synthesis and playback as part of turn."""
+        text = text.strip() if text else ""
+        if not text or turn.cancelled:
+            return
+        turn.queued()
+        await self.sentences.put((turn, text))
+
+    async def finish_speaking(self, turn: Turn) -> None:
+        """Wait until everything the turn queued has been played out of the speaker."""
+        await turn.wait_spoken()
+        await self._offload("play", self.sink.drain)
+
+    def _finish_trace(self, turn: Turn) -> None:
+        record = get_tracer().finish(turn.trace, "cancelled" if turn.cancelled else turn.outcome or "ok")
+        marks = " ".join(f"{m}={ms:.0f}" for m, ms in record["marks_ms"].items() if m != "speech_end")
+        logger.info(f"[Trace] Turn {turn.id} ({record['outcome']}): {marks} ms after end of speech")
+
+    def _settle_speculation(self, text: str):
+        """Match the speculative LLM request against the final transcript; returns it if usable."""
+        pending, self._speculation = self._speculation, None
+        if pending is None:
+            return None
+        if not text or is_control_phrase(text):
+            pending.cancel()
+            self.spec_stats.record("discarded")
+            return None
+        if transcripts_match(pending.prompt, text):
+            self.spec_stats.record("hits")
+            logger.info(f"[Speculate] Hit, reply started {(time.monotonic() - pending.started_at) * 1000:.0f}ms ago")
+            return pending
+        logger.info(f"[Speculate] Miss ({pending.prompt!r} != {text!r}), re-issuing")
+        pending.cancel()
+        self.spec_stats.record("misses")
+        return None
 
+    async def _run_turn(self, turn: Turn):
+        args = self.args
+        conversation = self.conversation
+        segment = turn.segment
+
+        # Check memory before processing
+        mem_percent, _ = check_memory()
+        if mem_percent >= CRITICAL_MEMORY_PERCENT:
+            logger.warning(f"[Processor] Critical memory before processing: {mem_percent}%")
+            emergency_cleanup()
+        elif mem_percent >= MAX_MEMORY_PERCENT:
+            logger.warning(f"[Processor] High memory before processing: {mem_percent}%")
+            get_model_manager().relieve()
+
+        if segment.command is not None:
+            # Already executed by the listener's command spotter: just confirm it
+            print(f"[Command: {segment.command}]", file=sys.stderr)
+            turn.outcome = "command"
+            await self.say(turn, segment.command)
+            await self.finish_speaking(turn)
+            return
 
-def run_threaded_assistant(args):
-    """Run the 2-thread voice assistant."""
-    audio_queue = queue.Queue(maxsize=3)  # Limit queue to avoid backlog
-    stop_event = threading.Event()
-    processing_event = threading.Event()  # Set when processing to mute listener
-    session_end_event = threading.Event()  # Set by processor to end session and return to wake word mode
-
-    wake_mode = getattr(args, 'wake', False)
-
-    listener = threading.Thread(
-        target=listener_thread,
-        args=(audio_queue, stop_event, processing_event, AUDIO_SAMPLE_RATE, wake_mode, session_end_event),
-        name="ListenerThread"
-    )
-    processor = threading.Thread(
-        target=processor_thread,
-        args=(audio_queue, stop_event, processing_event, args, session_end_event),
-        name="ProcessorThread"
-    )
-
-    listener.daemon = True
-    processor.daemon = True
-
-    listener.start()
-    processor.start()
+        text = turn.text
+        pending = self._settle_speculation(text)
+        if not text:
+            turn.outcome = "empty"
+            print("[Processor] No speech detected in segment", file=sys.stderr)
+            return
 
-    print("\nThreaded voice assistant running. Say 'goodbye' or 'exit' to quit.\n")
-    if wake_mode:
-        print(f"Say '{KWS_KEYWORD}' to start a session. Say 'go to sleep' to end it.\n")
+        print(f"You: {text}", flush=True)
 
-    # Health monitoring loop
-    last_health_log = time.time()
+        # Check for session-end commands (go to sleep, back to wake word mode)
+        if any(contains_phrase(text, w) for w in SESSION_END_PHRASES):
+            print("[Processor] Ending session, returning to wake word mode", file=sys.stderr, flush=True)
+            turn.outcome = "session_end"
+            await self.say(turn, "Going to sleep. Say hey homer to wake me.")
+            await self.finish_speaking(turn)
+            conversation.reset()
+            self.session_end_event.set()
+            return
+
+        # Check for exit commands (full program shutdown)
+        if any(contains_phrase(text, w) for w in EXIT_PHRASES):
+            print("Goodbye!", flush=True)
+            turn.outcome = "exit"
+            await self.say(turn, "Goodbye!")
+            await self.finish_speaking(turn)
+            self.stop_event.set()
+            return
+
+        # Check for voice commands
+        is_cmd, cmd_response = await self._offload(None, handle_voice_command, text)
+        if is_cmd:
+            print(f"[Command: {cmd_response}]", file=sys.stderr)
+            turn.outcome = "command"
+            await self.say(turn, cmd_response)
+            await self.finish_speaking(turn)
+            return
+
+        # Time, date, arithmetic, units and timers are answered on the CPU, without the NPU
+        local = answer_locally(text, args.tts)
+        if local is not None:
+            if pending is not None:
+                pending.cancel()
+                self.spec_stats.record("discarded")
+            print(f"Assistant: {local.answer}", flush=True)
+            turn.outcome = "local"
+            await self.say(turn, local.answer)
+            conversation.add_turn(text, local.answer)
+            await self.finish_speaking(turn)
+            return
+
+        # Opening questions asked before are answered from the cache, without the NPU
+        answers = get_answer_cache()
+        cacheable = conversation.fresh
+        cached = answers.get(text) if cacheable else None
+        if cached is not None and pending is not None:
+            pending.cancel()
+            self.spec_stats.record("discarded")
+            pending = None
+
+        print("Thinking...", file=sys.stderr, flush=True)
+        print("Assistant:", end="", flush=True)
+
+        # Stream the reply and queue each sentence as soon as it is complete
+        buffer = ""
+        try:
+            if cached is not None:
+                logger.info(f"[AnswerCache] Hit for {normalize_question(text)!r}")
+                turn.outcome = "cached"
+                chunks = iter([cached])
+            elif pending is not None:
+                turn.outcome = "speculated"
+                turn.llm_stream = pending.llm_stream
+                turn.trace.mark("llm_request", pending.started_at)
+                chunks = iter(pending.stream())
+            else:
+                turn.outcome = "llm"
+                turn.llm_stream = conversation.stream(text, max_tokens=args.max_tokens)
+                turn.trace.mark("llm_request")
+                chunks = iter(turn.llm_stream)
+            done = object()
+            while True:
+                chunk = await self._offload("llm", next, chunks, done)
+                if chunk is done:
+                    break
+                turn.trace.mark("first_token")
+                print(chunk, end="", flush=True)
+                buffer += chunk
+                sentences = _split_sentences(buffer)
+                if len(sentences) > 1:
+                    for sentence in sentences[:-1]:
+                        await self.say(turn, sentence)
+                    buffer = sentences[-1]
+            print(flush=True)
+            await self.say(turn, buffer)
+            llm_stream = turn.llm_stream
+            if llm_stream is None:
+                conversation.add_turn(text, cached)
+            else:
+                if cacheable and llm_stream.final:
+                    answers.put(text, llm_stream.text, args.tts)
+                conversation.record(text, llm_stream)
+                turn.trace.attrs["llm"] = llm_stream.timing.as_dict()
+                logger.info(f"[LLM] {llm_stream.timing}")
+                logger.info(f"[LLM] Scheduler: {get_llm_scheduler(args.host).summary()}")
+            logger.info(f"[AnswerCache] {answers.stats()}")
+        except Exception as e:
+            print(f"\n[Processor] LLM error: {e}", file=sys.stderr)
+            turn.outcome = "fallback"
+            # Fallback: non-streaming
+            try:
+                response = await self._offload("llm", lambda: call_llm(text, args.host, timeout=LLM_TIMEOUT,
+                                                                        max_tokens=args.max_tokens))
+                print(f"Assistant: {response}")
+                await self.say(turn, response)
+            except Exception as e2:
+                print(f"[Processor] Fallback LLM also failed: {e2}", file=sys.stderr)
+
+        # Keep the listener muted until the whole reply has been played
+        await self.finish_speaking(turn)
+
+        # Log resource status after each turn
+        await self._offload(None, log_resource_status, "Processor")
+        if self.speculate:
+            logger.info(f"[Speculate] {self.spec_stats.summary()}")
+        print()  # Blank line between turns
 
-    try:
-        while processor.is_alive() and listener.is_alive():
-            # Periodic health logging (every 30 seconds)
-            if time.time() - last_health_log > 30:
-                log_resource_status("Health")
-                last_health_log = time.time()
 
-            # Quick sleep to avoid busy waiting
-            time.sleep(0.5)
+def run_threaded_assistant(args):
+    """Run the continuous voice assistant on the asyncio orchestrator."""
+    prewarm_pcm_cache(args.tts)
+    orchestrator = AssistantOrchestrator(args)
 
-        # One of the threads died unexpectedly
-        if not processor.is_alive():
-            logger.error("[Health] Processor thread died unexpectedly")
-        if not listener.is_alive():
-            logger.error("[Health] Listener thread died unexpectedly")
+    print("\nThreaded voice assistant running. Say 'goodbye' or 'exit' to quit.\n")
+    if orchestrator.wake_mode:
+        print(f"Say '{KWS_KEYWORD}' to start a session. Say 'go to sleep' to end it.\n")
 
+    try:
+        asyncio.run(orchestrator.run())
     except KeyboardInterrupt:
         print("\n[Interrupted]", file=sys.stderr)
     finally:
-        stop_event.set()
-        listener.join(timeout=2)
-        processor.join(timeout=2)
+        orchestrator.stop_event.set()
 
 
 # ============================================================================
@@ -852,29 +2299,188 @@ def _record_with_vad(output_file: str) -> str:
     return output_file
 
 
-def stt_faster_whisper(audio_file: str) -> str:
+def _samples_to_wav_bytes(samples, sample_rate: int = 16000) -> bytes:
+    """Encode float32 samples in [-1, 1] as an in-memory 16-bit WAV (for engines that only read WAV)."""
+    import io
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(_float_to_pcm16(samples))
+    return buf.getvalue()
+
+
+class SttModelRegistry:
     """
-    Transcribe audio using faster-whisper (CTranslate2 backend).
-    Fast and efficient, recommended for Raspberry Pi.
+    Process-wide cache of loaded STT models, keyed by (engine, model, compute_type, threads).
+
+    Models load lazily on first use; concurrent callers asking for the same key
+    wait for a single load. unload()/unload_all() drop models (e.g. under memory
+    pressure) and run any hooks registered with add_unload_hook(fn(key)).
     """
+
+    def __init__(self):
+        self._models = {}
+        self._key_locks = {}
+        self._unload_hooks = []
+        self._lock = threading.Lock()
+
+    def get(self, engine: str = "faster-whisper", model: str = STT_MODEL,
+            compute_type: str = STT_COMPUTE_TYPE, threads: int = STT_THREADS):
+        key = (engine, model, compute_type, threads)
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is not None:
+                get_model_manager().touch(self._model_name(key))
+                return loaded
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                loaded = self._models.get(key)
+            if loaded is None:
+                start = time.monotonic()
+                before = _rss_mb()
+                loaded = self._load(*key)
+                logger.info(f"[STT] Loaded {engine} model {model} ({compute_type}, threads={threads or 'default'}) "
+                            f"in {time.monotonic() - start:.1f}s")
+                with self._lock:
+                    self._models[key] = loaded
+                get_model_manager().track(self._model_name(key), lambda: self._drop([key]), _rss_mb() - before)
+        return loaded
+
+    def loaded(self) -> list:
+        with self._lock:
+            return list(self._models)
+
+    def unload(self, engine: str = None, model: str = None) -> int:
+        """Drop loaded models matching engine/model (None = any). Returns how many were unloaded."""
+        with self._lock:
+            keys = [k for k in self._models
+                    if (engine is None or k[0] == engine) and (model is None or k[1] == model)]
+        return self._drop(keys)
+
+    def _drop(self, keys: list) -> int:
+        """Unload exactly these registry keys (the model manager evicts one compute_type/threads variant)."""
+        with self._lock:
+            keys = [key for key in keys if self._models.pop(key, None) is not None]
+            hooks = list(self._unload_hooks)
+        for key in keys:
+            logger.info(f"[STT] Unloaded {key[0]} model {key[1]} ({key[2]}, threads={key[3] or 'default'})")
+            get_model_manager().forget(self._model_name(key))
+            for hook in hooks:
+                hook(key)
+        if keys:
+            gc.collect()
+        return len(keys)
+
+    @staticmethod
+    def _model_name(key: tuple) -> str:
+        return ":".join(["stt"] + [str(part) for part in key])
+
+    def unload_all(self) -> int:
+        return self.unload()
+
+    def add_unload_hook(self, hook) -> None:
+        with self._lock:
+            self._unload_hooks.append(hook)
+
+    @staticmethod
+    def _load(engine: str, model: str, compute_type: str, threads: int):
+        if engine == "sherpa-streaming":
+            return _load_sherpa_online_recognizer(model, threads)
+        if engine == "whisper":
+            try:
+                import whisper
+            except ImportError:
+                sys.exit("pip install openai-whisper")
+            if threads:
+                import torch
+                torch.set_num_threads(threads)
+            return whisper.load_model(model.replace(".en", ""))  # whisper uses different model names
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            sys.exit("pip install faster-whisper")
+        return WhisperModel(model, device="cpu", compute_type=compute_type, cpu_threads=threads)
+
+
+def _load_sherpa_online_recognizer(model_dir: str, threads: int):
+    """Build a sherpa-onnx OnlineRecognizer from a streaming zipformer (transducer) or paraformer model dir."""
     try:
-        from faster_whisper import WhisperModel
+        import sherpa_onnx
     except ImportError:
-        sys.exit("pip install faster-whisper")
+        raise ImportError("pip install sherpa-onnx")
+    if not os.path.isdir(model_dir):
+        raise FileNotFoundError(f"Streaming STT model not found at {model_dir}")
+    tokens = os.path.join(model_dir, "tokens.txt")
+    encoder = WakeWordDetector._find_model(model_dir, "encoder")
+    decoder = WakeWordDetector._find_model(model_dir, "decoder")
+    common = dict(tokens=tokens, encoder=encoder, decoder=decoder, num_threads=threads or 2,
+                  sample_rate=16000, feature_dim=80, enable_endpoint_detection=True,
+                  rule1_min_trailing_silence=2.4, rule2_min_trailing_silence=1.2, rule3_min_utterance_length=20)
+    try:
+        joiner = WakeWordDetector._find_model(model_dir, "joiner")
+    except FileNotFoundError:
+        return sherpa_onnx.OnlineRecognizer.from_paraformer(**common)
+    return sherpa_onnx.OnlineRecognizer.from_transducer(joiner=joiner, decoding_method="greedy_search", **common)
 
-    # Use int8 quantization for speed on CPU
-    model = WhisperModel(STT_MODEL, device="cpu", compute_type="int8")
 
-    segments, info = model.transcribe(audio_file, beam_size=5)
+def stt_sherpa_streaming(audio) -> str:
+    """
+    Transcribe a complete recording with the streaming recognizer (used for files and
+    for segments the listener could not decode live).
+
+    Args:
+        audio: Path to a 16kHz mono WAV file, or float32 numpy samples at 16kHz.
+    """
+    import numpy as np
+    if isinstance(audio, str):
+        with wave.open(audio, "rb") as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+    try:
+        recognizer = StreamingRecognizer()
+    except (ImportError, FileNotFoundError) as e:
+        logger.warning(f"[STT] Streaming model unavailable ({e}), using faster-whisper")
+        return stt_faster_whisper(audio)
+    recognizer.accept(np.asarray(audio, dtype=np.float32))
+    return recognizer.finalize()
+
+
+_STT_MODELS = SttModelRegistry()
+_STT_MODELS.add_unload_hook(_release_streaming_recognizers)
+
+
+def get_stt_models() -> SttModelRegistry:
+    """Return the process-wide STT model registry."""
+    return _STT_MODELS
+
+
+def stt_faster_whisper(audio, model=None) -> str:
+    """
+    Transcribe audio using faster-whisper (CTranslate2 backend).
+    Fast and efficient, recommended for Raspberry Pi.
+
+    Args:
+        audio: Path to a WAV file, or float32 numpy samples at 16kHz (decoded in memory, no temp file).
+        model: WhisperModel to use; defaults to the shared, already-warm registry model.
+    """
+    if model is None:
+        model = get_stt_models().get("faster-whisper")
+
+    segments, info = model.transcribe(audio, beam_size=STT_BEAM_SIZE, vad_filter=STT_VAD_FILTER)
     text = " ".join(segment.text.strip() for segment in segments)
 
     return text.strip()
 
 
-def stt_whisper_cpp(audio_file: str) -> str:
+def stt_whisper_cpp(audio) -> str:
     """
     Transcribe audio using whisper.cpp binary.
     Very fast C++ implementation.
+
+    Args:
+        audio: Path to a WAV file, or float32 numpy samples at 16kHz (piped to whisper.cpp as WAV on stdin).
     """
     if not os.path.isfile(WHISPER_CPP_BIN):
         print(f"whisper.cpp not found at {WHISPER_CPP_BIN}", file=sys.stderr)
@@ -884,6 +2490,16 @@ def stt_whisper_cpp(audio_file: str) -> str:
         print(f"whisper.cpp model not found at {WHISPER_CPP_MODEL}", file=sys.stderr)
         return ""
 
+    if not isinstance(audio, str):
+        # In-memory path: "-f -" reads the WAV from stdin; text comes back on stdout
+        cmd = [WHISPER_CPP_BIN, "-m", WHISPER_CPP_MODEL, "-f", "-", "-nt"]
+        if STT_THREADS:
+            cmd += ["-t", str(STT_THREADS)]
+        result = subprocess.run(cmd, input=_samples_to_wav_bytes(audio), capture_output=True, timeout=60)
+        lines = result.stdout.decode("utf-8", errors="replace").strip().split("\n")
+        return " ".join(line.strip() for line in lines if line.strip()).strip()
+
+    audio_file = audio
     cmd = [
         WHISPER_CPP_BIN,
         "-m", WHISPER_CPP_MODEL,
@@ -891,6 +2507,8 @@ def stt_whisper_cpp(audio_file: str) -> str:
         "-nt",  # No timestamps
         "--output-txt",  # Output to txt file
     ]
+    if STT_THREADS:
+        cmd += ["-t", str(STT_THREADS)]
 
     result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
 
@@ -912,28 +2530,26 @@ def stt_whisper_cpp(audio_file: str) -> str:
     return " ".join(text_lines).strip()
 
 
-def stt_openai_whisper(audio_file: str) -> str:
+def stt_openai_whisper(audio) -> str:
     """
     Transcribe audio using OpenAI's whisper Python package.
     Slower than faster-whisper, use only if faster-whisper is unavailable.
-    """
-    try:
-        import whisper
-    except ImportError:
-        sys.exit("pip install openai-whisper")
 
-    model = whisper.load_model(STT_MODEL.replace(".en", ""))  # whisper uses different model names
-    result = model.transcribe(audio_file)
+    Args:
+        audio: Path to a WAV file, or float32 numpy samples at 16kHz.
+    """
+    model = get_stt_models().get("whisper")
+    result = model.transcribe(audio)
 
     return result["text"].strip()
 
 
-def transcribe(audio_file: str, engine: str = None) -> str:
+def transcribe(audio, engine: str = None) -> str:
     """
-    Transcribe audio file to text using specified STT engine.
+    Transcribe audio to text using specified STT engine.
 
     Args:
-        audio_file: Path to WAV audio file.
+        audio: Path to WAV audio file, or float32 numpy samples at 16kHz.
         engine: STT engine to use. If None, uses STT_ENGINE env var.
 
     Returns:
@@ -942,11 +2558,13 @@ def transcribe(audio_file: str, engine: str = None) -> str:
     engine = engine or STT_ENGINE
 
     if engine == "whisper.cpp":
-        return stt_whisper_cpp(audio_file)
+        return stt_whisper_cpp(audio)
+    elif engine == "sherpa-streaming":
+        return stt_sherpa_streaming(audio)
     elif engine == "whisper":
-        return stt_openai_whisper(audio_file)
+        return stt_openai_whisper(audio)
     else:  # faster-whisper (default)
-        return stt_faster_whisper(audio_file)
+        return stt_faster_whisper(audio)
 
 
 def listen(engine: str = None) -> str:
@@ -971,345 +2589,1994 @@ def listen(engine: str = None) -> str:
 # LLM Functions
 # ============================================================================
 
-# Global LLM cooldown tracker
-_last_llm_call = 0.0
-
+class LLMTicket:
+    """One admitted (or waiting) LLM call."""
 
-def _wait_llm_cooldown():
-    """Wait if needed to respect LLM_COOLDOWN between calls (prevents PCIe crash)."""
-    global _last_llm_call
-    elapsed = time.monotonic() - _last_llm_call
-    if elapsed < LLM_COOLDOWN:
-        wait = LLM_COOLDOWN - elapsed
-        logger.info(f"[LLM] Cooldown: waiting {wait:.1f}s (last call {elapsed:.1f}s ago)")
-        time.sleep(wait)
-
-
-def _format_prompt(user_text: str) -> str:
-    """Prepend system prompt to user text for single-turn LLM calls."""
-    return f"{LLM_SYSTEM_PROMPT}\n\nUser: {user_text}\nAssistant:"
+    __slots__ = ("cost", "enqueued", "admitted", "previous_start")
 
+    def __init__(self, cost: float):
+        self.cost = cost  # Predicted tokens charged at admission
+        self.enqueued = time.monotonic()
+        self.admitted = None
+        self.previous_start = None  # "fixed" policy: start of the call before this one
 
-def call_llm(prompt: str, host: str = OLLAMA_HOST, timeout: int = LLM_TIMEOUT,
-             max_tokens: int = None) -> str:
-    global _last_llm_call
-    _wait_llm_cooldown()
-    try:
-        import requests
-    except ImportError:
-        sys.exit("pip install requests")
-    payload = {"model": MODEL, "prompt": _format_prompt(prompt), "stream": False,
-               "options": {"num_predict": max_tokens or LLM_MAX_TOKENS}}
-    r = requests.post(
-        f"{host}/api/generate",
-        json=payload,
-        headers={"Content-Type": "application/json"},
-        timeout=timeout,
-    )
-    _last_llm_call = time.monotonic()
-    r.raise_for_status()
-    return r.json().get("response", "").strip()
 
+class LLMScheduler:
+    """
+    Admission control for the Hailo NPU behind hailo-ollama.
+
+    Calls queue FIFO, one in flight at a time. Policy "fixed" keeps the old
+    behaviour: starts are at least `cooldown` seconds apart. Policy "adaptive"
+    is a token bucket: each call is charged its predicted token count (an
+    EWMA of observed eval counts, capped at max_tokens) and the bucket refills
+    at LLM_TOKEN_RATE, so short replies can go back-to-back while long ones
+    are spaced out. Failures (errors, deadlines, truncated streams) drain the
+    bucket and back off exponentially, capped at LLM_COOLDOWN; a reply that
+    runs far slower per token than usual is treated as a warning and backs off
+    for as long as it took.
+    """
 
-def call_llm_stream(prompt: str, host: str = OLLAMA_HOST, timeout: int = LLM_TIMEOUT,
-                    max_tokens: int = None):
-    """Yield response chunks as they arrive (Ollama NDJSON stream)."""
-    global _last_llm_call
-    _wait_llm_cooldown()
-    try:
-        import requests
-    except ImportError:
-        sys.exit("pip install requests")
-    payload = {"model": MODEL, "prompt": _format_prompt(prompt), "stream": True,
-               "options": {"num_predict": max_tokens or LLM_MAX_TOKENS}}
-    r = requests.post(
-        f"{host}/api/generate",
-        json=payload,
-        headers={"Content-Type": "application/json"},
-        stream=True,
-        timeout=timeout,
-    )
-    r.raise_for_status()
-    _last_llm_call = time.monotonic()
-    for line in r.iter_lines(decode_unicode=True):
-        if not line:
-            continue
-        try:
-            obj = json.loads(line)
-            chunk = obj.get("response", "")
-            if chunk:
-                yield chunk
-            if obj.get("done"):
-                break
-        except json.JSONDecodeError:
-            continue
+    SLOW_FACTOR = 2.0  # Seconds per token above this multiple of the norm counts as a degraded reply
+    EWMA_ALPHA = 0.3
+    WAIT_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # Admission wait histogram bounds
+
+    def __init__(self, policy: str = LLM_SCHEDULER, cooldown: float = LLM_COOLDOWN,
+                 budget_tokens: int = LLM_TOKEN_BUDGET, token_rate: float = LLM_TOKEN_RATE):
+        if policy not in ("adaptive", "fixed"):
+            raise ValueError(f"unknown LLM scheduler policy: {policy}")
+        self.policy = policy
+        self.cooldown = cooldown
+        self.budget = float(budget_tokens)
+        self.rate = float(token_rate)
+        self.level = self.budget  # Tokens currently available
+        self.predicted_tokens = None  # EWMA of tokens per reply
+        self.sec_per_token = None  # EWMA of generation time per token
+        self.failures = 0  # Consecutive failures
+        self.admitted = 0
+        self.completed = {"ok": 0, "failed": 0, "cancelled": 0, "unreached": 0}
+        self._backoff_until = 0.0
+        self._last_start = 0.0
+        self._refilled = time.monotonic()
+        self._in_flight = 0
+        self._queue = []
+        self._waits_ms = collections.deque(maxlen=100)
+        self._wait_counts = [0] * len(self.WAIT_BUCKETS_S)  # Admissions per bucket (not cumulative)
+        self._wait_sum = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, max_tokens: int = None, cancel_event: threading.Event = None):
+        """
+        Block until this call may start. Returns an LLMTicket to pass to complete(),
+        or None if cancel_event was set while waiting.
+        """
+        ticket = LLMTicket(self._predict(max_tokens))
+        with self._cond:
+            self._queue.append(ticket)
+            logged = False
+            try:
+                while True:
+                    delay = None
+                    if self._queue[0] is ticket and not self._in_flight:
+                        delay = self._admit_delay(ticket.cost)
+                        if delay <= 0:
+                            self._admit(ticket)
+                            return ticket
+                        if not logged:
+                            logger.info(f"[LLM] Scheduler: waiting {delay:.1f}s ({self.policy}, "
+                                        f"{len(self._queue) - 1} queued behind)")
+                            logged = True
+                    if cancel_event is not None:
+                        if cancel_event.is_set():
+                            return None
+                        delay = min(delay or 0.1, 0.1)  # cancel_event can't notify the condition
+                    self._cond.wait(delay)
+            finally:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    self._cond.notify_all()
 
+    def complete(self, ticket: LLMTicket, tokens: int, duration: float, outcome: str) -> None:
+        """
+        Report how an admitted call ended: "ok", "failed" (error, deadline, truncated
+        stream), "cancelled" (abandoned by us) or "unreached" (never connected).
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._in_flight -= 1
+            self.completed[outcome] = self.completed.get(outcome, 0) + 1
+            if outcome in ("cancelled", "unreached"):
+                # Refund what the NPU didn't actually do, so the replacement call isn't delayed
+                self.level = min(self.budget, self.level + max(ticket.cost - tokens, 0))
+                if self._last_start == ticket.admitted:
+                    self._last_start = ticket.previous_start
+            else:
+                self.level -= tokens - ticket.cost  # Settle the prediction against the real count
+            if outcome == "ok":
+                self.failures = 0
+                if tokens:
+                    self.predicted_tokens = self._ewma(self.predicted_tokens, tokens)
+                    per_token = duration / tokens
+                    if self.sec_per_token and per_token > self.SLOW_FACTOR * self.sec_per_token:
+                        logger.warning(f"[LLM] Scheduler: slow reply ({per_token * 1000:.0f}ms/token), "
+                                       f"backing off {min(duration, self.cooldown):.1f}s")
+                        self._backoff_until = now + min(duration, self.cooldown)
+                    self.sec_per_token = self._ewma(self.sec_per_token, per_token)
+            elif outcome in ("failed", "unreached"):
+                self.failures += 1
+                self.level = min(self.level, 0.0)
+                backoff = min(self.cooldown, 2.0 * 2 ** (self.failures - 1))
+                self._backoff_until = now + backoff
+                logger.warning(f"[LLM] Scheduler: {outcome} call #{self.failures}, backing off {backoff:.1f}s")
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            waits = sorted(self._waits_ms)
+            return {
+                "policy": self.policy,
+                "queue_depth": len(self._queue),
+                "in_flight": self._in_flight,
+                "admitted": self.admitted,
+                **{f"completed_{k}": v for k, v in self.completed.items()},
+                "tokens_available": round(self.level, 1),
+                "predicted_tokens": round(self.predicted_tokens or 0, 1),
+                "ms_per_token": round((self.sec_per_token or 0) * 1000, 1),
+                "consecutive_failures": self.failures,
+                "backoff_s": round(max(self._backoff_until - time.monotonic(), 0), 1),
+                "wait_ms_p50": waits[len(waits) // 2] if waits else 0,
+                "wait_ms_p95": waits[int(len(waits) * 0.95)] if waits else 0,
+                "wait_ms_max": waits[-1] if waits else 0,
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"{s['policy']} queue={s['queue_depth']} tokens={s['tokens_available']}/{self.budget:.0f} "
+                f"predicted={s['predicted_tokens']} wait p50={s['wait_ms_p50']}ms p95={s['wait_ms_p95']}ms "
+                f"failures={s['consecutive_failures']}")
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def wait_histogram(self):
+        """Admission waits since start: ([(upper bound s, cumulative count)], total s, count) for Tracer.histograms."""
+        with self._cond:
+            counts, total, count = list(self._wait_counts), self._wait_sum, self.admitted
+        cumulative = list(itertools.accumulate(counts))
+        return list(zip(self.WAIT_BUCKETS_S, cumulative)), total, count
+
+    def _predict(self, max_tokens):
+        limit = max_tokens or LLM_MAX_TOKENS
+        with self._cond:
+            if self.predicted_tokens is None:
+                return float(min(limit, self.budget))  # Nothing learned yet: assume the worst
+            return float(min(limit, self.predicted_tokens * 1.2, self.budget))
+
+    def _ewma(self, current, value):
+        return value if current is None else current + self.EWMA_ALPHA * (value - current)
+
+    def _refill(self, now):
+        self.level = min(self.budget, self.level + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _admit_delay(self, cost: float) -> float:
+        now = time.monotonic()
+        if self.policy == "fixed":
+            return self._last_start + self.cooldown - now
+        self._refill(now)
+        delay = self._backoff_until - now
+        if self.level < cost:
+            delay = max(delay, (cost - self.level) / self.rate if self.rate > 0 else self.cooldown)
+        return delay
+
+    def _admit(self, ticket: LLMTicket):
+        now = time.monotonic()
+        self._queue.remove(ticket)
+        self._in_flight += 1
+        self.admitted += 1
+        if self.policy == "adaptive":
+            self.level -= ticket.cost
+        ticket.admitted = now
+        ticket.previous_start, self._last_start = self._last_start, now
+        wait = now - ticket.enqueued
+        self._waits_ms.append(round(wait * 1000))
+        self._wait_sum += wait
+        index = bisect.bisect_left(self.WAIT_BUCKETS_S, wait)
+        if index < len(self._wait_counts):
+            self._wait_counts[index] += 1
 
-def _split_sentences(text: str):
-    """Split on sentence boundaries (., !, ?) keeping delimiters; return list of sentences."""
-    # Split after . ! ? when followed by space or end
-    parts = re.split(r'(?<=[.!?])\s+', text)
-    return [p.strip() for p in parts if p.strip()]
 
+_LLM_SCHEDULERS = {}
+_LLM_SCHEDULERS_LOCK = threading.Lock()
 
-def tts_pyttsx3(text: str) -> None:
-    import pyttsx3
-    e = pyttsx3.init()
-    # Slightly slower rate for smoother sound (default often 200 wpm)
-    e.setProperty("rate", 150)
-    e.say(text)
-    e.runAndWait()
 
+def get_llm_scheduler(host: str = OLLAMA_HOST) -> LLMScheduler:
+    """Return the scheduler for the NPU behind host (shared by every client talking to it)."""
+    with _LLM_SCHEDULERS_LOCK:
+        key = host.rstrip("/")
+        if key not in _LLM_SCHEDULERS:
+            _LLM_SCHEDULERS[key] = LLMScheduler()
+        return _LLM_SCHEDULERS[key]
 
-def tts_piper(text: str, timeout: int = TTS_TIMEOUT) -> None:
-    """Use Piper standalone binary; stream output to paplay so playback starts as soon as first chunks are ready."""
-    model_path = os.path.join(PIPER_MODEL_DIR, f"{PIPER_VOICE}.onnx")
-    config_path = os.path.join(PIPER_MODEL_DIR, f"{PIPER_VOICE}.onnx.json")
-    if not os.path.isfile(model_path) or not os.path.isfile(PIPER_BIN):
-        print("Piper model or binary not found, using pyttsx3.", file=sys.stderr)
-        tts_pyttsx3(text)
-        return
-    piper_dir = os.path.dirname(PIPER_BIN)
-    env = os.environ.copy()
-    env["LD_LIBRARY_PATH"] = os.path.pathsep.join([PIPER_LD_LIBRARY_PATH, env.get("LD_LIBRARY_PATH", "")])
-    cmd = [
-        PIPER_BIN,
-        "--model", model_path,
-        "--config", config_path,
-        "--output_raw",
-        "--espeak_data", PIPER_ESPEAK_DATA,
-        "--length_scale", PIPER_LENGTH_SCALE,
-        "--sentence_silence", PIPER_SENTENCE_SILENCE,
-        "--noise_scale", PIPER_NOISE_SCALE,
-        "--noise_w", PIPER_NOISE_W,
-    ]
-    try:
-        piper_proc = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            env=env,
-            cwd=piper_dir,
-        )
-        paplay_proc = subprocess.Popen(
-            ["paplay", "--raw", "--format=s16le", "--rate=22050", "--channels=1"],
-            stdin=piper_proc.stdout,
-            stderr=subprocess.DEVNULL,
-        )
-        piper_proc.stdout.close()
-        piper_proc.stdin.write(text.encode("utf-8"))
-        piper_proc.stdin.close()
-        piper_proc.wait(timeout=timeout)
-        paplay_proc.wait(timeout=timeout)
-    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
-        print(f"Piper failed ({e}), using pyttsx3.", file=sys.stderr)
-        try:
-            piper_proc.kill()
-            paplay_proc.kill()
-        except Exception:
-            pass
-        tts_pyttsx3(text)
 
+class LLMTiming:
+    """Per-call latency breakdown (milliseconds) and throughput."""
 
-# Global Sherpa-ONNX TTS instance (lazy-loaded)
-_SHERPA_TTS = None
+    __slots__ = ("queued_ms", "connect_ms", "ttft_ms", "total_ms", "tokens", "tokens_per_sec")
 
+    def __init__(self):
+        self.queued_ms = 0  # Waiting for the scheduler to admit the call
+        self.connect_ms = 0  # Request sent → response headers
+        self.ttft_ms = 0  # Request sent → first token
+        self.total_ms = 0  # Request sent → last token
+        self.tokens = 0
+        self.tokens_per_sec = 0.0
 
-def _get_sherpa_tts():
-    """Lazy-load and cache Sherpa-ONNX OfflineTts instance."""
-    global _SHERPA_TTS
-    if _SHERPA_TTS is not None:
-        return _SHERPA_TTS
-    try:
-        import sherpa_onnx
-    except ImportError:
-        return None
-    if not os.path.isdir(SHERPA_TTS_MODEL):
-        return None
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
 
-    # Find model .onnx file (single-speaker piper or multi-speaker VCTK)
-    onnx_file = None
-    for f in os.listdir(SHERPA_TTS_MODEL):
-        if f.endswith(".onnx") and "int8" not in f:
-            onnx_file = os.path.join(SHERPA_TTS_MODEL, f)
-            break
-    if not onnx_file:
-        return None
+    def __str__(self):
+        return (f"queued={self.queued_ms}ms connect={self.connect_ms}ms ttft={self.ttft_ms}ms "
+                f"total={self.total_ms}ms tokens={self.tokens} ({self.tokens_per_sec:.1f} tok/s)")
 
-    tokens_file = os.path.join(SHERPA_TTS_MODEL, "tokens.txt")
-    data_dir = os.path.join(SHERPA_TTS_MODEL, "espeak-ng-data")
-    lexicon_file = os.path.join(SHERPA_TTS_MODEL, "lexicon.txt")
 
-    config = sherpa_onnx.OfflineTtsConfig()
-    config.model.vits.model = onnx_file
-    config.model.vits.tokens = tokens_file
-    # Prefer system espeak-ng-data — bundled version often mismatches sherpa-onnx
-    # version, causing a C++ error that doesn't raise a Python exception
-    sys_data = "/usr/lib/aarch64-linux-gnu/espeak-ng-data"
-    if os.path.isdir(sys_data):
-        config.model.vits.data_dir = sys_data
-    elif os.path.isdir(data_dir):
-        config.model.vits.data_dir = data_dir
-    if os.path.isfile(lexicon_file):
-        config.model.vits.lexicon = lexicon_file
-    config.model.num_threads = SHERPA_TTS_THREADS
-    config.model.debug = False
-    config.model.provider = "cpu"
+class LLMCancelled(Exception):
+    """Raised by LLMClient.generate()/chat() when cancel_event is set before the reply arrives."""
 
-    _SHERPA_TTS = sherpa_onnx.OfflineTts(config)
-    logger.info(f"Sherpa-ONNX TTS loaded: {_SHERPA_TTS.sample_rate}Hz, {SHERPA_TTS_THREADS} threads, model={os.path.basename(onnx_file)}")
-    return _SHERPA_TTS
 
+class LLMStream:
+    """
+    One streamed generation. Iterate to get text chunks; cancel() from any thread
+    aborts it (closing the connection), after which iteration simply stops.
 
-def tts_sherpa(text: str, timeout: int = TTS_TIMEOUT) -> None:
-    """Use Sherpa-ONNX VITS TTS — NEON-optimized, targets RTF < 0.1 on Pi 5."""
-    tts = _get_sherpa_tts()
-    if tts is None:
-        logger.warning("Sherpa-ONNX TTS not available, falling back to Piper")
-        tts_piper(text, timeout=timeout)
-        return
-    try:
-        audio = tts.generate(text, sid=SHERPA_TTS_SPEAKER, speed=SHERPA_TTS_SPEED)
-        if not audio.samples:
-            logger.warning("Sherpa-ONNX TTS produced no audio, falling back to Piper")
-            tts_piper(text, timeout=timeout)
-            return
-        # Convert float samples to 16-bit PCM for paplay
-        import array
-        import struct
-        samples = audio.samples
-        if hasattr(samples, 'tobytes'):
-            # numpy array — convert directly
-            import numpy as np
-            pcm_data = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
-        else:
-            # list of floats — pack manually
-            pcm_data = struct.pack(f'<{len(samples)}h',
-                                   *[int(max(-1.0, min(1.0, s)) * 32767) for s in samples])
-        # Play via aplay (ALSA) or paplay (PulseAudio) — raw PCM s16le
-        player = "paplay" if os.path.isfile("/usr/bin/paplay") else "aplay"
-        if player == "aplay":
-            cmd = [player, "-q", "-t", "raw", "-f", "S16_LE", "-r", str(tts.sample_rate), "-c", "1"]
-        else:
-            cmd = [player, "--raw", f"--rate={tts.sample_rate}", "--format=s16le", "--channels=1"]
-        proc = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-        )
-        proc.communicate(input=pcm_data, timeout=timeout)
-    except Exception as e:
-        logger.warning(f"Sherpa-ONNX TTS failed ({e}), falling back to Piper")
-        tts_piper(text, timeout=timeout)
+    Nothing is sent until iteration starts, so the scheduler wait happens on the
+    consuming thread and can itself be cancelled.
+    """
 
+    def __init__(self, client: "LLMClient", path: str, payload: dict, deadline: float = None,
+                 cancel_event: threading.Event = None):
+        self.timing = LLMTiming()
+        self.text = ""
+        self.final = {}  # Last NDJSON object (done=true): eval_count, context, ...
+        self.cancelled = False
+        self._client = client
+        self._path = path
+        self._payload = payload
+        self._deadline = deadline
+        self._cancel = cancel_event or threading.Event()
+        self._expired = False
+        self._response = None
+        self._lock = threading.Lock()
 
-# Global Supertonic instance (lazy-loaded)
-_SUPERTONIC_TTS = None
-_SUPERTONIC_STYLE = None
+    def cancel(self) -> None:
+        self._cancel.set()
+        self._abort()
 
+    def _expire(self):
+        self._expired = True
+        self._abort()
 
-def tts_supertonic(text: str, timeout: int = TTS_TIMEOUT) -> None:
-    """Use Supertonic ONNX TTS - higher quality at 44100Hz, optimized for speed.
+    def _abort(self):
+        with self._lock:
+            response, self._response = self._response, None
+        if response is not None:
+            # Shut the socket down first: close() alone doesn't wake a read blocked in another thread
+            conn = getattr(response.raw, "_connection", None)
+            sock = getattr(conn, "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            response.close()
 
-    This runs Supertonic in a subprocess using its virtualenv Python, since
-    Supertonic requires onnxruntime, soundfile, librosa which may not be in system Python.
+    def __iter__(self):
+        import requests
+        scheduler = self._client.scheduler
+        start = time.monotonic()
+        ticket = scheduler.acquire(self._payload.get("options", {}).get("num_predict"), self._cancel)
+        if ticket is None:
+            self.cancelled = True
+            return
+        self.timing.queued_ms = round((time.monotonic() - start) * 1000)
+        timer = None
+        if self._deadline:
+            timer = threading.Timer(self._deadline, self._expire)
+            timer.daemon = True
+            timer.start()
+        sent = time.monotonic()
+        outcome = "failed"
+        try:
+            # The read timeout also bounds the wait for headers, which the deadline timer can't interrupt
+            read_timeout = min(self._client.timeout, self._deadline or self._client.timeout)
+            try:
+                r = self._client.session.post(f"{self._client.host}{self._path}", json=self._payload,
+                                              stream=True, timeout=(self._client.timeout, read_timeout))
+            except requests.ConnectionError as e:
+                from urllib3.exceptions import NewConnectionError
+                reason = getattr(e.args[0], "reason", None) if e.args else None
+                if isinstance(e, requests.ConnectTimeout) or isinstance(reason, NewConnectionError):
+                    outcome = "unreached"  # Server down, not a stuck NPU
+                raise
+            with self._lock:
+                self._response = r  # Stored before raise_for_status() so the finally closes it on 4xx/5xx too
+            r.raise_for_status()
+            self.timing.connect_ms = round((time.monotonic() - sent) * 1000)
+            if self._cancel.is_set():
+                self._abort()
+            # chunk_size=None hands over each chunk as it arrives instead of waiting for 512 bytes
+            for line in r.iter_lines(chunk_size=None, decode_unicode=True):
+                if self._cancel.is_set() or self._expired:
+                    break
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                chunk = obj.get("response") or obj.get("message", {}).get("content", "")
+                if chunk:
+                    if not self.text:
+                        self.timing.ttft_ms = round((time.monotonic() - sent) * 1000)
+                    self.timing.tokens += 1
+                    self.text += chunk
+                    yield chunk
+                if obj.get("done"):
+                    self.final = obj
+                    break
+            if self.final:
+                outcome = "ok"
+            elif not (self._cancel.is_set() or self._expired):
+                logger.warning("[LLM] Stream ended without a done message")
+        except (requests.RequestException, AttributeError, ValueError):
+            # A cancelled or expired stream fails inside iter_lines once its socket is closed
+            if not (self._cancel.is_set() or self._expired):
+                raise
+        except GeneratorExit:
+            outcome = "cancelled"  # Consumer stopped reading
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._abort()
+            self.timing.total_ms = round((time.monotonic() - sent) * 1000)
+            self._finish_timing()
+            if self._cancel.is_set() and not self._expired:
+                outcome = "cancelled"
+            scheduler.complete(ticket, self.timing.tokens, self.timing.total_ms / 1000.0, outcome)
+
+        if self._expired:
+            raise TimeoutError(f"LLM request exceeded {self._deadline}s deadline")
+        if self._cancel.is_set():
+            self.cancelled = True
+            logger.info("[LLM] Stream cancelled")
+
+    def _finish_timing(self):
+        t = self.timing
+        if self.final.get("eval_count"):
+            t.tokens = self.final["eval_count"]
+        if self.final.get("eval_duration"):
+            t.tokens_per_sec = round(t.tokens / (self.final["eval_duration"] / 1e9), 1)
+        elif t.tokens and t.total_ms > t.ttft_ms:
+            t.tokens_per_sec = round(t.tokens / ((t.total_ms - t.ttft_ms) / 1000), 1)
+
+
+class LLMClient:
     """
-    if not os.path.isdir(SUPERTONIC_DIR):
-        print("Supertonic not found, using piper.", file=sys.stderr)
-        tts_piper(text, timeout=timeout)
+    Ollama / hailo-ollama HTTP client.
+
+    Holds one keep-alive requests.Session (pooled connections, connect errors
+    retried). Every call is admitted by the client's LLMScheduler, so threads
+    sharing a client queue up instead of racing the NPU. Streams are LLMStream
+    objects that can be cancelled mid-flight and carry per-call timing.
+    """
+
+    def __init__(self, host: str = OLLAMA_HOST, model: str = MODEL, timeout: float = LLM_TIMEOUT,
+                 cooldown: float = None, retries: int = 2, pool_size: int = 2, scheduler: "LLMScheduler" = None):
+        """cooldown forces a fixed spacing between calls (0 disables it); by default LLM_SCHEDULER decides."""
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+        except ImportError:
+            sys.exit("pip install requests")
+        self.host = host.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        if scheduler is None:
+            scheduler = LLMScheduler("fixed", cooldown=cooldown) if cooldown is not None else LLMScheduler()
+        self.scheduler = scheduler
+        self.last_timing = None  # LLMTiming of the most recent completed call
+        self.session = requests.Session()
+        self.session.headers["Content-Type"] = "application/json"
+        # Retry only failures to connect: a request that reached the server may already be running on the NPU
+        retry = Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.2)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _payload(self, key: str, value, stream: bool, max_tokens: int, model: str, **extra) -> dict:
+        payload = {"model": model or self.model, key: value, "stream": stream, **extra}
+        if max_tokens:
+            payload["options"] = {"num_predict": max_tokens}
+        return payload
+
+    def list_models(self) -> list:
+        r = self.session.get(f"{self.host}/api/tags", timeout=self.timeout)
+        r.raise_for_status()
+        return r.json().get("models", [])
+
+    def stream_generate(self, prompt: str, max_tokens: int = None, model: str = None, deadline: float = None,
+                        cancel_event: threading.Event = None, **extra) -> LLMStream:
+        """Stream /api/generate for a raw prompt (no system prompt added)."""
+        payload = self._payload("prompt", prompt, True, max_tokens, model, **extra)
+        return LLMStream(self, "/api/generate", payload, deadline, cancel_event)
+
+    def stream_chat(self, messages: list, max_tokens: int = None, model: str = None, deadline: float = None,
+                    cancel_event: threading.Event = None, **extra) -> LLMStream:
+        """Stream /api/chat for a list of {"role", "content"} messages."""
+        payload = self._payload("messages", messages, True, max_tokens, model, **extra)
+        return LLMStream(self, "/api/chat", payload, deadline, cancel_event)
+
+    def generate(self, prompt: str, max_tokens: int = None, model: str = None, deadline: float = None,
+                 cancel_event: threading.Event = None, **extra) -> str:
+        return self._collect(self.stream_generate(prompt, max_tokens, model, deadline, cancel_event, **extra))
+
+    def chat(self, messages: list, max_tokens: int = None, model: str = None, deadline: float = None,
+             cancel_event: threading.Event = None, **extra) -> str:
+        return self._collect(self.stream_chat(messages, max_tokens, model, deadline, cancel_event, **extra))
+
+    def _collect(self, stream: LLMStream) -> str:
+        for _ in stream:
+            pass
+        self.last_timing = stream.timing
+        if stream.cancelled:
+            raise LLMCancelled()
+        return stream.text.strip()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_LLM_CLIENTS = {}
+_LLM_CLIENTS_LOCK = threading.Lock()
+
+
+def get_llm_client(host: str = OLLAMA_HOST, model: str = MODEL) -> LLMClient:
+    """Return the shared client for host/model, creating it on first use."""
+    key = (host.rstrip("/"), model)
+    with _LLM_CLIENTS_LOCK:
+        if key not in _LLM_CLIENTS:
+            _LLM_CLIENTS[key] = LLMClient(host, model, scheduler=get_llm_scheduler(host))
+        return _LLM_CLIENTS[key]
+
+
+def _format_prompt(user_text: str) -> str:
+    """Prepend system prompt to user text for single-turn LLM calls."""
+    return f"{LLM_SYSTEM_PROMPT}\n\nUser: {user_text}\nAssistant:"
+
+
+def call_llm(prompt: str, host: str = OLLAMA_HOST, timeout: int = LLM_TIMEOUT,
+             max_tokens: int = None) -> str:
+    return get_llm_client(host).generate(_format_prompt(prompt), max_tokens=max_tokens or LLM_MAX_TOKENS,
+                                         deadline=timeout)
+
+
+def call_llm_stream(prompt: str, host: str = OLLAMA_HOST, timeout: int = LLM_TIMEOUT,
+                    max_tokens: int = None, cancel_event: threading.Event = None) -> LLMStream:
+    """
+    Stream response chunks as they arrive (Ollama NDJSON stream), with the
+    system prompt prepended. timeout is the deadline for the whole reply.
+
+    Setting cancel_event (or calling .cancel() on the returned stream) stops it;
+    a cancelled request is refunded to the scheduler.
+    """
+    return get_llm_client(host).stream_generate(_format_prompt(prompt), max_tokens=max_tokens or LLM_MAX_TOKENS,
+                                                deadline=timeout, cancel_event=cancel_event)
+
+
+class ConversationSession:
+    """
+    Multi-turn conversation over /api/generate for one wake session.
+
+    The system prompt is sent once. Later turns send only the new user text
+    plus the `context` token array Ollama returned for the previous turn, so
+    the server doesn't prefill the conversation again. If the server returns
+    no context, the recent turns are resent as text instead. When the context
+    outgrows budget_tokens it is dropped, and the next turn is reseeded from
+    the system prompt plus the last keep_turns turns.
+    """
+
+    def __init__(self, client: LLMClient, system_prompt: str = LLM_SYSTEM_PROMPT,
+                 budget_tokens: int = LLM_CONTEXT_TOKENS, keep_turns: int = LLM_HISTORY_TURNS,
+                 idle_timeout: float = SESSION_TIMEOUT_S):
+        self.client = client
+        self.system_prompt = system_prompt
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+        self.idle_timeout = idle_timeout  # Forget the conversation after this long without a turn
+        self.turns = []  # (user, assistant), most recent last
+        self.context = None  # Ollama token context after the last turn
+        self.truncations = 0
+        self.last_used = 0.0
+        self._lock = threading.Lock()
+
+    def stream(self, user_text: str, max_tokens: int = None, deadline: float = LLM_TIMEOUT,
+               cancel_event: threading.Event = None) -> LLMStream:
+        """Start the next turn. Pass the finished stream to record() to make it part of the conversation."""
+        extra = {"keep_alive": LLM_KEEP_ALIVE} if LLM_KEEP_ALIVE else {}
+        with self._lock:
+            if self.turns and self.idle_timeout and time.monotonic() - self.last_used > self.idle_timeout:
+                logger.info(f"[LLM] Conversation idle for {self.idle_timeout}s, starting fresh")
+                self._reset_locked()
+            if self.budget_tokens <= 0:
+                prompt = _format_prompt(user_text)
+            elif self.context:
+                prompt = f"User: {user_text}\nAssistant:"
+                extra["context"] = self.context
+            else:
+                prompt = self._seed_prompt(user_text)
+        return self.client.stream_generate(prompt, max_tokens=max_tokens or LLM_MAX_TOKENS, deadline=deadline,
+                                           cancel_event=cancel_event, **extra)
+
+    @property
+    def fresh(self) -> bool:
+        """True if the next turn starts a new conversation (nothing said yet, or idle too long)."""
+        with self._lock:
+            return not self.turns or bool(self.idle_timeout and time.monotonic() - self.last_used > self.idle_timeout)
+
+    def add_turn(self, user_text: str, reply: str) -> None:
+        """Add a turn answered without the LLM (e.g. from the answer cache); it's resent as text next turn."""
+        if self.budget_tokens <= 0:
+            return
+        with self._lock:
+            if self.turns and self.idle_timeout and time.monotonic() - self.last_used > self.idle_timeout:
+                self._reset_locked()
+            self.turns.append((user_text, reply))
+            del self.turns[:-self.keep_turns]
+            self.last_used = time.monotonic()
+            self.context = None
+
+    def record(self, user_text: str, stream: LLMStream) -> None:
+        """Add a finished turn (ignored if it was cancelled or produced nothing)."""
+        reply = stream.text.strip()
+        if stream.cancelled or not reply or self.budget_tokens <= 0:
+            return
+        with self._lock:
+            self.turns.append((user_text, reply))
+            del self.turns[:-self.keep_turns]
+            self.last_used = time.monotonic()
+            context = stream.final.get("context")
+            if context and len(context) <= self.budget_tokens:
+                self.context = context
+            else:
+                if context:
+                    self.truncations += 1
+                    logger.info(f"[LLM] Context at {len(context)} tokens (budget {self.budget_tokens}), "
+                                f"reseeding from the last {len(self.turns)} turns")
+                self.context = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_locked()
+
+    def _reset_locked(self):
+        self.turns = []
+        self.context = None
+
+    def _seed_prompt(self, user_text: str) -> str:
+        """System prompt + recent turns as text, dropping the oldest turns to fit the budget (~4 chars/token)."""
+        turns = list(self.turns)
+        while True:
+            history = "".join(f"User: {u}\nAssistant: {a}\n" for u, a in turns)
+            prompt = f"{self.system_prompt}\n\n{history}User: {user_text}\nAssistant:"
+            if not turns or len(prompt) // 4 <= self.budget_tokens:
+                return prompt
+            turns.pop(0)
+
+
+def _normalize_transcript(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace for transcript comparison."""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+def transcripts_match(a: str, b: str, min_ratio: float = SPECULATIVE_MATCH_RATIO) -> bool:
+    """True if two transcripts are the same request (word-level similarity >= min_ratio)."""
+    a_words, b_words = _normalize_transcript(a).split(), _normalize_transcript(b).split()
+    if a_words == b_words:
+        return True
+    if min_ratio >= 1.0:
+        return False
+    import difflib
+    return difflib.SequenceMatcher(None, a_words, b_words).ratio() >= min_ratio
+
+
+class SpeculationStats:
+    """Counters for speculative LLM dispatch."""
+
+    def __init__(self):
+        self.started = 0
+        self.hits = 0  # Final transcript matched: speculative reply used
+        self.misses = 0  # Final transcript differed: cancelled and re-issued
+        self.discarded = 0  # Cancelled before any final transcript (user kept talking, noise, command)
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            decided = self.hits + self.misses
+            return self.hits / decided if decided else 0.0
+
+    def summary(self) -> str:
+        return (f"started={self.started} hits={self.hits} misses={self.misses} "
+                f"discarded={self.discarded} hit_rate={self.hit_rate:.0%}")
+
+
+class SpeculativeRequest:
+    """
+    An LLM stream started on a stable partial transcript, buffered in the
+    background until the final transcript confirms (stream()) or rejects (cancel()) it.
+    """
+
+    _DONE = object()
+
+    def __init__(self, prompt: str, host: str = OLLAMA_HOST, max_tokens: int = None,
+                 conversation: ConversationSession = None):
+        self.prompt = prompt
+        self.started_at = time.monotonic()
+        if conversation is not None:
+            self.llm_stream = conversation.stream(prompt, max_tokens=max_tokens)
+        else:
+            self.llm_stream = call_llm_stream(prompt, host, timeout=LLM_TIMEOUT, max_tokens=max_tokens)
+        self._chunks = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="SpeculativeLLM", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for chunk in self.llm_stream:
+                self._chunks.put(chunk)
+        except Exception as e:
+            self._chunks.put(e)
+        finally:
+            self._chunks.put(self._DONE)
+
+    def stream(self):
+        """Yield the buffered and still-arriving chunks; re-raises any LLM error."""
+        while True:
+            item = self._chunks.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self) -> None:
+        self.llm_stream.cancel()
+
+
+def _split_sentences(text: str):
+    """Split on sentence boundaries (., !, ?) keeping delimiters; return list of sentences."""
+    # Split after . ! ? when followed by space or end
+    parts = re.split(r'(?<=[.!?])\s+', text)
+    return [p.strip() for p in parts if p.strip()]
+
+
+# ============================================================================
+# Audio Output Sink
+# ============================================================================
+
+class AudioSink:
+    """
+    Long-lived mono s16le output shared by every TTS engine and the wake beep.
+
+    Subclasses implement _open/_write/_close. The base class keeps a playback
+    timeline so write() can report when each block actually starts playing and
+    can pace callers to at most one device buffer ahead of the speaker.
+    """
+
+    def __init__(self, buffer_ms: int = AUDIO_SINK_BUFFER_MS):
+        self.buffer_s = max(buffer_ms, 1) / 1000.0
+        self.sample_rate = None
+        self.last_start_time = None  # time.monotonic() when the last play()/write() block started playing
+        self._end_time = 0.0  # time.monotonic() when everything written so far will have played
+        self._lock = threading.RLock()
+
+    def write(self, pcm: bytes, sample_rate: int) -> float:
+        """
+        Queue PCM for gapless playback after anything already written.
+
+        Blocks only while more than one device buffer is queued ahead of the speaker.
+
+        Returns:
+            time.monotonic() at which the first sample of this block reaches the device.
+        """
+        if not pcm:
+            return time.monotonic()
+        with self._lock:
+            if sample_rate != self.sample_rate:
+                self._drain_locked()
+                if self.sample_rate is not None:
+                    self._close()
+                self._open(sample_rate)
+                self.sample_rate = sample_rate
+            now = time.monotonic()
+            start = max(now + self.latency(), self._end_time)
+            self._write(pcm)
+            self._end_time = start + len(pcm) / 2 / sample_rate
+            self.last_start_time = start
+            ahead = self._end_time - self.buffer_s - time.monotonic()
+        if ahead > 0:
+            time.sleep(ahead)
+        return start
+
+    def play(self, pcm: bytes, sample_rate: int) -> float:
+        """Play PCM and block until it has finished. Returns the playback start time."""
+        start = self.write(pcm, sample_rate)
+        self.drain()
+        return start
+
+    def drain(self) -> None:
+        """Block until everything written so far has played."""
+        with self._lock:
+            self._drain_locked()
+
+    def _drain_locked(self):
+        remaining = self._end_time - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def close(self) -> None:
+        with self._lock:
+            if self.sample_rate is not None:
+                self._close()
+                self.sample_rate = None
+
+    def latency(self) -> float:
+        """Seconds between handing data to the device and it being heard."""
+        return self.buffer_s
+
+    def _open(self, sample_rate: int):
+        raise NotImplementedError
+
+    def _write(self, pcm: bytes):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class SoundDeviceSink(AudioSink):
+    """PortAudio RawOutputStream kept open between utterances (reopened only on sample rate change)."""
+
+    def __init__(self, buffer_ms: int = AUDIO_SINK_BUFFER_MS):
+        import sounddevice  # noqa: F401  (fail at construction if unavailable)
+        super().__init__(buffer_ms)
+        self._stream = None
+
+    def _open(self, sample_rate: int):
+        import sounddevice as sd
+        self._stream = sd.RawOutputStream(samplerate=sample_rate, channels=1, dtype='int16',
+                                          latency=self.buffer_s)
+        self._stream.start()
+
+    def _write(self, pcm: bytes):
+        self._stream.write(pcm)
+
+    def _close(self):
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    def latency(self) -> float:
+        if self._stream is not None:
+            return float(self._stream.latency)
+        return self.buffer_s
+
+
+class PipeSink(AudioSink):
+    """A single paplay/aplay process fed raw PCM over stdin for the lifetime of the sink."""
+
+    def __init__(self, buffer_ms: int = AUDIO_SINK_BUFFER_MS):
+        super().__init__(buffer_ms)
+        self._proc = None
+
+    def _open(self, sample_rate: int):
+        buffer_ms = int(self.buffer_s * 1000)
+        if os.path.isfile("/usr/bin/paplay"):
+            cmd = ["paplay", "--raw", f"--rate={sample_rate}", "--format=s16le", "--channels=1",
+                   f"--latency-msec={buffer_ms}"]
+        else:
+            cmd = ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(sample_rate), "-c", "1",
+                   "-B", str(buffer_ms * 1000)]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def _write(self, pcm: bytes):
+        if self._proc.poll() is not None:
+            # Player died (e.g. PulseAudio restart): respawn at the same rate
+            logger.warning("[Sink] Audio player exited, restarting")
+            self._open(self.sample_rate)
+        try:
+            self._proc.stdin.write(pcm)
+            self._proc.stdin.flush()
+        except BrokenPipeError:
+            self._open(self.sample_rate)
+            self._proc.stdin.write(pcm)
+            self._proc.stdin.flush()
+
+    def _close(self):
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        self._proc = None
+
+
+class NullSink(AudioSink):
+    """Discards audio but keeps the timeline, so latency can be measured headless.
+
+    With realtime=False writes return immediately; every block is recorded in
+    `plays` as (start_time, n_samples, sample_rate).
+    """
+
+    def __init__(self, buffer_ms: int = AUDIO_SINK_BUFFER_MS, realtime: bool = True):
+        super().__init__(buffer_ms)
+        self.realtime = realtime
+        self.plays = []
+
+    def write(self, pcm: bytes, sample_rate: int) -> float:
+        if self.realtime:
+            start = super().write(pcm, sample_rate)
+        else:
+            start = time.monotonic()
+            self.last_start_time = start
+        self.plays.append((start, len(pcm) // 2, sample_rate))
+        return start
+
+    def drain(self) -> None:
+        if self.realtime:
+            super().drain()
+
+    def _open(self, sample_rate: int):
+        pass
+
+    def _write(self, pcm: bytes):
+        pass
+
+    def _close(self):
+        pass
+
+
+class FileSink(NullSink):
+    """Writes everything played to one WAV file (resampled to the first sample rate seen)."""
+
+    def __init__(self, path: str, buffer_ms: int = AUDIO_SINK_BUFFER_MS, realtime: bool = False):
+        super().__init__(buffer_ms, realtime=realtime)
+        self.path = path
+        self._wav = None
+
+    def write(self, pcm: bytes, sample_rate: int) -> float:
+        with self._lock:
+            if self._wav is None:
+                self._wav = wave.open(self.path, "wb")
+                self._wav.setnchannels(1)
+                self._wav.setsampwidth(2)
+                self._wav.setframerate(sample_rate)
+            file_rate = self._wav.getframerate()
+            self._wav.writeframes(_resample_pcm16(pcm, sample_rate, file_rate))
+        return super().write(pcm, sample_rate)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._wav is not None:
+                self._wav.close()
+                self._wav = None
+
+
+def _resample_pcm16(pcm: bytes, src_rate: int, dst_rate: int) -> bytes:
+    """Linear-interpolation resample of mono s16le PCM (good enough for file capture)."""
+    if src_rate == dst_rate or not pcm:
+        return pcm
+    import numpy as np
+    src = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+    n_out = int(len(src) * dst_rate / src_rate)
+    x = np.linspace(0, len(src) - 1, n_out)
+    return np.interp(x, np.arange(len(src)), src).astype(np.int16).tobytes()
+
+
+_AUDIO_SINK = None
+_AUDIO_SINK_LOCK = threading.Lock()
+
+
+def create_audio_sink(spec: str = None, buffer_ms: int = AUDIO_SINK_BUFFER_MS) -> AudioSink:
+    """Build a sink from an AUDIO_SINK spec ("auto", "sounddevice", "pipe", "null", "file:PATH")."""
+    spec = spec or AUDIO_SINK
+    if spec == "null":
+        return NullSink(buffer_ms)
+    if spec.startswith("file:"):
+        return FileSink(os.path.expanduser(spec[len("file:"):]), buffer_ms)
+    if spec == "pipe":
+        return PipeSink(buffer_ms)
+    try:
+        return SoundDeviceSink(buffer_ms)
+    except (ImportError, OSError) as e:
+        if spec == "sounddevice":
+            raise
+        logger.info(f"[Sink] sounddevice unavailable ({e}), using player pipe")
+        return PipeSink(buffer_ms)
+
+
+def get_audio_sink() -> AudioSink:
+    """Return the process-wide audio sink, creating it on first use."""
+    global _AUDIO_SINK
+    with _AUDIO_SINK_LOCK:
+        if _AUDIO_SINK is None:
+            _AUDIO_SINK = create_audio_sink()
+            logger.info(f"[Sink] Audio output: {type(_AUDIO_SINK).__name__} ({int(_AUDIO_SINK.buffer_s * 1000)}ms buffer)")
+        return _AUDIO_SINK
+
+
+def set_audio_sink(sink: AudioSink) -> None:
+    """Replace the process-wide audio sink (e.g. a NullSink for headless runs)."""
+    global _AUDIO_SINK
+    with _AUDIO_SINK_LOCK:
+        if _AUDIO_SINK is not None and _AUDIO_SINK is not sink:
+            _AUDIO_SINK.close()
+        _AUDIO_SINK = sink
+
+
+def play_pcm(pcm: bytes, sample_rate: int) -> float:
+    """Play mono s16le PCM on the shared audio sink, blocking until done. Returns playback start time."""
+    return get_audio_sink().play(pcm, sample_rate)
+
+
+# ============================================================================
+# Text-to-Speech (TTS) Functions
+# ============================================================================
+
+def tts_pyttsx3(text: str) -> None:
+    import pyttsx3
+    e = pyttsx3.init()
+    # Slightly slower rate for smoother sound (default often 200 wpm)
+    e.setProperty("rate", 150)
+    e.say(text)
+    e.runAndWait()
+
+
+def _piper_command(output_args=("--output_raw",)):
+    """Return (cmd, env, cwd) for the Piper binary (raw-output mode by default), or None if Piper is not installed."""
+    model_path = os.path.join(PIPER_MODEL_DIR, f"{PIPER_VOICE}.onnx")
+    config_path = os.path.join(PIPER_MODEL_DIR, f"{PIPER_VOICE}.onnx.json")
+    if not os.path.isfile(model_path) or not os.path.isfile(PIPER_BIN):
+        return None
+    env = os.environ.copy()
+    env["LD_LIBRARY_PATH"] = os.path.pathsep.join([PIPER_LD_LIBRARY_PATH, env.get("LD_LIBRARY_PATH", "")])
+    cmd = [
+        PIPER_BIN,
+        "--model", model_path,
+        "--config", config_path,
+        *output_args,
+        "--espeak_data", PIPER_ESPEAK_DATA,
+        "--length_scale", PIPER_LENGTH_SCALE,
+        "--sentence_silence", PIPER_SENTENCE_SILENCE,
+        "--noise_scale", PIPER_NOISE_SCALE,
+        "--noise_w", PIPER_NOISE_W,
+    ]
+    return cmd, env, os.path.dirname(PIPER_BIN)
+
+
+def _piper_sample_rate() -> int:
+    """Read the output sample rate from the Piper voice config (medium voices are 22050Hz)."""
+    config_path = os.path.join(PIPER_MODEL_DIR, f"{PIPER_VOICE}.onnx.json")
+    try:
+        with open(config_path, "r") as f:
+            return int(json.load(f).get("audio", {}).get("sample_rate", 22050))
+    except (OSError, ValueError, AttributeError):
+        return 22050
+
+
+def _float_to_pcm16(samples) -> bytes:
+    """Convert float samples in [-1, 1] (numpy array or list) to 16-bit little-endian PCM."""
+    if hasattr(samples, 'tobytes'):
+        # numpy array — convert directly
+        import numpy as np
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    # list of floats — pack manually
+    import struct
+    return struct.pack(f'<{len(samples)}h', *[int(max(-1.0, min(1.0, s)) * 32767) for s in samples])
+
+
+def tts_piper(text: str, timeout: int = TTS_TIMEOUT) -> None:
+    """Use Piper standalone binary; stream output to the audio sink so playback starts as soon as first chunks are ready."""
+    piper = _piper_command()
+    if piper is None:
+        print("Piper model or binary not found, using pyttsx3.", file=sys.stderr)
+        tts_pyttsx3(text)
         return
+    cmd, env, piper_dir = piper
+    sink = get_audio_sink()
+    if PIPER_WORKER:
+        # Resident worker: render sentence by sentence so playback of the first
+        # sentence starts while the rest is still being synthesized
+        try:
+            for sentence in _split_sentences(text):
+                sink.write(*get_piper_worker().synthesize(sentence, timeout=timeout))
+            sink.drain()
+            return
+        except (OSError, RuntimeError) as e:
+            print(f"Piper worker failed ({e}), using pyttsx3.", file=sys.stderr)
+            tts_pyttsx3(text)
+            return
+    sample_rate = _piper_sample_rate()
+    piper_proc = None
+    try:
+        piper_proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            cwd=piper_dir,
+        )
+        piper_proc.stdin.write(text.encode("utf-8"))
+        piper_proc.stdin.close()
+        deadline = time.monotonic() + timeout
+        while True:
+            block = piper_proc.stdout.read1(8192)
+            if not block:
+                break
+            if len(block) % 2:  # Keep whole 16-bit samples
+                block += piper_proc.stdout.read(1)
+            sink.write(block, sample_rate)
+            if time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(cmd, timeout)
+        piper_proc.wait(timeout=timeout)
+        sink.drain()
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        print(f"Piper failed ({e}), using pyttsx3.", file=sys.stderr)
+        if piper_proc:
+            piper_proc.kill()
+        tts_pyttsx3(text)
+
+
+class PiperWorker:
+    """
+    Long-lived Piper process in --json-input mode, so the ONNX voice and espeak
+    data are loaded once instead of once per sentence.
+
+    Each request is one JSON line naming its own output file in a RAM-backed
+    directory; Piper echoes that path on stdout when the utterance is complete,
+    which gives an unambiguous per-request boundary (raw mode has none). The
+    process is respawned automatically if it dies or stops responding.
+    """
+
+    def __init__(self):
+        self.sample_rate = _piper_sample_rate()
+        self.restarts = 0
+        self._proc = None
+        self._lines = None
+        self._seq = 0
+        self._lock = threading.Lock()
+        shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        self._out_dir = tempfile.mkdtemp(prefix="piper_", dir=shm)
+
+    def synthesize(self, text: str, timeout: float = TTS_TIMEOUT):
+        """Render one request. Returns (pcm_s16le, sample_rate); retries once on a fresh process."""
+        with self._lock:
+            for attempt in (1, 2):
+                if self._proc is None or self._proc.poll() is not None:
+                    if self._proc is not None:
+                        self.restarts += 1
+                        logger.warning(f"[Piper] Worker exited (code {self._proc.returncode}), respawning")
+                    self._start()
+                try:
+                    return self._request(text, timeout), self.sample_rate
+                except (OSError, EOFError, TimeoutError) as e:
+                    logger.warning(f"[Piper] Worker request failed ({e}), attempt {attempt}/2")
+                    self._kill()
+                    self.restarts += 1
+                    if attempt == 2:
+                        raise RuntimeError(f"Piper worker failed: {e}") from e
+
+    def close(self):
+        with self._lock:
+            self._kill()
+        for f in os.listdir(self._out_dir):
+            os.unlink(os.path.join(self._out_dir, f))
+        os.rmdir(self._out_dir)
+
+    def _start(self):
+        piper = _piper_command(output_args=("--json-input", "--output_dir", self._out_dir))
+        if piper is None:
+            raise FileNotFoundError("Piper model or binary not found")
+        cmd, env, piper_dir = piper
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL, env=env, cwd=piper_dir)
+        # Reader thread turns stdout into a queue so requests can wait with a timeout
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_stdout, args=(self._proc.stdout, self._lines),
+                         name="PiperReader", daemon=True).start()
+        logger.info(f"[Piper] Worker started (pid {self._proc.pid}, voice={PIPER_VOICE})")
+
+    @staticmethod
+    def _read_stdout(stdout, lines: queue.Queue):
+        for line in iter(stdout.readline, b""):
+            lines.put(line.decode("utf-8", errors="replace").strip())
+        lines.put(None)  # EOF: process exited
+
+    def _request(self, text: str, timeout: float) -> bytes:
+        self._seq += 1
+        out_path = os.path.join(self._out_dir, f"{self._seq}.wav")
+        request = json.dumps({"text": " ".join(text.split()), "output_file": out_path}) + "\n"
+        self._proc.stdin.write(request.encode("utf-8"))
+        self._proc.stdin.flush()
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    raise TimeoutError(f"no reply within {timeout}s")
+                if line is None:
+                    raise EOFError("Piper worker exited")
+                if line == out_path:
+                    break
+            with wave.open(out_path, "rb") as wf:
+                return wf.readframes(wf.getnframes())
+        finally:
+            if os.path.exists(out_path):
+                os.unlink(out_path)
+
+    def _kill(self):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
+
+
+_PIPER_WORKER = None
+_PIPER_WORKER_LOCK = threading.Lock()
+
+
+def get_piper_worker() -> PiperWorker:
+    """Return the shared Piper worker, creating it on first use."""
+    global _PIPER_WORKER
+    with _PIPER_WORKER_LOCK:
+        if _PIPER_WORKER is None:
+            _PIPER_WORKER = PiperWorker()
+            atexit.register(_PIPER_WORKER.close)
+        return _PIPER_WORKER
+
+
+def synth_piper(text: str, timeout: int = TTS_TIMEOUT):
+    """Render text with Piper into memory. Returns (pcm_s16le, sample_rate), or None on failure."""
+    piper = _piper_command()
+    if piper is None:
+        return None
+    if PIPER_WORKER:
+        try:
+            return get_piper_worker().synthesize(text, timeout=timeout)
+        except (OSError, RuntimeError) as e:
+            print(f"Piper worker failed ({e}).", file=sys.stderr)
+            return None
+    cmd, env, piper_dir = piper
+    try:
+        proc = subprocess.run(
+            cmd,
+            input=text.encode("utf-8"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            cwd=piper_dir,
+            timeout=timeout,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        print(f"Piper failed ({e}).", file=sys.stderr)
+        return None
+    if proc.returncode != 0 or not proc.stdout:
+        return None
+    return proc.stdout, _piper_sample_rate()
+
+
+# Global Sherpa-ONNX TTS instance (lazy-loaded; the model manager may unload it)
+_SHERPA_TTS = None
+_SHERPA_TTS_LOCK = threading.Lock()
+
+
+def _get_sherpa_tts():
+    """Lazy-load and cache Sherpa-ONNX OfflineTts instance."""
+    global _SHERPA_TTS
+    with _SHERPA_TTS_LOCK:
+        if _SHERPA_TTS is None:
+            before = _rss_mb()
+            _SHERPA_TTS = load_sherpa_tts()
+            if _SHERPA_TTS is not None:
+                get_model_manager().track("tts:sherpa", _unload_sherpa_tts, _rss_mb() - before)
+        get_model_manager().touch("tts:sherpa")
+        return _SHERPA_TTS
+
+
+def _unload_sherpa_tts():
+    """Drop the shared OfflineTts (a synthesis in progress keeps its own reference)."""
+    global _SHERPA_TTS
+    with _SHERPA_TTS_LOCK:
+        _SHERPA_TTS = None
+    get_model_manager().forget("tts:sherpa")
 
-    # Determine the Python interpreter to use
-    venv_python = os.path.join(SUPERTONIC_DIR, ".venv", "bin", "python")
-    if not os.path.isfile(venv_python):
-        venv_python = sys.executable  # Fall back to system Python
 
-    # Escape text for shell
-    escaped_text = text.replace("\\", "\\\\").replace("'", "'\\''")
+def load_sherpa_tts(model_dir: str = SHERPA_TTS_MODEL, threads: int = SHERPA_TTS_THREADS,
+                    precision: str = SHERPA_TTS_PRECISION):
+    """Build a Sherpa-ONNX OfflineTts configured as speak() uses it, or None if unavailable."""
+    try:
+        import sherpa_onnx
+    except ImportError:
+        return None
+    if not os.path.isdir(model_dir):
+        return None
 
-    # Create a script to generate audio and output to stdout
-    script = f'''
-import sys
-import os
-import tempfile
-os.chdir("{SUPERTONIC_DIR}")
-sys.path.insert(0, "{SUPERTONIC_DIR}")
+    # Find model .onnx file (single-speaker piper or multi-speaker VCTK) of the wanted precision
+    onnx_file = None
+    for f in sorted(os.listdir(model_dir)):
+        if f.endswith(".onnx") and ("int8" in f) == (precision == "int8"):
+            onnx_file = os.path.join(model_dir, f)
+            break
+    if not onnx_file:
+        return None
 
-import numpy as np
-import soundfile as sf
-from helper import load_text_to_speech, load_voice_style
+    tokens_file = os.path.join(model_dir, "tokens.txt")
+    data_dir = os.path.join(model_dir, "espeak-ng-data")
+    lexicon_file = os.path.join(model_dir, "lexicon.txt")
 
-# Load model (cached globally to speed up subsequent calls)
-if not hasattr(sys, '_supertonic_tts'):
-    sys._supertonic_tts = load_text_to_speech("assets/onnx", use_gpu=False)
-    voice_style_path = os.path.join("{SUPERTONIC_DIR}", "assets", "voice_styles", "{SUPERTONIC_VOICE}.json")
-    sys._supertonic_style = load_voice_style([voice_style_path])
+    config = sherpa_onnx.OfflineTtsConfig()
+    config.model.vits.model = onnx_file
+    config.model.vits.tokens = tokens_file
+    # Prefer system espeak-ng-data — bundled version often mismatches sherpa-onnx
+    # version, causing a C++ error that doesn't raise a Python exception
+    sys_data = "/usr/lib/aarch64-linux-gnu/espeak-ng-data"
+    if os.path.isdir(sys_data):
+        config.model.vits.data_dir = sys_data
+    elif os.path.isdir(data_dir):
+        config.model.vits.data_dir = data_dir
+    if os.path.isfile(lexicon_file):
+        config.model.vits.lexicon = lexicon_file
+    config.model.num_threads = threads
+    config.model.debug = False
+    config.model.provider = "cpu"
 
-tts = sys._supertonic_tts
-style = sys._supertonic_style
+    tts = sherpa_onnx.OfflineTts(config)
+    logger.info(f"Sherpa-ONNX TTS loaded: {tts.sample_rate}Hz, {threads} threads, model={os.path.basename(onnx_file)}")
+    return tts
 
-# Generate audio with optimized settings
-audio, dur = tts("{escaped_text}", "en", style, total_step=3, speed=1.2)
 
-# Output to temp file
-import tempfile
-with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-    sf.write(tmp.name, audio[0], 44100)
-    print(tmp.name)
-'''
+def synth_sherpa(text: str):
+    """Render text with Sherpa-ONNX VITS. Returns (pcm_s16le, sample_rate), or None if unavailable/empty."""
+    tts = _get_sherpa_tts()
+    if tts is None:
+        logger.warning("Sherpa-ONNX TTS not available")
+        return None
+    audio = tts.generate(text, sid=SHERPA_TTS_SPEAKER, speed=SHERPA_TTS_SPEED)
+    if len(audio.samples) == 0:
+        logger.warning("Sherpa-ONNX TTS produced no audio")
+        return None
+    return _float_to_pcm16(audio.samples), tts.sample_rate
 
-    try:
-        # Run the script in Supertonic's venv
-        result = subprocess.run(
-            [venv_python, "-c", script],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=SUPERTONIC_DIR,
-        )
 
-        if result.returncode != 0:
-            print(f"Supertonic failed: {result.stderr[:100]}, using piper.", file=sys.stderr)
+def tts_sherpa(text: str, timeout: int = TTS_TIMEOUT) -> None:
+    """Use Sherpa-ONNX VITS TTS — NEON-optimized, targets RTF < 0.1 on Pi 5."""
+    try:
+        audio = synth_sherpa(text)
+        if audio is None:
+            logger.warning("Falling back to Piper")
             tts_piper(text, timeout=timeout)
             return
+        play_pcm(*audio)
+    except Exception as e:
+        logger.warning(f"Sherpa-ONNX TTS failed ({e}), falling back to Piper")
+        tts_piper(text, timeout=timeout)
 
-        # Get the temp file path (last non-empty line of stdout)
-        lines = [l.strip() for l in result.stdout.strip().split('\n') if l.strip()]
-        wav_path = lines[-1] if lines else None
-        if wav_path and wav_path.endswith('.wav') and os.path.exists(wav_path):
-            try:
-                subprocess.run(["paplay", wav_path], check=True, timeout=timeout)
-            finally:
-                os.unlink(wav_path)
-        else:
-            print("Supertonic failed to generate audio, using piper.", file=sys.stderr)
-            tts_piper(text, timeout=timeout)
 
-    except Exception as e:
-        print(f"Supertonic failed ({e}), using piper.", file=sys.stderr)
+def _supertonic_python() -> str:
+    """Interpreter for the Supertonic worker: SUPERTONIC_VENV, then SUPERTONIC_DIR/.venv, then this Python."""
+    for venv in (SUPERTONIC_VENV, os.path.join(SUPERTONIC_DIR, ".venv")):
+        if venv:
+            python = os.path.join(os.path.expanduser(venv), "bin", "python")
+            if os.path.isfile(python):
+                return python
+    return sys.executable
+
+
+class SupertonicWorker:
+    """
+    Resident Supertonic process (src/supertonic_worker.py) running in Supertonic's
+    virtualenv, so onnxruntime and the model are loaded once rather than per sentence.
+
+    Requests and replies go over the worker's stdin/stdout; PCM comes back
+    directly, with no temp WAV files. Respawned automatically if it dies.
+    """
+
+    LOAD_TIMEOUT = 120  # Seconds allowed for the first model load
+
+    def __init__(self):
+        self.sample_rate = 44100
+        self.restarts = 0
+        self._proc = None
+        self._replies = None
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str, voice: str = SUPERTONIC_VOICE, steps: int = SUPERTONIC_STEPS,
+                   speed: float = SUPERTONIC_SPEED, timeout: float = TTS_TIMEOUT):
+        """Render one request. Returns (pcm_s16le, sample_rate); retries once on a fresh process."""
+        with self._lock:
+            get_model_manager().touch("tts:supertonic")
+            for attempt in (1, 2):
+                try:
+                    if self._proc is None or self._proc.poll() is not None:
+                        if self._proc is not None:
+                            self.restarts += 1
+                            logger.warning(f"[Supertonic] Worker exited (code {self._proc.returncode}), respawning")
+                        self._start()
+                    request = {"text": " ".join(text.split()), "voice": voice, "steps": steps, "speed": speed}
+                    self._proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+                    self._proc.stdin.flush()
+                    header, pcm = self._reply(timeout)
+                    if not header.get("ok"):
+                        # Synthesis error inside a healthy worker: no point retrying
+                        raise RuntimeError(header.get("error", "unknown error"))
+                    return pcm, header.get("sample_rate", self.sample_rate)
+                except (OSError, EOFError) as e:
+                    logger.warning(f"[Supertonic] Worker request failed ({e}), attempt {attempt}/2")
+                    self._kill()
+                    self.restarts += 1
+                    if attempt == 2:
+                        raise RuntimeError(f"Supertonic worker failed: {e}") from e
+
+    def close(self):
+        with self._lock:
+            self._kill()
+
+    def _start(self):
+        if not os.path.isdir(SUPERTONIC_DIR):
+            raise FileNotFoundError(f"Supertonic not found at {SUPERTONIC_DIR}")
+        worker = os.path.join(os.path.dirname(os.path.abspath(__file__)), "supertonic_worker.py")
+        self._proc = subprocess.Popen([_supertonic_python(), worker, "--dir", SUPERTONIC_DIR],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=SUPERTONIC_DIR)
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read_stdout, args=(self._proc.stdout, self._replies),
+                         name="SupertonicReader", daemon=True).start()
+        header, _ = self._reply(self.LOAD_TIMEOUT)
+        if not header.get("ready"):
+            raise EOFError(f"unexpected worker greeting: {header}")
+        self.sample_rate = header.get("sample_rate", self.sample_rate)
+        logger.info(f"[Supertonic] Worker ready (pid {self._proc.pid}, {self.sample_rate}Hz)")
+        get_model_manager().track("tts:supertonic", self.close, lambda pid=self._proc.pid: _rss_mb(pid))
+
+    @staticmethod
+    def _read_stdout(stdout, replies: queue.Queue):
+        """Split the worker's stdout into (header, pcm) replies."""
+        try:
+            for line in iter(stdout.readline, b""):
+                header = json.loads(line)
+                nbytes = header.get("nbytes", 0)
+                pcm = stdout.read(nbytes) if nbytes else b""
+                if len(pcm) < nbytes:
+                    break
+                replies.put((header, pcm))
+        except ValueError:
+            pass  # Garbage on the protocol stream: treat as a dead worker
+        replies.put(None)
+
+    def _reply(self, timeout: float):
+        try:
+            reply = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no reply within {timeout}s")
+        if reply is None:
+            raise EOFError("Supertonic worker exited")
+        return reply
+
+    def _kill(self):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
+        get_model_manager().forget("tts:supertonic")
+
+
+_SUPERTONIC_WORKER = None
+_SUPERTONIC_WORKER_LOCK = threading.Lock()
+
+
+def get_supertonic_worker() -> SupertonicWorker:
+    """Return the shared Supertonic worker, creating it on first use."""
+    global _SUPERTONIC_WORKER
+    with _SUPERTONIC_WORKER_LOCK:
+        if _SUPERTONIC_WORKER is None:
+            _SUPERTONIC_WORKER = SupertonicWorker()
+            atexit.register(_SUPERTONIC_WORKER.close)
+        return _SUPERTONIC_WORKER
+
+
+def synth_supertonic(text: str, timeout: int = TTS_TIMEOUT):
+    """Render text with Supertonic ONNX TTS (44100Hz). Returns (pcm_s16le, sample_rate), or None on failure."""
+    try:
+        return get_supertonic_worker().synthesize(text, timeout=timeout)
+    except (OSError, RuntimeError) as e:
+        print(f"Supertonic failed ({e}).", file=sys.stderr)
+        return None
+
+
+def tts_supertonic(text: str, timeout: int = TTS_TIMEOUT) -> None:
+    """Use Supertonic ONNX TTS - higher quality at 44100Hz, optimized for speed."""
+    audio = synth_supertonic(text, timeout=timeout)
+    if audio is None:
+        print("Supertonic unavailable, using piper.", file=sys.stderr)
         tts_piper(text, timeout=timeout)
+        return
+    try:
+        play_pcm(*audio)
+    except Exception as e:
+        print(f"Supertonic playback failed ({e}).", file=sys.stderr)
 
 
 def speak(text: str, engine: str = None, timeout: int = TTS_TIMEOUT) -> None:
-    """Speak text using specified or default TTS engine."""
+    """Speak text using specified or default TTS engine (served from the PCM cache when possible)."""
     if not text:
         return
-    tts = engine or TTS_ENGINE
-    if tts == "supertonic":
-        tts_supertonic(text, timeout=timeout)
-    elif tts == "sherpa":
-        tts_sherpa(text, timeout=timeout)
-    elif tts == "piper":
-        tts_piper(text, timeout=timeout)
-    else:
+    audio = synthesize(text, engine, timeout=timeout)
+    if audio is None:
         tts_pyttsx3(text)
+        return
+    try:
+        play_pcm(*audio)
+    except Exception as e:
+        logger.warning(f"[TTS] Playback failed ({e})")
+
+
+# ============================================================================
+# Synthesized Phrase Cache
+# ============================================================================
+
+# Phrases the assistant says verbatim; rendered at startup so they play instantly
+PREWARM_PHRASES = [
+    "Going to sleep. Say hey homer to wake me.",
+    "Goodbye!",
+    "Stopped",
+    *[f"Volume set to {level} percent" for level in (0, 20, 50, 100)],
+    *[f"Volume {level} percent" for level in range(0, 101, 10)],
+]
+
+
+def _engine_voice(engine: str) -> tuple:
+    """(voice, speaker, speed) that determine an engine's output, for cache keys."""
+    if engine == "sherpa":
+        voice = os.path.basename(SHERPA_TTS_MODEL.rstrip("/")) + ("|int8" if SHERPA_TTS_PRECISION == "int8" else "")
+        return voice, SHERPA_TTS_SPEAKER, SHERPA_TTS_SPEED
+    if engine == "piper":
+        voice = f"{PIPER_VOICE}|noise={PIPER_NOISE_SCALE},{PIPER_NOISE_W}|silence={PIPER_SENTENCE_SILENCE}"
+        return voice, 0, PIPER_LENGTH_SCALE
+    if engine == "supertonic":
+        return f"{SUPERTONIC_VOICE}|steps={SUPERTONIC_STEPS}", 0, SUPERTONIC_SPEED
+    return engine, 0, 1.0
+
+
+class PcmCache:
+    """
+    Two-tier cache of synthesized speech.
+
+    Tier 1 is an in-memory LRU bounded by bytes. Tier 2 is a directory of
+    <sha1>.pcm files (8-byte header: b"PCM1" + uint32 sample rate, then raw
+    s16le) that are mmap'ed on read and evicted oldest-first when over budget. A phrase goes to disk when it is requested a
+    second time or pre-warmed, so one-off LLM sentences don't churn the SD card.
+    """
+
+    def __init__(self, cache_dir: str = PCM_CACHE_DIR, memory_mb: int = PCM_CACHE_MEMORY_MB,
+                 disk_mb: int = PCM_CACHE_DISK_MB):
+        from collections import OrderedDict
+        self.cache_dir = cache_dir
+        self.memory_limit = memory_mb * 1024 * 1024
+        self.disk_limit = disk_mb * 1024 * 1024
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory = OrderedDict()  # key -> (pcm, sample_rate, persisted)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_limit:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(engine: str, text: str) -> str:
+        import hashlib
+        voice, speaker, speed = _engine_voice(engine)
+        normalized = " ".join(text.split())
+        return hashlib.sha1(f"{engine}\0{voice}\0{speaker}\0{speed}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Return (pcm, sample_rate) or None. Repeated memory hits are written through to disk."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                pcm, sample_rate, persisted = entry
+                if not persisted:
+                    self._memory[key] = (pcm, sample_rate, True)
+        if entry is not None:
+            if not persisted:
+                self._write_disk(key, pcm, sample_rate)
+            return pcm, sample_rate
+        audio = self._read_disk(key)
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.hits_disk += 1
+            self._remember(key, audio[0], audio[1], persisted=True)
+        return audio
+
+    def put(self, key: str, pcm: bytes, sample_rate: int, persist: bool = False) -> None:
+        with self._lock:
+            self._remember(key, pcm, sample_rate, persisted=persist)
+        if persist:
+            self._write_disk(key, pcm, sample_rate)
+
+    def get_or_render(self, engine: str, text: str, render, persist: bool = False):
+        """Cached wrapper around render() -> (pcm, sample_rate) | None."""
+        if not self.memory_limit:
+            return render()
+        key = self.make_key(engine, text)
+        audio = self.get(key)
+        if audio is None:
+            audio = render()
+            if audio is not None:
+                self.put(key, audio[0], audio[1], persist=persist)
+        elif persist:
+            self._write_disk(key, *audio)
+        return audio
+
+    def prewarm(self, engine: str, phrases, timeout: int = TTS_TIMEOUT) -> int:
+        """Render and persist any phrases not already cached. Returns how many were synthesized."""
+        rendered = 0
+        for phrase in phrases:
+            phrase = phrase.strip()
+            if not phrase:
+                continue
+            key = self.make_key(engine, phrase)
+            with self._lock:
+                cached = key in self._memory
+            if cached or (self.disk_limit and os.path.exists(self._disk_path(key))):
+                continue
+            if synthesize(phrase, engine, timeout=timeout, persist=True) is not None:
+                rendered += 1
+        return rendered
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round((self.hits_memory + self.hits_disk) / lookups, 3) if lookups else 0.0,
+                "memory_bytes": self._memory_bytes,
+                "entries": len(self._memory),
+            }
+
+    def _remember(self, key, pcm, sample_rate, persisted):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old[0])
+        if len(pcm) > self.memory_limit:
+            return
+        self._memory[key] = (pcm, sample_rate, persisted)
+        self._memory_bytes += len(pcm)
+        while self._memory_bytes > self.memory_limit:
+            _, (evicted, _, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    _MAGIC = b"PCM1"
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def _read_disk(self, key: str):
+        if not self.disk_limit:
+            return None
+        path = self._disk_path(key)
+        import mmap
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except ValueError:  # mmap refuses an empty file
+            logger.warning(f"[PcmCache] Empty cache file {path}, discarding")
+            self._discard(path)
+            return None
+        except OSError as e:
+            logger.warning(f"[PcmCache] Unreadable cache file {path} ({e})")
+            return None
+        if len(mapped) < 8 or mapped[:4] != self._MAGIC:
+            logger.warning(f"[PcmCache] Corrupt cache file {path}, discarding")
+            mapped.close()
+            self._discard(path)
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        sample_rate = int.from_bytes(mapped[4:8], "little")
+        if len(mapped) - 8 <= self.memory_limit:
+            # Promoted to the memory tier: copy and unmap, so the file can be replaced or evicted
+            pcm = mapped[8:]
+            mapped.close()
+            return pcm, sample_rate
+        # Too big for memory: zero-copy view past the header; pages are loaded lazily by the kernel
+        return memoryview(mapped)[8:], sample_rate
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _write_disk(self, key: str, pcm, sample_rate: int):
+        if not self.disk_limit or len(pcm) > self.disk_limit:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.tmp{threading.get_ident()}"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(self._MAGIC + int(sample_rate).to_bytes(4, "little"))
+                f.write(pcm)
+            os.replace(tmp, path)
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"[PcmCache] Could not write {path} ({e})")
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pcm"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        while total > self.disk_limit and entries:
+            _, size, path = entries.pop(0)
+            try:
+                os.unlink(path)
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+            except OSError:
+                pass
+
+
+_PCM_CACHE = None
+_PCM_CACHE_LOCK = threading.Lock()
+
+
+def get_pcm_cache() -> PcmCache:
+    """Return the process-wide PCM cache, creating it on first use."""
+    global _PCM_CACHE
+    with _PCM_CACHE_LOCK:
+        if _PCM_CACHE is None:
+            try:
+                _PCM_CACHE = PcmCache()
+            except OSError as e:
+                logger.warning(f"[PcmCache] Disk tier unavailable ({e}), caching in memory only")
+                _PCM_CACHE = PcmCache(disk_mb=0)
+        return _PCM_CACHE
+
+
+def prewarm_pcm_cache(engine: str = None) -> None:
+    """Render PREWARM_PHRASES (plus PCM_CACHE_PREWARM file lines) in the background."""
+    phrases = list(PREWARM_PHRASES)
+    if PCM_CACHE_PREWARM and os.path.isfile(os.path.expanduser(PCM_CACHE_PREWARM)):
+        with open(os.path.expanduser(PCM_CACHE_PREWARM), "r", encoding="utf-8") as f:
+            phrases.extend(line.strip() for line in f if line.strip())
+
+    def run():
+        start = time.monotonic()
+        rendered = get_pcm_cache().prewarm(engine or TTS_ENGINE, phrases)
+        logger.info(f"[PcmCache] Pre-warmed {len(phrases)} phrases ({rendered} synthesized) in {time.monotonic() - start:.1f}s")
+
+    threading.Thread(target=run, name="PcmPrewarm", daemon=True).start()
+
+
+def _synth_sherpa_safe(text: str, timeout: int = TTS_TIMEOUT):
+    try:
+        return synth_sherpa(text)
+    except Exception as e:
+        logger.warning(f"Sherpa-ONNX TTS failed ({e})")
+        return None
+
+
+# Engine name -> (renderer, fallback engine)
+_TTS_RENDERERS = {
+    "supertonic": (synth_supertonic, "piper"),
+    "sherpa": (_synth_sherpa_safe, "piper"),
+    "piper": (synth_piper, None),
+}
+
+
+def synthesize(text: str, engine: str = None, timeout: int = TTS_TIMEOUT, persist: bool = False):
+    """
+    Render text to PCM without playing it, following the same fallback chain as speak().
+
+    Results are cached per engine, so a fallback engine's audio is never stored
+    under the preferred engine's key.
+
+    Returns:
+        (pcm_s16le, sample_rate), or None when only pyttsx3 (which plays directly) is left.
+    """
+    tts = engine or TTS_ENGINE
+    cache = get_pcm_cache()
+    while tts in _TTS_RENDERERS:
+        render, fallback = _TTS_RENDERERS[tts]
+        audio = cache.get_or_render(tts, text, lambda: render(text, timeout=timeout), persist=persist)
+        if audio is not None:
+            return audio
+        if fallback:
+            logger.warning(f"{tts} TTS unavailable, falling back to {fallback}")
+        tts = fallback
+    return None
+
+
+class SpeechPipeline:
+    """
+    Pipelined speech output: a synthesis worker and a playback worker joined by a bounded queue.
+
+    say() returns immediately, so the caller keeps consuming LLM tokens while
+    sentence N plays and sentence N+1 is being synthesized.
+    """
+
+    _STOP = object()
+
+    def __init__(self, engine: str = None, timeout: int = TTS_TIMEOUT, depth: int = TTS_PIPELINE_DEPTH):
+        self.engine = engine or TTS_ENGINE
+        self.timeout = timeout
+        self._text_queue = queue.Queue()
+        self._audio_queue = queue.Queue(maxsize=max(1, depth))  # Backpressure: don't render too far ahead
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._synth_worker = threading.Thread(target=self._synth_loop, name="TTSSynthThread", daemon=True)
+        self._play_worker = threading.Thread(target=self._play_loop, name="TTSPlaybackThread", daemon=True)
+        self._synth_worker.start()
+        self._play_worker.start()
+
+    def say(self, text: str) -> None:
+        """Queue text for synthesis and playback (non-blocking)."""
+        text = text.strip() if text else ""
+        if not text:
+            return
+        with self._idle:
+            self._pending += 1
+        self._text_queue.put(text)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until everything queued so far has been played. Returns False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self) -> None:
+        """Finish queued speech and stop the workers."""
+        self._text_queue.put(self._STOP)
+        self._synth_worker.join()
+        self._play_worker.join()
+
+    def _synth_loop(self):
+        while True:
+            text = self._text_queue.get()
+            if text is self._STOP:
+                self._audio_queue.put(self._STOP)
+                return
+            try:
+                audio = synthesize(text, self.engine, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"[TTS] Synthesis failed ({e})")
+                audio = None
+            self._audio_queue.put((text, audio))
+
+    def _play_loop(self):
+        sink = get_audio_sink()
+        while True:
+            item = self._audio_queue.get()
+            if item is self._STOP:
+                return
+            text, audio = item
+            try:
+                if audio is None:
+                    tts_pyttsx3(text)
+                else:
+                    # write() returns once the sentence is within one device buffer of
+                    # finishing, so the next sentence follows without a gap
+                    sink.write(*audio)
+                    with self._idle:
+                        last = self._pending == 1
+                    if last:
+                        sink.drain()
+            except Exception as e:
+                logger.warning(f"[TTS] Playback failed ({e})")
+            finally:
+                with self._idle:
+                    self._pending -= 1
+                    self._idle.notify_all()
+
+
+# ============================================================================
+# Answer Cache
+# ============================================================================
+
+# Words dropped before matching questions ("um, what's the time please" == "what's the time")
+FILLER_WORDS = {"um", "uh", "erm", "er", "hmm", "ah", "oh", "please", "hey", "homer", "okay", "ok", "so", "well",
+                "just", "actually", "basically"}
+
+
+def normalize_question(text: str) -> str:
+    """Answer-cache key: lowercase, no punctuation, no filler words."""
+    return " ".join(w for w in _normalize_transcript(text).split() if w not in FILLER_WORDS)
+
+
+class AnswerCache:
+    """
+    LLM answers to opening questions, keyed by normalize_question().
+
+    Entries expire after ttl seconds and the least recently used are evicted
+    beyond max_entries. The cache is persisted as JSON at path. With
+    store_pcm, each answer's sentences are also written to the PCM cache's
+    disk tier, so a repeated question starts playing as soon as it has been
+    transcribed.
+    """
+
+    def __init__(self, path: str = ANSWER_CACHE_PATH, max_entries: int = ANSWER_CACHE_SIZE,
+                 ttl: float = ANSWER_CACHE_TTL, store_pcm: bool = ANSWER_CACHE_PCM):
+        from collections import OrderedDict
+        self.path = os.path.expanduser(path) if path else ""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store_pcm = store_pcm
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> {"q", "a", "t"} (t = time.time() when stored)
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, question: str):
+        """Return the cached answer text, or None. Counts towards the hit ratio: call once per turn."""
+        if not self.max_entries:
+            return None
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["a"]
+
+    def peek(self, question: str) -> bool:
+        """True if question has a cached answer; not counted as a lookup (for polling, e.g. speculation)."""
+        if not self.max_entries:
+            return False
+        with self._lock:
+            return self._fresh(normalize_question(question)) is not None
+
+    def _fresh(self, key: str):
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry["t"] > self.ttl:
+            del self._entries[key]
+            entry = None
+        return entry
+
+    def put(self, question: str, answer: str, engine: str = None) -> None:
+        answer = answer.strip()
+        key = normalize_question(question)
+        if not self.max_entries or not key or not answer:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = {"q": question, "a": answer, "t": time.time()}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            snapshot = list(self._entries.items())
+        self._save(snapshot)
+        if self.store_pcm and engine:
+            # Usually already in the PCM memory tier from playback, so this is just a disk write
+            threading.Thread(target=lambda: [synthesize(s, engine, persist=True) for s in _split_sentences(answer)],
+                             name="AnswerPcm", daemon=True).start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0}
+
+    def _load(self):
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[AnswerCache] Ignoring unreadable {self.path} ({e})")
+            return
+        now = time.time()
+        for key, entry in entries.items():
+            if now - entry.get("t", 0) <= self.ttl and entry.get("a"):
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.info(f"[AnswerCache] Loaded {len(self._entries)} answers from {self.path}")
+
+    def _save(self, snapshot):
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp{threading.get_ident()}"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dict(snapshot), f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"[AnswerCache] Could not write {self.path} ({e})")
+
+
+_ANSWER_CACHE = None
+_ANSWER_CACHE_LOCK = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the process-wide answer cache, loading it on first use."""
+    global _ANSWER_CACHE
+    with _ANSWER_CACHE_LOCK:
+        if _ANSWER_CACHE is None:
+            _ANSWER_CACHE = AnswerCache()
+        return _ANSWER_CACHE
 
 
 # ============================================================================
 # Voice Commands
 # ============================================================================
 
+# Phrases that end a wake session / exit the program (whole-word match on the transcript)
+SESSION_END_PHRASES = ["go to sleep", "sleep", "stop listening", "that's all"]
+EXIT_PHRASES = ["goodbye", "bye", "exit", "quit"]
+
 VOICE_COMMANDS = {
     "volume up": lambda: _volume_change(+10),
     "volume down": lambda: _volume_change(-10),
@@ -1372,31 +4639,373 @@ def _stop_audio() -> str:
         return "Stop failed"
 
 
-def handle_voice_command(text: str) -> tuple[bool, str]:
-    """
-    Check if text is a voice command and execute it.
+def contains_phrase(text: str, phrase: str) -> bool:
+    """True if phrase appears in text as whole words ("mute" doesn't match "unmute")."""
+    return re.search(rf"\b{re.escape(phrase)}\b", text.lower()) is not None
 
-    Returns:
-        (is_command, response): Whether it was a command and the response.
-    """
+
+def match_voice_command(text: str):
+    """Return the action for a voice command in text (without running it), or None."""
     text_lower = text.lower().strip()
+    if not text_lower:
+        return None
 
-    # Check for exact matches
+    # Check for whole-word matches
     for cmd, action in VOICE_COMMANDS.items():
-        if cmd in text_lower or text_lower in cmd:
-            response = action()
-            return True, response
+        if contains_phrase(text_lower, cmd):
+            return action
 
     # Check for "set volume to X" pattern
-    import re
     match = re.search(r"(?:set )?volume (?:to )?(\d+)", text_lower)
     if match:
         level = int(match.group(1))
         level = max(0, min(100, level))
-        response = _volume_set(level)
-        return True, response
+        return lambda: _volume_set(level)
+
+    return None
+
+
+def handle_voice_command(text: str) -> tuple[bool, str]:
+    """
+    Check if text is a voice command and execute it.
+
+    Returns:
+        (is_command, response): Whether it was a command and the response.
+    """
+    action = match_voice_command(text)
+    if action is None:
+        return False, ""
+    return True, action()
+
+
+def is_control_phrase(text: str) -> bool:
+    """True if text would be handled locally (session end, exit, voice command) rather than by the LLM."""
+    return (any(contains_phrase(text, w) for w in SESSION_END_PHRASES + EXIT_PHRASES)
+            or match_voice_command(text) is not None)
+
+
+# ============================================================================
+# Local Intents (answered on the CPU, never sent to the LLM)
+# ============================================================================
+
+class IntentResult:
+    """A local handler's answer. action (if any) runs only when the answer is actually used."""
+
+    __slots__ = ("name", "answer", "confidence", "action")
+
+    def __init__(self, name: str, answer: str, confidence: float, action=None):
+        self.name = name
+        self.answer = answer
+        self.confidence = confidence
+        self.action = action
+
+
+class IntentRouter:
+    """
+    Registry of fast local handlers consulted before the LLM.
+
+    A handler is handler(text, router) -> IntentResult | None; it must not have
+    side effects (put those in IntentResult.action). route() returns the most
+    confident result at or above min_confidence, or None to fall back to the LLM.
+    """
+
+    def __init__(self, min_confidence: float = INTENT_MIN_CONFIDENCE, tts_engine: str = None):
+        self.min_confidence = min_confidence
+        self.tts_engine = tts_engine  # Engine timers announce themselves with
+        self.timers = []  # Pending threading.Timer objects
+        self._handlers = []
+
+    def register(self, name: str, handler) -> None:
+        self._handlers.append((name, handler))
+
+    def route(self, text: str):
+        best = None
+        for name, handler in self._handlers:
+            try:
+                result = handler(text, self)
+            except Exception as e:
+                logger.warning(f"[Intent] {name} handler failed on {text!r} ({e})")
+                continue
+            if result is not None and (best is None or result.confidence > best.confidence):
+                best = result
+        if best is not None and best.confidence >= self.min_confidence:
+            return best
+        return None
+
+
+_NUMBER_WORDS = {
+    "zero": 0, "oh": 0, "one": 1, "a": 1, "an": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90, "half": 0.5,
+}
+_NUMBER_SCALES = {"hundred": 100, "thousand": 1000, "million": 1000000}
+
+
+def _words_to_numbers(text: str) -> str:
+    """Lowercase text with spelled-out numbers ("twenty three") replaced by digits (streaming STT spells them)."""
+    out, value, current, in_number, sign = [], 0, 0, False, ""
+    # Hyphens join words ("twenty-three") but are a sign or an operator next to digits ("-40", "10 - 3")
+    text = re.sub(r"(?<=[a-z])-(?=[a-z])", " ", re.sub(r"(?<=\d),(?=\d{3})", "", text.lower()))
+    words = text.split()
+    for i, word in enumerate(words + [""]):
+        bare = word.strip("?.!,")
+        is_article = bare in ("a", "an", "oh")
+        follows_operand = in_number or (out and re.fullmatch(r"-?[\d.]+", out[-1].strip("?.!,")))
+        if bare in ("minus", "negative") and not follows_operand and i + 1 < len(words) and (
+                words[i + 1].strip("?.!,") in _NUMBER_WORDS or re.match(r"[\d.]", words[i + 1])):
+            sign = "-"  # "minus five plus two": a sign, not subtraction
+            continue
+        if bare in _NUMBER_WORDS and not (is_article and in_number) and not (
+                is_article and (i + 1 >= len(words) or words[i + 1].strip("?.!,") not in _NUMBER_SCALES)):
+            if in_number and not _extends_number(current, _NUMBER_WORDS[bare]):
+                # "twenty twenty", "five six": adjacent numbers, not a sum
+                number = value + current
+                out.append(sign + (str(int(number)) if number == int(number) else str(number)))
+                value, current, sign = 0, 0, ""
+            current += _NUMBER_WORDS[bare]
+            in_number = True
+        elif bare in _NUMBER_SCALES and in_number:
+            current = max(current, 1) * _NUMBER_SCALES[bare]
+            if _NUMBER_SCALES[bare] >= 1000:
+                value, current = value + current, 0
+        elif bare == "and" and in_number and i + 1 < len(words) and words[i + 1].strip("?.!,") in _NUMBER_WORDS:
+            continue
+        else:
+            if in_number:
+                number = value + current
+                out.append(sign + (str(int(number)) if number == int(number) else str(number)))
+                value, current, in_number, sign = 0, 0, False, ""
+            if word:
+                out.append(sign + word)
+                sign = ""
+    return " ".join(out)
+
+
+def _extends_number(current: float, word_value: float) -> bool:
+    """Whether a number word continues the number being read ("twenty" + "three") rather than starting a new one."""
+    below_hundred = current % 100
+    return (word_value == 0.5 or below_hundred == 0
+            or (below_hundred >= 20 and below_hundred % 10 == 0 and 0 < word_value < 10))
+
+
+def _say_number(x: float) -> str:
+    """Round for speech: integers as-is, otherwise up to 3 significant decimals."""
+    if abs(x - round(x)) < 1e-9:
+        return f"{int(round(x)):,}".replace(",", " ") if abs(x) >= 10000 else str(int(round(x)))
+    return f"{x:.3g}" if abs(x) < 1 else f"{x:,.2f}".rstrip("0").rstrip(".").replace(",", " ")
+
+
+def _clock_intent(text: str, router: IntentRouter):
+    t = _normalize_transcript(text)
+    if re.search(r"\b(in|at) (?!the moment)\w+", t) and "time" in t:
+        return None  # "what time is it in Tokyo": needs a timezone lookup
+    if re.search(r"\b(what time is it|what'?s the time|what is the time|tell me the time|current time)( now| right now| please)?$", t):
+        now = time.localtime()
+        return IntentResult("clock", f"It's {time.strftime('%I:%M %p', now).lstrip('0')}.", 0.95)
+    if re.search(r"\b(what'?s the date|what is the date|what day is it|what'?s today|what is today|today's date|what date is it)"
+                 r"( today| now| please)?$", t):
+        now = time.localtime()
+        return IntentResult("date", f"Today is {time.strftime('%A, %B', now)} {now.tm_mday}, {now.tm_year}.", 0.95)
+    return None
+
+
+_CALC_OPERATORS = [
+    (r"\bmultiplied by\b|\btimes\b|(?<=\d)\s*x\s*(?=\d)|\*", "*"),
+    (r"\bdivided by\b|\bover\b|/", "/"),
+    (r"\bplus\b|\+", "+"),
+    (r"\bminus\b|(?<=\d)\s*-\s*(?=\d)", "-"),
+    (r"\bto the power of\b|\^", "**"),
+]
+
+_CALC_LIMIT = 1e12  # Results this large are left to the LLM
+
+
+def _safe_eval(expr: str) -> float:
+    """Evaluate + - * / ** on numbers only (no names, calls or attributes)."""
+    import ast
+    import operator
+    ops = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+           ast.Pow: operator.pow, ast.USub: operator.neg}
+
+    def ev(node):
+        if isinstance(node, ast.Expression):
+            return ev(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in ops:
+            left, right = ev(node.left), ev(node.right)
+            if isinstance(node.op, ast.Pow) and abs(right) > 100:
+                raise ValueError("exponent too large")
+            return ops[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in ops:
+            return ops[type(node.op)](ev(node.operand))
+        raise ValueError(f"unsupported expression: {expr}")
+
+    return float(ev(ast.parse(expr, mode="eval")))
+
+
+def _calculator_intent(text: str, router: IntentRouter):
+    t = _words_to_numbers(text).strip(" ?.!")
+    t = re.sub(r"^(?:what(?:'?s| is)|how much is|calculate|compute|what do you get for)\s+", "", t)
+    m = re.fullmatch(r"(?:the )?square root of ([\d.]+)", t)
+    if m:
+        return IntentResult("calculator", f"The square root of {m.group(1)} is {_say_number(float(m.group(1)) ** 0.5)}.", 0.95)
+    m = re.fullmatch(r"([\d.]+) (?:percent|%) of ([\d.]+)", t)
+    if m:
+        value = float(m.group(1)) * float(m.group(2)) / 100
+        return IntentResult("calculator", f"{m.group(1)} percent of {m.group(2)} is {_say_number(value)}.", 0.95)
+    expr = re.sub(r"\b([\d.]+) squared\b", r"\1 ^ 2", t)
+    expr = re.sub(r"\b([\d.]+) cubed\b", r"\1 ^ 3", expr)
+    for pattern, op in _CALC_OPERATORS:
+        expr = re.sub(pattern, f" {op} ", expr)
+    expr = " ".join(expr.split())
+    if not re.fullmatch(r"-?[\d.]+(?: (?:\*\*|[-+*/]) -?[\d.]+)+", expr):
+        return None
+    try:
+        value = _safe_eval(expr)
+    except (ValueError, SyntaxError, ZeroDivisionError, OverflowError):
+        return IntentResult("calculator", "I can't calculate that.", 0.85) if "/ 0" in expr else None
+    if abs(value) >= _CALC_LIMIT:
+        return None  # Would be read out as a string of digits: let the LLM phrase it
+    return IntentResult("calculator", f"{t} is {_say_number(value)}.", 0.95)
+
+
+# Linear units: alias -> (dimension, factor to the base unit, singular name, plural name)
+_UNITS = {}
+for _names, _dim, _factor in [
+    (("millimeter", "millimeters", "millimetre", "millimetres", "mm"), "length", 0.001),
+    (("centimeter", "centimeters", "centimetre", "centimetres", "cm"), "length", 0.01),
+    (("meter", "meters", "metre", "metres", "m"), "length", 1.0),
+    (("kilometer", "kilometers", "kilometre", "kilometres", "km", "k"), "length", 1000.0),
+    (("inch", "inches", "in"), "length", 0.0254),
+    (("foot", "feet", "ft"), "length", 0.3048),
+    (("yard", "yards", "yd"), "length", 0.9144),
+    (("mile", "miles", "mi"), "length", 1609.344),
+    (("gram", "grams", "g"), "mass", 0.001),
+    (("kilogram", "kilograms", "kilo", "kilos", "kg"), "mass", 1.0),
+    (("ounce", "ounces", "oz"), "mass", 0.028349523125),
+    (("pound", "pounds", "lb", "lbs"), "mass", 0.45359237),
+    (("stone", "stones"), "mass", 6.35029318),
+    (("milliliter", "milliliters", "millilitre", "millilitres", "ml"), "volume", 0.001),
+    (("liter", "liters", "litre", "litres", "l"), "volume", 1.0),
+    (("teaspoon", "teaspoons", "tsp"), "volume", 0.00492892),
+    (("tablespoon", "tablespoons", "tbsp"), "volume", 0.0147868),
+    (("cup", "cups"), "volume", 0.2365882365),
+    (("pint", "pints"), "volume", 0.473176473),
+    (("gallon", "gallons"), "volume", 3.785411784),
+    (("kilometers per hour", "kilometres per hour", "km/h", "kph"), "speed", 1 / 3.6),
+    (("miles per hour", "mph"), "speed", 0.44704),
+    (("meters per second", "metres per second"), "speed", 1.0),
+]:
+    for _name in _names:
+        _UNITS[_name] = (_dim, _factor, _names[0], _names[1])
+
+_TEMPERATURES = {"celsius": "c", "centigrade": "c", "c": "c", "fahrenheit": "f", "f": "f", "kelvin": "k", "k": "k"}
+
+
+def _to_celsius(value: float, unit: str) -> float:
+    return {"c": value, "f": (value - 32) * 5 / 9, "k": value - 273.15}[unit]
+
+
+def _from_celsius(value: float, unit: str) -> float:
+    return {"c": value, "f": value * 9 / 5 + 32, "k": value + 273.15}[unit]
+
+
+def _units_intent(text: str, router: IntentRouter):
+    t = _words_to_numbers(text).strip(" ?.!").replace("degrees ", "")
+    t = re.sub(r"\b(?:a|an|one) (?=[a-z])", "1 ", t)  # "how many feet in a mile"
+    m = (re.search(r"(?:convert |what(?:'?s| is) )?(-?[\d.]+) ([a-z/ ]+?) (?:to|in|into|as) ([a-z/ ]+)$", t)
+         or re.search(r"how many ([a-z/ ]+?) (?:are )?(?:in|is|make) (-?[\d.]+) ([a-z/ ]+)$", t))
+    if not m:
+        return None
+    if m.re.pattern.startswith("how many"):
+        target, amount, source = m.group(1), m.group(2), m.group(3)
+    else:
+        amount, source, target = m.group(1), m.group(2), m.group(3)
+    try:
+        value = float(amount)
+    except ValueError:
+        return None
+    source, target = source.strip(), target.strip()
+    if source in _TEMPERATURES and target in _TEMPERATURES:
+        src, dst = _TEMPERATURES[source], _TEMPERATURES[target]
+        result = _from_celsius(_to_celsius(value, src), dst)
+        names = {"c": "degrees Celsius", "f": "degrees Fahrenheit", "k": "kelvin"}
+        return IntentResult("units", f"{_say_number(value)} {names[src]} is {_say_number(result)} {names[dst]}.", 0.95)
+    if source not in _UNITS or target not in _UNITS or _UNITS[source][0] != _UNITS[target][0]:
+        return None
+    result = value * _UNITS[source][1] / _UNITS[target][1]
+
+    def name(unit, x):
+        return _UNITS[unit][2] if _say_number(x) == "1" else _UNITS[unit][3]
+    return IntentResult("units", f"{_say_number(value)} {name(source, value)} is {_say_number(result)} {name(target, result)}.", 0.95)
+
+
+def _timer_intent(text: str, router: IntentRouter):
+    t = _words_to_numbers(text).strip(" ?.!")
+    if re.search(r"\b(cancel|stop|delete) (?:the |my |all )?timers?\b", t):
+        def cancel():
+            for timer in router.timers:
+                timer.cancel()
+            router.timers.clear()
+        count = sum(1 for timer in router.timers if timer.is_alive())
+        return IntentResult("timer", "Timer cancelled." if count else "There's no timer running.", 0.9, cancel)
+    m = re.search(r"\b(?:set |start )?(?:a |an )?timer (?:for )?(an?|[\d.]+) (second|minute|hour)s?\b", t) \
+        or re.search(r"\b(?:set |start )?(?:a |an )?(an?|[\d.]+) (second|minute|hour)s? timer\b", t)
+    if not m:
+        return None
+    amount, unit = 1.0 if m.group(1) in ("a", "an") else float(m.group(1)), m.group(2)
+    seconds = amount * {"second": 1, "minute": 60, "hour": 3600}[unit]
+    spoken = f"{_say_number(amount)} {unit}{'' if amount == 1 else 's'}"
 
-    return False, ""
+    def start():
+        def ring():
+            logger.info(f"[Intent] Timer done ({spoken})")
+            try:
+                play_pcm(b'\x00\xff' * 2400, 16000)
+                speak(f"Your {spoken} timer is done.", router.tts_engine)
+            except Exception as e:
+                logger.warning(f"[Intent] Timer announcement failed ({e})")
+        timer = threading.Timer(seconds, ring)
+        timer.daemon = True
+        timer.start()
+        router.timers[:] = [x for x in router.timers if x.is_alive()] + [timer]
+
+    return IntentResult("timer", f"Timer set for {spoken}.", 0.95, start)
+
+
+_INTENT_ROUTER = None
+_INTENT_ROUTER_LOCK = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    """Return the process-wide intent router with the built-in handlers registered."""
+    global _INTENT_ROUTER
+    with _INTENT_ROUTER_LOCK:
+        if _INTENT_ROUTER is None:
+            _INTENT_ROUTER = IntentRouter()
+            if LOCAL_INTENTS:
+                _INTENT_ROUTER.register("clock", _clock_intent)
+                _INTENT_ROUTER.register("calculator", _calculator_intent)
+                _INTENT_ROUTER.register("units", _units_intent)
+                _INTENT_ROUTER.register("timer", _timer_intent)
+        return _INTENT_ROUTER
+
+
+def answer_locally(text: str, tts_engine: str = None):
+    """Route text through the local intents; runs the winning handler's action. Returns IntentResult or None."""
+    router = get_intent_router()
+    router.tts_engine = tts_engine or router.tts_engine
+    start = time.perf_counter()
+    result = router.route(text)
+    if result is None:
+        return None
+    logger.info(f"[Intent] {result.name} ({result.confidence:.2f}) answered {text!r} "
+                f"in {(time.perf_counter() - start) * 1e6:.0f}us")
+    if result.action is not None:
+        result.action()
+    return result
 
 
 def main():
@@ -1406,18 +5015,26 @@ def main():
     ap.add_argument("--max-tokens", type=int, default=LLM_MAX_TOKENS, help="Max LLM output tokens (default: %(default)s)")
     ap.add_argument("--once", metavar="TEXT", help="Single prompt (no interactive loop)")
     ap.add_argument("--tts", choices=("pyttsx3", "piper", "sherpa", "supertonic"), default=TTS_ENGINE, help="TTS engine")
-    ap.add_argument("--stt", choices=("faster-whisper", "whisper.cpp", "whisper"), default=STT_ENGINE, help="STT engine")
+    ap.add_argument("--stt", choices=("faster-whisper", "whisper.cpp", "whisper", "sherpa-streaming"), default=STT_ENGINE, help="STT engine")
+    ap.add_argument("--speculate", action="store_true", default=SPECULATIVE_LLM,
+                    help="Threaded mode with --stt sherpa-streaming: start the LLM on a stable partial transcript")
     ap.add_argument("--no-speak", action="store_true", help="Print response only, no TTS")
     ap.add_argument("--loop", action="store_true", help="Interactive loop: keep prompting until Ctrl+C")
     ap.add_argument("--voice", action="store_true", help="Voice input mode: use microphone for input")
     ap.add_argument("--wake", action="store_true", help="Wake word mode: listen for 'hey homer' before each query")
-    ap.add_argument("--threaded", action="store_true", help="2-thread mode: continuous VAD listening with parallel processing")
+    ap.add_argument("--threaded", action="store_true", help="Continuous mode: VAD listening with a pipelined STT/LLM/TTS orchestrator")
     ap.add_argument("--record", metavar="SECONDS", type=float, help="Record audio for N seconds and save to /tmp/recording.wav")
     ap.add_argument("--transcribe", metavar="FILE", help="Transcribe audio file to text (no LLM)")
     ap.add_argument("--read", action="store_true", help="Read-only mode: speak text from stdin, no LLM")
     ap.add_argument("--read-file", metavar="PATH", help="Speak contents of file, no LLM")
+    ap.add_argument("--gate-stats", metavar="WAV", nargs="?", const="",
+                    help="Report the wake-word gate's duty cycle: for a WAV file and exit, or live every 30s with --wake")
     args = ap.parse_args()
 
+    if args.gate_stats:
+        print(json.dumps(measure_gate(os.path.expanduser(args.gate_stats))))
+        return
+
     # Read-only TTS: speak text from file or stdin, no LLM
     if args.read_file or args.read:
         text = ""
@@ -1434,7 +5051,10 @@ def main():
         if not text:
             sys.exit(0)
         print("Speaking...", file=sys.stderr)
-        speak(text, args.tts)
+        speech = SpeechPipeline(args.tts)
+        for sentence in _split_sentences(text):
+            speech.say(sentence)
+        speech.wait()
         return
 
     # Record-only mode: record audio and save to file
@@ -1456,43 +5076,76 @@ def main():
         print(text)
         return
 
+    speech = None
+    conversation = ConversationSession(get_llm_client(args.host))  # Follow-ups in --loop/--voice remember earlier turns
+
+    def get_speech() -> SpeechPipeline:
+        nonlocal speech
+        if speech is None:
+            speech = SpeechPipeline(args.tts)
+        return speech
+
     def one_turn(prompt: str) -> None:
         if not prompt.strip():
             return
+        local = answer_locally(prompt, args.tts)
+        answers = get_answer_cache()
+        cacheable = conversation.fresh
+        cached = local.answer if local is not None else answers.get(prompt) if cacheable else None
         print("Thinking...")
+        if cached is not None:
+            conversation.add_turn(prompt.strip(), cached)
+            print("Assistant:", cached)
+            if not args.no_speak:
+                speech = get_speech()
+                for sentence in _split_sentences(cached):
+                    speech.say(sentence)
+                speech.wait()
+            return
         if args.no_speak:
-            for chunk in call_llm_stream(prompt.strip(), args.host, max_tokens=args.max_tokens):
+            llm_stream = conversation.stream(prompt.strip(), max_tokens=args.max_tokens)
+            for chunk in llm_stream:
                 print(chunk, end="", flush=True)
             print()
+            if cacheable and llm_stream.final:
+                answers.put(prompt.strip(), llm_stream.text)
+            conversation.record(prompt.strip(), llm_stream)
             return
-        # Stream LLM and speak each sentence as soon as it's complete (chunk-by-chunk audio)
+        # Stream LLM and queue each sentence as soon as it's complete; the speech pipeline
+        # synthesizes the next sentence while the current one plays
+        speech = get_speech()
         buffer = ""
         print("Assistant:", end="", flush=True)
         try:
-            for chunk in call_llm_stream(prompt.strip(), args.host, max_tokens=args.max_tokens):
+            llm_stream = conversation.stream(prompt.strip(), max_tokens=args.max_tokens)
+            for chunk in llm_stream:
                 print(chunk, end="", flush=True)
                 buffer += chunk
                 sentences = _split_sentences(buffer)
                 if len(sentences) > 1:
-                    to_speak = " ".join(sentences[:-1])
-                    speak(to_speak, args.tts)
+                    for sentence in sentences[:-1]:
+                        speech.say(sentence)
                     buffer = sentences[-1]
             print(flush=True)
-            if buffer.strip():
-                speak(buffer.strip(), args.tts)
+            speech.say(buffer)
+            if cacheable and llm_stream.final:
+                answers.put(prompt.strip(), llm_stream.text, args.tts)
+            conversation.record(prompt.strip(), llm_stream)
+            logger.info(f"[LLM] {llm_stream.timing}")
         except Exception as e:
             print(f"\nStream error: {e}", file=sys.stderr)
             # Fallback: get full response and speak once
             response = call_llm(prompt.strip(), args.host, max_tokens=args.max_tokens)
             print("Assistant:", response)
-            if response:
-                speak(response, args.tts)
+            speech.say(response)
+        finally:
+            speech.wait()
 
     if args.once:
         one_turn(args.once)
         return
 
-    # Threaded mode: 2-thread architecture with continuous VAD listening
+    # Threaded mode: listener thread plus asyncio stages for STT, LLM, synthesis and playback
     # Check before stdin.isatty() so it works over SSH
     if args.threaded:
         print("Threaded voice assistant (continuous listening with Silero VAD).")
@@ -1510,6 +5163,9 @@ def main():
         print("Say 'volume up', 'volume down', or ask any question.")
         print()
 
+        if not args.no_speak:
+            prewarm_pcm_cache(args.tts)
+
         # Use fixed 5-second recording for SSH compatibility
         record_duration = float(os.environ.get("VOICE_RECORD_SECONDS", "5"))
         print(f"[Recording {record_duration}s per turn]", file=sys.stderr)
@@ -1518,7 +5174,8 @@ def main():
             try:
                 # Record audio (fixed duration for SSH compatibility)
                 print(f"[Listening for {record_duration}s...]", file=sys.stderr, flush=True)
-                audio_file = tempfile.mktemp(suffix=".wav", prefix="voice_")
+                fd, audio_file = tempfile.mkstemp(suffix=".wav", prefix="voice_")
+                os.close(fd)
 
                 # Use parecord with timeout
                 proc = subprocess.Popen(
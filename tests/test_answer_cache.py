@@ -0,0 +1,14 @@
+"""AnswerCache hit accounting."""
+from voice_assistant_pi import AnswerCache
+
+
+def test_peek_does_not_count_towards_hit_ratio():
+    cache = AnswerCache(path="", max_entries=10, ttl=60, store_pcm=False)
+    cache.put("What is the capital of France?", "Paris.")
+    for _ in range(20):  # The speculation tracker polls while a partial is stable
+        assert cache.peek("what is the capital of france")
+        assert not cache.peek("what is the capital of spain")
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+    assert cache.get("What is the capital of France?") == "Paris."
+    assert cache.get("What is the capital of Spain?") is None
+    assert cache.stats()["hit_ratio"] == 0.5
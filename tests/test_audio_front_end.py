@@ -0,0 +1,79 @@
+"""The capture front end must not allocate per chunk (tracemalloc)."""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from voice_assistant_pi import AudioCapture, AudioRing, apply_agc
+
+CHUNK = 1600
+CHUNKS = 2000
+# A regression that copies a chunk allocates at least one block of >= 3200 bytes (int16) per chunk
+MAX_RETAINED_BLOCKS_PER_CHUNK = 0.01  # Steady state: nothing kept per chunk
+MAX_TRANSIENT_BYTES_PER_CHUNK = 2048  # Under one int16 chunk (3200 bytes): scalars and small objects only
+
+
+def measure(step, chunks: int = CHUNKS) -> dict:
+    """Run step(i) for chunks chunks; retained blocks per chunk and the largest per-chunk transient peak."""
+    for i in range(16):  # Warm up lazy imports and numpy's ufunc caches
+        step(i)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        worst = 0
+        for i in range(chunks):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            step(i)
+            worst = max(worst, tracemalloc.get_traced_memory()[1] - current)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    blocks = sum(stat.count_diff for stat in after.filter_traces(filters).compare_to(
+        before.filter_traces(filters), "filename"))
+    return {"blocks_per_chunk": blocks / chunks, "transient_bytes": worst}
+
+
+@pytest.fixture
+def source():
+    return np.random.default_rng(0).integers(-3000, 3000, size=(8, CHUNK, 1), dtype=np.int16)
+
+
+def test_capture_to_ring_allocates_nothing_per_chunk(source):
+    capture = AudioCapture(chunk_size=CHUNK)
+    ring = AudioRing(CHUNK)
+
+    def step(i):
+        capture._callback(source[i % len(source)], CHUNK, None, None)
+        ring.push(capture.read(timeout=0))
+
+    result = measure(step)
+    assert result["blocks_per_chunk"] <= MAX_RETAINED_BLOCKS_PER_CHUNK, result
+    assert result["transient_bytes"] <= MAX_TRANSIENT_BYTES_PER_CHUNK, result
+
+
+def test_apply_agc_in_place_allocates_nothing_per_chunk(source):
+    samples = source.reshape(len(source), CHUNK).astype(np.float32) / 32768.0
+    out = np.empty(CHUNK, dtype=np.float32)
+
+    def step(i):
+        apply_agc(samples[i % len(samples)], out=out)
+
+    result = measure(step)
+    assert result["blocks_per_chunk"] <= MAX_RETAINED_BLOCKS_PER_CHUNK, result
+    assert result["transient_bytes"] <= MAX_TRANSIENT_BYTES_PER_CHUNK, result
+
+
+def test_measure_catches_a_chunk_copy(source):
+    ring = AudioRing(CHUNK)
+    kept = []
+
+    def step(i):
+        ring.push(source[i % len(source)].copy())  # The regression these tests guard against
+        if i % 10 == 0:
+            kept.append(source[0].copy())
+
+    result = measure(step, chunks=200)
+    assert result["transient_bytes"] > MAX_TRANSIENT_BYTES_PER_CHUNK
+    assert result["blocks_per_chunk"] > MAX_RETAINED_BLOCKS_PER_CHUNK
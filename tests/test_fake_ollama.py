@@ -0,0 +1,112 @@
+"""The fake hailo-ollama server's timing and failure-injection options."""
+import json
+import time
+
+import pytest
+import requests
+
+from fake_ollama import FakeOllama
+
+
+def stream(fake, path: str = "/api/generate", timeout: float = 5.0, **body) -> tuple:
+    """POST a streaming request; returns (chunks, seconds to first token, total seconds)."""
+    body = {"model": "qwen2:1.5b", "prompt": "hi", **body}
+    start = time.monotonic()
+    first = None
+    chunks = []
+    with requests.post(f"{fake.url}{path}", json=body, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        for line in r.iter_lines(chunk_size=None):
+            if line:
+                chunks.append(json.loads(line))
+                first = first or time.monotonic() - start
+    return chunks, first, time.monotonic() - start
+
+
+def text(chunks: list) -> str:
+    return "".join(c.get("response") or c.get("message", {}).get("content", "") for c in chunks)
+
+
+def test_generate_streams_the_reply_with_a_done_message(fake_ollama):
+    chunks, _, _ = stream(fake_ollama)
+    assert text(chunks) == fake_ollama.reply
+    assert chunks[-1]["done"] and chunks[-1]["eval_count"] == len(fake_ollama.reply.split())
+    assert chunks[-1]["context"]
+
+
+def test_chat_and_tags(fake_ollama):
+    chunks, _, _ = stream(fake_ollama, "/api/chat", messages=[{"role": "user", "content": "hi"}])
+    assert text(chunks) == fake_ollama.reply
+    models = requests.get(f"{fake_ollama.url}/api/tags", timeout=5).json()["models"]
+    assert [m["name"] for m in models] == fake_ollama.models
+
+
+def test_num_predict_limits_tokens(fake_ollama):
+    chunks, _, _ = stream(fake_ollama, options={"num_predict": 3})
+    assert chunks[-1]["eval_count"] == 3
+
+
+def test_ttft_and_tps():
+    with FakeOllama(ttft=0.3, tps=20.0, reply="a b c d e f g h i j k") as fake:
+        _, first, total = stream(fake)
+    assert 0.25 <= first < 0.6
+    assert total - first >= 10 / 20.0 * 0.8  # 10 more tokens at 20/s
+
+
+def test_script_overrides_requests_in_order(fake_ollama):
+    fake_ollama.script.extend(["Paris.", {"reply": "Madrid.", "ttft": 0.0}])
+    assert text(stream(fake_ollama)[0]) == "Paris."
+    assert text(stream(fake_ollama)[0]) == "Madrid."
+    assert text(stream(fake_ollama)[0]) == fake_ollama.reply  # Script used up: defaults again
+
+
+def test_script_status(fake_ollama):
+    fake_ollama.script.append({"status": 503})
+    with pytest.raises(requests.HTTPError):
+        stream(fake_ollama)
+
+
+def test_stall(fake_ollama):
+    fake_ollama.stall_after, fake_ollama.stall_seconds = 2, 0.5
+    chunks, _, total = stream(fake_ollama)
+    assert chunks[-1]["done"]
+    assert total >= 0.5
+
+
+def test_truncate_ends_without_done(fake_ollama):
+    fake_ollama.truncate_after = 3
+    chunks, _, _ = stream(fake_ollama)
+    assert len(chunks) == 3
+    assert not any(c["done"] for c in chunks)
+
+
+def test_hang_after_requests():
+    with FakeOllama(ttft=0.0, tps=200.0, hang_after=1, hang_seconds=1.0) as fake:
+        stream(fake)
+        with pytest.raises(requests.ReadTimeout):
+            stream(fake, timeout=0.3)
+        assert fake.hangs == 1
+        time.sleep(1.0)
+        assert stream(fake)[0][-1]["done"]  # Recovered once the hang is over
+        with pytest.raises(requests.ReadTimeout):
+            stream(fake, timeout=0.3)  # ...and hangs again after another request
+        assert fake.hangs == 2
+
+
+def test_hang_on_token_load():
+    with FakeOllama(ttft=0.0, tps=200.0, reply="a b c d e", hang_tokens=8, hang_seconds=0.5) as fake:
+        stream(fake)  # 5 tokens
+        stream(fake)  # 10 tokens within the window
+        with pytest.raises(requests.ReadTimeout):
+            stream(fake, timeout=0.3)
+        assert fake.hangs == 1
+
+
+def test_cancelled_streams_are_counted():
+    with FakeOllama(ttft=0.0, tps=20.0, reply=" ".join(["word"] * 40)) as fake:
+        with requests.post(f"{fake.url}/api/generate", json={"prompt": "hi"}, stream=True, timeout=5) as r:
+            next(r.iter_lines(chunk_size=None))
+        deadline = time.monotonic() + 3.0
+        while not fake.cancelled and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert fake.cancelled == 1
@@ -0,0 +1,73 @@
+"""Local intent handlers: what they answer, and what they must leave to the LLM."""
+import pytest
+
+from voice_assistant_pi import (IntentRouter, _calculator_intent, _clock_intent, _timer_intent, _units_intent,
+                                _words_to_numbers)
+
+
+@pytest.fixture
+def router():
+    router = IntentRouter()
+    for name, handler in (("clock", _clock_intent), ("calculator", _calculator_intent),
+                          ("units", _units_intent), ("timer", _timer_intent)):
+        router.register(name, handler)
+    yield router
+    for timer in router.timers:
+        timer.cancel()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("twenty three", "23"),
+    ("twenty-three", "23"),
+    ("a hundred and five", "105"),
+    ("two thousand twenty four", "2024"),
+    ("twenty twenty", "20 20"),
+    ("five six", "5 6"),
+    ("minus five plus two", "-5 plus 2"),
+    ("ten minus three", "10 minus 3"),
+    ("convert -40 celsius", "convert -40 celsius"),
+    ("10 - 3", "10 - 3"),
+    ("1,000", "1000"),
+])
+def test_words_to_numbers(text, expected):
+    assert _words_to_numbers(text) == expected
+
+
+@pytest.mark.parametrize("text, name, answer", [
+    ("What is 10 - 3?", "calculator", "10 - 3 is 7."),
+    ("10-3", "calculator", "10-3 is 7."),
+    ("what is ten minus three", "calculator", "10 minus 3 is 7."),
+    ("whats 2 plus 2", "calculator", "2 plus 2 is 4."),
+    ("what is twenty-three times two", "calculator", "23 times 2 is 46."),
+    ("minus five plus two", "calculator", "-5 plus 2 is -3."),
+    ("what's 5 plus -3", "calculator", "5 plus -3 is 2."),
+    ("what is 7 minus negative 2", "calculator", "7 minus -2 is 9."),
+    ("what is 1,000 divided by 8", "calculator", "1000 divided by 8 is 125."),
+    ("what is 2 to the power of 10", "calculator", "2 to the power of 10 is 1024."),
+    ("convert -40 celsius to fahrenheit", "units", "-40 degrees Celsius is -40 degrees Fahrenheit."),
+    ("convert minus 10 degrees celsius to fahrenheit", "units", "-10 degrees Celsius is 14 degrees Fahrenheit."),
+    ("how many feet in a mile", "units", "1 mile is 5280 feet."),
+    ("set a timer for an hour", "timer", "Timer set for 1 hour."),
+    ("set a timer for five minutes", "timer", "Timer set for 5 minutes."),
+    ("start a ten second timer", "timer", "Timer set for 10 seconds."),
+])
+def test_answered_locally(router, text, name, answer):
+    result = router.route(text)
+    assert result is not None
+    assert (result.name, result.answer) == (name, answer)
+
+
+@pytest.mark.parametrize("text", ["whats the time", "what's the time", "what time is it"])
+def test_clock(router, text):
+    result = router.route(text)
+    assert result is not None and result.name == "clock"
+
+
+@pytest.mark.parametrize("text", [
+    "what time is it in Tokyo",
+    "what is the capital of France",
+    "what is 9 ^ 99",  # 95 digits: not worth reading out
+    "tell me about the year twenty twenty",
+])
+def test_left_to_the_llm(router, text):
+    assert router.route(text) is None
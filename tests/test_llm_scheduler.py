@@ -0,0 +1,90 @@
+"""LLMScheduler policies, driven through LLMClient against the fake hailo-ollama server."""
+import pytest
+import requests
+
+from voice_assistant_pi import LLMClient, LLMScheduler
+
+MODEL = "qwen2:1.5b"
+TEN_WORDS = "one two three four five six seven eight nine ten"
+
+
+def client_for(fake, scheduler: LLMScheduler) -> LLMClient:
+    return LLMClient(fake.url, MODEL, timeout=10, scheduler=scheduler)
+
+
+def queued_ms(client: LLMClient, prompt: str = "hi", **kwargs) -> int:
+    client.generate(prompt, **kwargs)
+    return client.last_timing.queued_ms
+
+
+def test_fixed_policy_spaces_back_to_back_calls(fake_ollama):
+    client = client_for(fake_ollama, LLMScheduler("fixed", cooldown=0.4))
+    assert queued_ms(client) < 100
+    assert queued_ms(client) >= 250  # 0.4s between starts, minus the first call's run time
+
+
+def test_adaptive_policy_admits_short_replies_back_to_back(fake_ollama):
+    fake_ollama.reply = "Paris."
+    scheduler = LLMScheduler("adaptive", budget_tokens=10, token_rate=5.0)
+    client = client_for(fake_ollama, scheduler)
+    assert queued_ms(client, max_tokens=10) < 100  # Charged the worst case (10), settled to 1 token
+    for _ in range(3):
+        assert queued_ms(client, max_tokens=10) < 100
+    assert scheduler.stats()["predicted_tokens"] == 1
+
+
+def test_adaptive_policy_spaces_long_replies(fake_ollama):
+    fake_ollama.reply = TEN_WORDS
+    scheduler = LLMScheduler("adaptive", budget_tokens=10, token_rate=10.0)
+    client = client_for(fake_ollama, scheduler)
+    assert queued_ms(client, max_tokens=10) < 100
+    assert queued_ms(client, max_tokens=10) >= 500  # Bucket empty: ~1s to refill 10 tokens at 10/s
+
+
+def test_cancelled_call_refunds_its_slot(fake_ollama):
+    fake_ollama.reply = TEN_WORDS
+    fake_ollama.tps = 5.0
+    scheduler = LLMScheduler("fixed", cooldown=5.0)
+    client = client_for(fake_ollama, scheduler)
+    stream = client.stream_generate("hi")
+    for _ in stream:
+        stream.cancel()
+    assert stream.cancelled
+    assert scheduler.completed["cancelled"] == 1
+    fake_ollama.tps = 200.0
+    assert queued_ms(client) < 1000  # Not held back by the cancelled call's 5s cooldown
+
+
+def test_cancelled_call_refunds_unused_tokens(fake_ollama):
+    fake_ollama.reply = TEN_WORDS
+    fake_ollama.tps = 5.0
+    scheduler = LLMScheduler("adaptive", budget_tokens=10, token_rate=1.0)
+    client = client_for(fake_ollama, scheduler)
+    stream = client.stream_generate("hi", max_tokens=10)
+    for _ in stream:
+        stream.cancel()
+    assert scheduler.stats()["tokens_available"] >= 8  # Charged 10, generated 1
+    fake_ollama.tps = 200.0
+    assert queued_ms(client, max_tokens=5) < 1000
+
+
+def test_failed_call_backs_off(fake_ollama):
+    fake_ollama.script.append({"status": 500})
+    scheduler = LLMScheduler("adaptive", cooldown=0.5, budget_tokens=100, token_rate=100.0)
+    client = client_for(fake_ollama, scheduler)
+    with pytest.raises(requests.HTTPError):
+        client.generate("hi")
+    assert scheduler.completed["failed"] == 1
+    assert scheduler.failures == 1
+    assert queued_ms(client) >= 400  # Backoff capped at the 0.5s cooldown
+    assert scheduler.failures == 0
+
+
+def test_stalled_call_backs_off(fake_ollama):
+    fake_ollama.script.append({"stall_after": 1, "stall_seconds": 2.0})
+    scheduler = LLMScheduler("adaptive", cooldown=0.5, budget_tokens=100, token_rate=100.0)
+    client = client_for(fake_ollama, scheduler)
+    with pytest.raises(TimeoutError):
+        client.generate("hi", deadline=0.3)
+    assert scheduler.completed["failed"] == 1
+    assert queued_ms(client) >= 400
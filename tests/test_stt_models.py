@@ -0,0 +1,78 @@
+"""SttModelRegistry and the model manager: what an eviction unloads and frees."""
+import gc
+import weakref
+
+import pytest
+
+import voice_assistant_pi as va
+
+
+class FakeStream:
+    def accept_waveform(self, sample_rate, samples):
+        pass
+
+    def input_finished(self):
+        pass
+
+
+class FakeOnlineRecognizer:
+    """Stands in for a sherpa-onnx OnlineRecognizer."""
+
+    def create_stream(self):
+        return FakeStream()
+
+    def is_ready(self, stream):
+        return False
+
+    def decode_stream(self, stream):
+        pass
+
+    def get_result(self, stream):
+        return "hello"
+
+    def is_endpoint(self, stream):
+        return False
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = va.SttModelRegistry()
+    registry.add_unload_hook(va._release_streaming_recognizers)
+    monkeypatch.setattr(va, "_STT_MODELS", registry)
+    monkeypatch.setattr(va.SttModelRegistry, "_load", staticmethod(lambda *key: FakeOnlineRecognizer()))
+    monkeypatch.setattr(va, "_MODEL_MANAGER", va.ModelManager())
+    yield registry
+    registry.unload_all()
+
+
+def evict(name: str) -> None:
+    va.get_model_manager()._models[name][0]()
+
+
+def test_eviction_unloads_only_that_variant(registry):
+    registry.get("faster-whisper", "base", "int8", 2)
+    registry.get("faster-whisper", "base", "float32", 4)
+    assert len(va.get_model_manager().resident()) == 2
+    evict("stt:faster-whisper:base:int8:2")
+    assert registry.loaded() == [("faster-whisper", "base", "float32", 4)]
+    assert list(va.get_model_manager().resident()) == ["stt:faster-whisper:base:float32:4"]
+
+
+def test_streaming_recognizer_keeps_its_model_in_use(registry):
+    recognizer = va.StreamingRecognizer(model_dir="/models/zipformer")
+    manager = va.get_model_manager()
+    entry = manager._models[recognizer._name]
+    entry[2] = 0.0  # Long idle
+    recognizer.accept([0.0] * 1600)
+    assert entry[2] > 0.0
+
+
+def test_evicted_streaming_model_is_freed_and_reloaded(registry):
+    recognizer = va.StreamingRecognizer(model_dir="/models/zipformer")
+    model = weakref.ref(recognizer.recognizer)
+    evict(recognizer._name)
+    gc.collect()
+    assert model() is None  # The recognizer let go, so the unload freed the model
+    assert registry.loaded() == []
+    assert recognizer.accept([0.0] * 1600) == "hello"  # Reloaded on next use
+    assert registry.loaded() == [recognizer.key]